@@ -0,0 +1,48 @@
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from fastapi.responses import FileResponse
+from app.services.profiling import list_profiles, get_profile, get_profile_path
+from app.services.profiling import is_valid_profile_token
+
+admin_router = APIRouter(prefix="/admin")
+
+
+def require_profile_token(x_profile_token: str | None = Header(None)):
+    if not is_valid_profile_token(x_profile_token):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+
+@admin_router.get(
+    "/profiles", status_code=200, dependencies=[Depends(require_profile_token)]
+)
+def fetch_profiles(limit: int = Query(20, ge=1, le=200)):
+    return list_profiles(limit)
+
+
+@admin_router.get(
+    "/profiles/{profile_id}",
+    status_code=200,
+    dependencies=[Depends(require_profile_token)],
+)
+def fetch_profile(profile_id: str):
+    profile = get_profile(profile_id)
+
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return profile
+
+
+@admin_router.get(
+    "/profiles/{profile_id}/download",
+    status_code=200,
+    dependencies=[Depends(require_profile_token)],
+)
+def download_profile(profile_id: str):
+    profile_path = get_profile_path(profile_id, ".prof")
+
+    if profile_path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return FileResponse(
+        profile_path, media_type="application/octet-stream", filename=profile_path.name
+    )
@@ -0,0 +1,67 @@
+from datetime import datetime
+from fastapi import APIRouter, status, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from app.schemas.archive import ObservationIn, ObservationOut, ObservationPage
+from app.schemas.archive import NightlySummary
+import app.services.archive as archive
+from app.services.auth import get_current_user
+from app.exceptions import InvalidCursorError, InvalidFieldError
+from app.db.session import get_session
+from app.models.auth import User
+from app.services.profiling import ProfiledRoute
+
+archive_router = APIRouter(prefix="/archive", route_class=ProfiledRoute)
+
+
+@archive_router.post(
+    "", response_model=ObservationOut, status_code=status.HTTP_201_CREATED
+)
+def save_observation(
+    observation_in: ObservationIn,
+    current_user: User = Depends(get_current_user),
+    current_session: Session = Depends(get_session),
+):
+    observation = archive.create_observation(
+        current_user.id, observation_in, current_session
+    )
+
+    return observation
+
+
+@archive_router.get("", response_model=ObservationPage, status_code=200)
+def list_observations(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = None,
+    object_id: str | None = None,
+    fields: list[str] | None = Query(None),
+    current_user: User = Depends(get_current_user),
+    current_session: Session = Depends(get_session),
+):
+    try:
+        items, next_cursor = archive.list_observations(
+            current_user.id,
+            current_session,
+            limit=limit,
+            cursor=cursor,
+            object_id=object_id,
+            fields=fields,
+        )
+    except InvalidCursorError:
+        raise HTTPException(400, detail="Invalid cursor")
+    except InvalidFieldError as e:
+        raise HTTPException(400, detail=str(e))
+
+    return ObservationPage(items=items, next_cursor=next_cursor)
+
+
+@archive_router.get("/nightly", response_model=list[NightlySummary], status_code=200)
+def summarize_nights(
+    object_id: str | None = None,
+    start: datetime | None = None,
+    stop: datetime | None = None,
+    current_user: User = Depends(get_current_user),
+    current_session: Session = Depends(get_session),
+):
+    return archive.summarize_nights(
+        current_user.id, current_session, object_id=object_id, start=start, stop=stop
+    )
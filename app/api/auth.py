@@ -4,8 +4,9 @@ import app.services.auth as auth
 from app.db.session import get_session
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordRequestForm
+from app.services.profiling import ProfiledRoute
 
-auth_router = APIRouter(prefix="/auth")
+auth_router = APIRouter(prefix="/auth", route_class=ProfiledRoute)
 
 
 @auth_router.post(
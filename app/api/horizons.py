@@ -1,19 +1,97 @@
-from fastapi import APIRouter, status, Depends, HTTPException
+import asyncio
+import httpx
+from datetime import date, datetime, timezone
+from fastapi import APIRouter, status, Depends, HTTPException, Query, Request
+from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
 from app.services.horizons import get_coords, search_object, parse_horizons_ephemeris
+from app.services.horizons import get_cached_ephemeris, remember_object_alias
+from app.parsers.horizons_tables import MatchTable
 from app.exceptions import InvalidLocationError, ObjectNotFoundError
 from app.exceptions import EphemerisDataMissing, UpstreamServiceError
+from app.exceptions import AmbiguousObjectError
 from app.schemas.horizons import HorizonsEphemerisResponse, HorizonsMatchObject
-from app.services.auth import get_current_user
+from app.schemas.horizons import HorizonsVisibilityResponse, SkySummaryResponse
+from app.schemas.horizons import SiteCacheStatsResponse, PlaceMatch
+from app.services.visibility import get_visibility
+from app.services.sky import get_sky_summary
+from app.services.kepler import approximate_ephemeris
+from app.services.chebyshev import stored_ephemeris, remember_object_details
+from app.services.gazetteer import get_gazetteer
+from app.services.http_cache import conditional_response, seconds_until_next_step
+from app.config import EPHEMERIS_STORE_ENABLED, MATCH_LIST_MAX_AGE_SECONDS
+from app.config import TRACK_MIN_INTERVAL_SECONDS
+from app.services.quantization import site_quantizer, get_site_cache_stats
+from app.services.auth import get_current_user, get_websocket_user
+from app.services.tracking import tracking_hub, TrackFeed
+from app.services.metrics import stage_timer
 from app.models.auth import User
+from app.services.admission import AdmissionRoute
 
-horizons_router = APIRouter(prefix="/horizons")
+horizons_router = APIRouter(prefix="/horizons", route_class=AdmissionRoute)
+
+
+def approximate_response(
+    request: Request, query: str | int, coords: str, offline: bool
+) -> Response:
+    if EPHEMERIS_STORE_ENABLED:
+        stored_data = stored_ephemeris(query, coords)
+        if stored_data is not None:
+            return ephemeris_response(request, stored_data, source="segment-store")
+
+    try:
+        data = approximate_ephemeris(query, coords, offline=offline)
+    except ObjectNotFoundError:
+        raise HTTPException(404, detail="Object not found")
+    except AmbiguousObjectError:
+        raise HTTPException(
+            400, detail="Multiple objects match this query, use a unique object ID"
+        )
+    except UpstreamServiceError:
+        raise HTTPException(503, detail="Upstream Horizons service error")
+
+    return ephemeris_response(request, data, source="approximate")
+
+
+def ephemeris_response(
+    request: Request, data: dict, source: str | None = None
+) -> Response:
+    def render() -> JSONResponse:
+        with stage_timer("serialize"):
+            ephemeris = HorizonsEphemerisResponse(**data)
+            return JSONResponse(content=ephemeris.model_dump())
+
+    response = conditional_response(request, data, render, seconds_until_next_step())
+    if source is not None:
+        response.headers["X-Ephemeris-Source"] = source
+
+    return response
+
+
+def match_list_response(request: Request, data: list[dict] | MatchTable) -> Response:
+    rows = list(data)
+
+    def render() -> JSONResponse:
+        with stage_timer("serialize"):
+            output_list = []
+
+            for item in rows:
+                new_item = HorizonsMatchObject(**item).model_dump(exclude_none=True)
+                output_list.append(new_item)
+
+            return JSONResponse(content=output_list)
+
+    return conditional_response(request, rows, render, MATCH_LIST_MAX_AGE_SECONDS)
 
 
 @horizons_router.get("/search", status_code=200)
 def fetch_object(
+    request: Request,
     query: str | int,
     location: str,
     elevation: float | None = None,
+    approximate: bool = False,
     current_user: User = Depends(get_current_user),
 ):
     try:
@@ -21,7 +99,22 @@ def fetch_object(
     except InvalidLocationError:
         raise HTTPException(400, detail="Invalid location")
 
-    output = search_object(object_name=query, coords=coords)
+    if approximate:
+        return approximate_response(request, query, coords, offline=False)
+
+    cached_data = get_cached_ephemeris(query, coords)
+    if cached_data is not None:
+        return ephemeris_response(request, cached_data)
+
+    if EPHEMERIS_STORE_ENABLED:
+        stored_data = stored_ephemeris(query, coords, require_details=True)
+        if stored_data is not None:
+            return ephemeris_response(request, stored_data, source="segment-store")
+
+    try:
+        output = search_object(object_name=query, coords=coords)
+    except httpx.HTTPError:
+        return approximate_response(request, query, coords, offline=True)
 
     try:
         data = parse_horizons_ephemeris(output)
@@ -32,17 +125,183 @@ def fetch_object(
     except UpstreamServiceError:
         raise HTTPException(503, detail="Upstream Horizons service error")
 
-    if isinstance(data, list):
-        output_list = []
-
-        for item in data:
-            new_item = HorizonsMatchObject(**item).model_dump(exclude_none=True)
-            output_list.append(new_item)
-
-        return output_list
+    if isinstance(data, (list, MatchTable)):
+        return match_list_response(request, data)
     elif isinstance(data, dict):
-        return HorizonsEphemerisResponse(**data)
+        remember_object_alias(query, data["object_id"])
+        if EPHEMERIS_STORE_ENABLED:
+            remember_object_details(data["object_id"], data)
+        return ephemeris_response(request, data)
     else:
         raise HTTPException(
             status.HTTP_502_BAD_GATEWAY, detail="Unexpected Horizons response"
         )
+
+
+@horizons_router.get(
+    "/visibility", response_model=HorizonsVisibilityResponse, status_code=200
+)
+def fetch_visibility(
+    query: str | int,
+    location: str,
+    elevation: float | None = None,
+    observing_date: date | None = None,
+    min_altitude: float = 0.0,
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        coords = get_coords(location, elevation)
+    except InvalidLocationError:
+        raise HTTPException(400, detail="Invalid location")
+
+    try:
+        visibility = get_visibility(query, coords, min_altitude, observing_date)
+    except ObjectNotFoundError:
+        raise HTTPException(404, detail="Object not found")
+    except EphemerisDataMissing:
+        raise HTTPException(404, detail="No ephemeris data available for this object")
+    except AmbiguousObjectError:
+        raise HTTPException(
+            400, detail="Multiple objects match this query, use a unique object ID"
+        )
+    except UpstreamServiceError:
+        raise HTTPException(503, detail="Upstream Horizons service error")
+
+    return visibility
+
+
+@horizons_router.get("/sky", response_model=SkySummaryResponse, status_code=200)
+def fetch_sky_summary(
+    location: str,
+    elevation: float | None = None,
+    current_user: User = Depends(get_current_user),
+):
+    try:
+        coords = get_coords(location, elevation)
+    except InvalidLocationError:
+        raise HTTPException(400, detail="Invalid location")
+
+    summary = get_sky_summary(coords)
+
+    if not summary["objects"]:
+        raise HTTPException(503, detail="Upstream Horizons service error")
+
+    return summary
+
+
+@horizons_router.get(
+    "/cache-stats", response_model=SiteCacheStatsResponse, status_code=200
+)
+def fetch_site_cache_stats(current_user: User = Depends(get_current_user)):
+    return SiteCacheStatsResponse(
+        active_level=site_quantizer.spec,
+        error_bound_deg=site_quantizer.error_bound_deg,
+        levels=get_site_cache_stats(),
+    )
+
+
+@horizons_router.get("/places", response_model=list[PlaceMatch], status_code=200)
+def search_places(
+    query: str,
+    limit: int = Query(10, ge=1, le=50),
+    current_user: User = Depends(get_current_user),
+):
+    gazetteer = get_gazetteer()
+
+    if gazetteer is None:
+        raise HTTPException(503, detail="Gazetteer not configured")
+
+    places = gazetteer.search(query, limit)
+
+    if not places:
+        places = gazetteer.fuzzy_search(query, limit)
+
+    return places
+
+
+async def stream_positions(websocket: WebSocket, feed: TrackFeed, interval: float):
+    async def send_positions():
+        while True:
+            position = feed.position(datetime.now(timezone.utc))
+            if position is not None:
+                await websocket.send_json(position)
+            await asyncio.sleep(interval)
+
+    async def receive_until_disconnect():
+        try:
+            while True:
+                await websocket.receive_text()
+        except WebSocketDisconnect:
+            pass
+
+    tasks = [
+        asyncio.create_task(send_positions()),
+        asyncio.create_task(receive_until_disconnect()),
+    ]
+    done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+    for task in pending:
+        task.cancel()
+    for task in done:
+        exception = task.exception()
+        if exception is not None and not isinstance(exception, WebSocketDisconnect):
+            raise exception
+
+
+@horizons_router.websocket("/track")
+async def track_object(
+    websocket: WebSocket,
+    query: str,
+    location: str,
+    elevation: float | None = None,
+    interval: float = Query(1.0, ge=TRACK_MIN_INTERVAL_SECONDS, le=60),
+    current_user: User | None = Depends(get_websocket_user),
+):
+    await websocket.accept()
+
+    if current_user is None:
+        await websocket.close(
+            status.WS_1008_POLICY_VIOLATION, reason="Could not validate credentials"
+        )
+        return
+
+    try:
+        coords = await run_in_threadpool(get_coords, location, elevation)
+        feed = await run_in_threadpool(tracking_hub.subscribe, query, coords)
+    except InvalidLocationError:
+        await websocket.close(
+            status.WS_1008_POLICY_VIOLATION, reason="Invalid location"
+        )
+        return
+    except ObjectNotFoundError:
+        await websocket.close(
+            status.WS_1008_POLICY_VIOLATION, reason="Object not found"
+        )
+        return
+    except EphemerisDataMissing:
+        await websocket.close(
+            status.WS_1008_POLICY_VIOLATION,
+            reason="No ephemeris data available for this object",
+        )
+        return
+    except AmbiguousObjectError:
+        await websocket.close(
+            status.WS_1008_POLICY_VIOLATION,
+            reason="Multiple objects match this query, use a unique object ID",
+        )
+        return
+    except (httpx.HTTPError, UpstreamServiceError):
+        await websocket.close(
+            status.WS_1013_TRY_AGAIN_LATER, reason="Upstream Horizons service error"
+        )
+        return
+    except (ValueError, IndexError):
+        await websocket.close(
+            status.WS_1011_INTERNAL_ERROR, reason="Unexpected Horizons response"
+        )
+        return
+
+    try:
+        await stream_positions(websocket, feed, interval)
+    finally:
+        tracking_hub.unsubscribe(feed)
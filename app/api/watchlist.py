@@ -0,0 +1,50 @@
+from fastapi import APIRouter, status, Depends, HTTPException, Response
+from sqlalchemy.orm import Session
+from app.schemas.watchlist import WatchlistItemIn, WatchlistItemOut
+import app.services.watchlist as watchlist
+from app.services.auth import get_current_user
+from app.db.session import get_session
+from app.models.auth import User
+from app.services.profiling import ProfiledRoute
+
+watchlist_router = APIRouter(prefix="/watchlist", route_class=ProfiledRoute)
+
+
+@watchlist_router.get("", response_model=list[WatchlistItemOut], status_code=200)
+def list_watchlist(
+    current_user: User = Depends(get_current_user),
+    current_session: Session = Depends(get_session),
+):
+    return watchlist.get_watchlist(current_user.id, current_session)
+
+
+@watchlist_router.post(
+    "", response_model=WatchlistItemOut, status_code=status.HTTP_201_CREATED
+)
+def add_to_watchlist(
+    item_in: WatchlistItemIn,
+    current_user: User = Depends(get_current_user),
+    current_session: Session = Depends(get_session),
+):
+    item = watchlist.get_watchlist_item(current_user.id, item_in, current_session)
+
+    if item:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Object already watched"
+        )
+
+    return watchlist.add_watchlist_item(current_user.id, item_in, current_session)
+
+
+@watchlist_router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
+def remove_from_watchlist(
+    item_id: int,
+    current_user: User = Depends(get_current_user),
+    current_session: Session = Depends(get_session),
+):
+    deleted = watchlist.delete_watchlist_item(current_user.id, item_id, current_session)
+
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Watchlist item not found")
+
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
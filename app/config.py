@@ -7,3 +7,58 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = float(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 10080))
 DB_URL = os.getenv("DB_URL", "sqlite:///skyarchive.db")
+GEOCODE_CACHE_TTL_SECONDS = float(os.getenv("GEOCODE_CACHE_TTL_SECONDS", 86400))
+WATCHLIST_REFRESH_ENABLED = os.getenv("WATCHLIST_REFRESH_ENABLED", "false") == "true"
+WATCHLIST_REFRESH_INTERVAL_SECONDS = float(
+    os.getenv("WATCHLIST_REFRESH_INTERVAL_SECONDS", 600)
+)
+WATCHLIST_PREFETCH_MINUTES = int(os.getenv("WATCHLIST_PREFETCH_MINUTES", 30))
+OBJECT_ALIAS_TTL_SECONDS = float(os.getenv("OBJECT_ALIAS_TTL_SECONDS", 3600))
+HORIZONS_MAX_REQUESTS_PER_SECOND = float(
+    os.getenv("HORIZONS_MAX_REQUESTS_PER_SECOND", 1)
+)
+VISIBILITY_STEP_MINUTES = int(os.getenv("VISIBILITY_STEP_MINUTES", 10))
+VISIBILITY_CACHE_TTL_SECONDS = float(os.getenv("VISIBILITY_CACHE_TTL_SECONDS", 21600))
+SKY_SUMMARY_BODIES = os.getenv(
+    "SKY_SUMMARY_BODIES", "199,299,301,499,599,699,799,899"
+).split(",")
+SKY_SUMMARY_BUCKET_MINUTES = int(os.getenv("SKY_SUMMARY_BUCKET_MINUTES", 10))
+SKY_SUMMARY_DEGRADED_TTL_SECONDS = float(
+    os.getenv("SKY_SUMMARY_DEGRADED_TTL_SECONDS", 30)
+)
+SKY_SUMMARY_MAX_WORKERS = int(os.getenv("SKY_SUMMARY_MAX_WORKERS", 8))
+SITE_QUANTIZATION = os.getenv("SITE_QUANTIZATION", "grid:1")
+SITE_ELEVATION_BAND_KM = float(os.getenv("SITE_ELEVATION_BAND_KM", 0.1))
+SITE_CELL_QUANTIZATION = os.getenv("SITE_CELL_QUANTIZATION", "grid:6")
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true") == "true"
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", 50))
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_PATH = os.getenv("CACHE_PATH", "skyarchive_cache.db")
+ELEMENTS_CACHE_TTL_SECONDS = float(os.getenv("ELEMENTS_CACHE_TTL_SECONDS", 86400))
+EPHEMERIS_STORE_ENABLED = os.getenv("EPHEMERIS_STORE_ENABLED", "false") == "true"
+EPHEMERIS_STORE_DIR = os.getenv("EPHEMERIS_STORE_DIR", "ephemeris_store")
+EPHEMERIS_STORE_DAYS = int(os.getenv("EPHEMERIS_STORE_DAYS", 28))
+EPHEMERIS_STORE_MIN_REMAINING_DAYS = float(
+    os.getenv("EPHEMERIS_STORE_MIN_REMAINING_DAYS", 7)
+)
+EPHEMERIS_STORE_STEP_MINUTES = int(os.getenv("EPHEMERIS_STORE_STEP_MINUTES", 60))
+EPHEMERIS_SEGMENT_DAYS = int(os.getenv("EPHEMERIS_SEGMENT_DAYS", 1))
+EPHEMERIS_SEGMENT_DEGREE = int(os.getenv("EPHEMERIS_SEGMENT_DEGREE", 12))
+EPHEMERIS_DETAILS_TTL_SECONDS = float(os.getenv("EPHEMERIS_DETAILS_TTL_SECONDS", 3600))
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH")
+GAZETTEER_MIN_POPULATION = int(os.getenv("GAZETTEER_MIN_POPULATION", 0))
+MATCH_LIST_MAX_AGE_SECONDS = int(os.getenv("MATCH_LIST_MAX_AGE_SECONDS", 86400))
+TRACK_REFRESH_MINUTES = int(os.getenv("TRACK_REFRESH_MINUTES", 10))
+TRACK_MIN_INTERVAL_SECONDS = float(os.getenv("TRACK_MIN_INTERVAL_SECONDS", 0.2))
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", 6))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", 24))
+ADMISSION_BUDGET_SECONDS = float(os.getenv("ADMISSION_BUDGET_SECONDS", 10))
+ADMISSION_INITIAL_SERVICE_SECONDS = float(
+    os.getenv("ADMISSION_INITIAL_SERVICE_SECONDS", 2)
+)
+RAW_ARCHIVE_ENABLED = os.getenv("RAW_ARCHIVE_ENABLED", "false") == "true"
+RAW_ARCHIVE_PATH = os.getenv("RAW_ARCHIVE_PATH", "skyarchive_raw.db")
+RAW_ARCHIVE_COMPRESSION_LEVEL = int(os.getenv("RAW_ARCHIVE_COMPRESSION_LEVEL", 6))
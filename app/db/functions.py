@@ -0,0 +1,72 @@
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from sqlalchemy.types import Date, Float
+
+
+class night_date(FunctionElement):
+    type = Date()
+    inherit_cache = True
+    name = "night_date"
+
+    def __init__(self, column, offset_hours: int):
+        self.offset_hours = int(offset_hours)
+        super().__init__(column)
+
+
+class days_since_night(FunctionElement):
+    type = Float()
+    inherit_cache = True
+    name = "days_since_night"
+
+    def __init__(self, column, offset_hours: int):
+        self.offset_hours = int(offset_hours)
+        super().__init__(column)
+
+
+def _column(element, compiler, **kw) -> str:
+    return compiler.process(list(element.clauses)[0], **kw)
+
+
+@compiles(night_date, "sqlite")
+def _sqlite_night_date(element, compiler, **kw):
+    return f"date({_column(element, compiler, **kw)}, '-{element.offset_hours} hours')"
+
+
+@compiles(night_date, "postgresql")
+def _postgresql_night_date(element, compiler, **kw):
+    column = _column(element, compiler, **kw)
+
+    return f"CAST({column} - INTERVAL '{element.offset_hours} hours' AS DATE)"
+
+
+@compiles(night_date, "mysql")
+def _mysql_night_date(element, compiler, **kw):
+    column = _column(element, compiler, **kw)
+
+    return f"DATE({column} - INTERVAL {element.offset_hours} HOUR)"
+
+
+@compiles(days_since_night, "sqlite")
+def _sqlite_days_since_night(element, compiler, **kw):
+    column = _column(element, compiler, **kw)
+
+    return (
+        f"(julianday({column}) - "
+        f"julianday(date({column}, '-{element.offset_hours} hours')))"
+    )
+
+
+@compiles(days_since_night, "postgresql")
+def _postgresql_days_since_night(element, compiler, **kw):
+    column = _column(element, compiler, **kw)
+    night = f"CAST({column} - INTERVAL '{element.offset_hours} hours' AS DATE)"
+
+    return f"(EXTRACT(EPOCH FROM {column} - {night}) / 86400.0)"
+
+
+@compiles(days_since_night, "mysql")
+def _mysql_days_since_night(element, compiler, **kw):
+    column = _column(element, compiler, **kw)
+    night = f"DATE({column} - INTERVAL {element.offset_hours} HOUR)"
+
+    return f"(TIMESTAMPDIFF(MICROSECOND, {night}, {column}) / 86400000000.0)"
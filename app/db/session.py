@@ -2,7 +2,9 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.config import DB_URL
 from app.db.base import Base
-
+import app.models.auth  # noqa: F401
+import app.models.archive  # noqa: F401
+import app.models.watchlist  # noqa: F401
 
 engine = create_engine(DB_URL, echo=True)
 
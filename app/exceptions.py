@@ -12,3 +12,23 @@ class UpstreamServiceError(Exception):
 
 class EphemerisDataMissing(Exception):
     pass
+
+
+class InvalidCursorError(Exception):
+    pass
+
+
+class InvalidFieldError(Exception):
+    pass
+
+
+class AmbiguousObjectError(Exception):
+    pass
+
+
+class RequestShedError(Exception):
+    def __init__(self, status_code: int, detail: str, retry_after: int):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+        self.retry_after = retry_after
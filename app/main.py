@@ -1,9 +1,38 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.api.auth import auth_router
 from app.api.horizons import horizons_router
+from app.api.archive import archive_router
+from app.api.watchlist import watchlist_router
+from app.api.metrics import metrics_router
+from app.api.admin import admin_router
+from app.config import WATCHLIST_REFRESH_ENABLED
+from app.services.gazetteer import start_gazetteer_loading
+from app.services.refresher import watchlist_refresher
+from app.services.profiling import profiling_middleware
+from app.services.tracking import tracking_hub
 
 
-app = FastAPI(title="SkyArchive")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_gazetteer_loading()
+    if WATCHLIST_REFRESH_ENABLED:
+        watchlist_refresher.start()
+    tracking_hub.start()
+
+    yield
+
+    tracking_hub.stop()
+    watchlist_refresher.stop()
+
+
+app = FastAPI(title="SkyArchive", lifespan=lifespan)
+
+app.middleware("http")(profiling_middleware)
 
 app.include_router(auth_router)
 app.include_router(horizons_router)
+app.include_router(archive_router)
+app.include_router(watchlist_router)
+app.include_router(metrics_router)
+app.include_router(admin_router)
@@ -0,0 +1,32 @@
+from sqlalchemy import String, ForeignKey, Index
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from datetime import datetime, timezone
+from app.db.base import Base
+
+
+class Observation(Base):
+    __tablename__ = "observations"
+    __table_args__ = (
+        Index("ix_observations_user_observed_id", "user_id", "observed_at", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    object_name: Mapped[str] = mapped_column(String(length=100), nullable=False)
+    object_id: Mapped[str] = mapped_column(String(length=50), nullable=False)
+    observed_at: Mapped[datetime] = mapped_column(nullable=False)
+    site: Mapped[str | None] = mapped_column(String(length=100))
+    azimuth_deg: Mapped[float | None]
+    altitude_deg: Mapped[float | None]
+    apparent_magnitude: Mapped[float | None]
+    surface_brightness: Mapped[float | None]
+    illumination_percent: Mapped[float | None]
+    angular_diameter_arcsec: Mapped[float | None]
+    sun_distance_au: Mapped[float | None]
+    earth_distance_au: Mapped[float | None]
+    solar_elong_deg: Mapped[float | None]
+    constellation: Mapped[str | None] = mapped_column(String(length=10))
+    created_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc), nullable=False
+    )
@@ -0,0 +1,21 @@
+from sqlalchemy import String, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped
+from sqlalchemy.orm import mapped_column
+from datetime import datetime, timezone
+from app.db.base import Base
+
+
+class WatchlistItem(Base):
+    __tablename__ = "watchlist_items"
+    __table_args__ = (
+        UniqueConstraint("user_id", "object_id", "location", "elevation"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"), nullable=False)
+    object_id: Mapped[str] = mapped_column(String(length=50), nullable=False)
+    location: Mapped[str] = mapped_column(String(length=100), nullable=False)
+    elevation: Mapped[float | None]
+    created_at: Mapped[datetime] = mapped_column(
+        default=lambda: datetime.now(timezone.utc), nullable=False
+    )
@@ -1,3 +1,5 @@
+import re
+
 horizons_grammar = [
     ("Date__(UT)__HR:MN", 2),
     ("R.A._____(ICRF)_____DEC", 6),
@@ -81,4 +83,7 @@ horizons_grammar = [
     ("UT1-UTC", 1),
 ]
 
-DROP_TOKENS = {"*m", "/T", "/L", "Cm", "C", "m", "Nm", "*"}
+DATE_TOKENS = 2
+MAX_MARKER_TOKENS = 2
+PRESENCE_MARKER = re.compile(r"[*CNA]?m?[rtse]?")
+DROP_TOKENS = {"/T", "/L"}
@@ -0,0 +1,113 @@
+from collections.abc import Iterator, Sequence
+from datetime import datetime, timezone
+import numpy as np
+
+MISSING_VALUE = "n.a."
+
+
+class EphemerisSeries(Sequence):
+    __slots__ = ("source", "object_name", "object_id", "columns", "length", "_floats")
+
+    def __init__(
+        self, source: str, object_name: str, object_id: str, fields: Sequence[str]
+    ):
+        self.source = source
+        self.object_name = object_name
+        self.object_id = object_id
+        self.columns: dict[str, list[str | None]] = {field: [] for field in fields}
+        self.length = 0
+        self._floats: dict[str, np.ndarray] = {}
+
+    def append(self, values: Sequence[str | None]) -> None:
+        for column, value in zip(self.columns.values(), values):
+            column.append(None if value == MISSING_VALUE else value)
+        self.length += 1
+        self._floats.clear()
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Ephemeris row out of range")
+
+        return self.row(index)
+
+    def __iter__(self) -> Iterator[dict]:
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def row(self, index: int) -> dict:
+        row = {
+            "source": self.source,
+            "object_name": self.object_name,
+            "object_id": self.object_id,
+        }
+        for field, values in self.columns.items():
+            row[field] = values[index]
+
+        return row
+
+    def column(self, field: str) -> list[str | None]:
+        return self.columns.get(field, [None] * len(self))
+
+    def floats(self, field: str) -> np.ndarray:
+        values = self._floats.get(field)
+
+        if values is None:
+            values = self._floats[field] = np.array(
+                [np.nan if value is None else value for value in self.column(field)],
+                dtype=np.float64,
+            )
+
+        return values
+
+    def timestamps(self, time_format: str) -> np.ndarray:
+        return np.array(
+            [
+                datetime.strptime(value, time_format)
+                .replace(tzinfo=timezone.utc)
+                .timestamp()
+                for value in self.column("date")
+            ],
+            dtype=np.float64,
+        )
+
+
+class MatchTable(Sequence):
+    __slots__ = ("columns", "length")
+
+    def __init__(self, fields: Sequence[str]):
+        self.columns: dict[str, list[str]] = {field: [] for field in fields}
+        self.length = 0
+
+    def append(self, values: Sequence[str]) -> None:
+        for column, value in zip(self.columns.values(), values):
+            column.append(value)
+        self.length += 1
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.row(i) for i in range(*index.indices(len(self)))]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Match row out of range")
+
+        return self.row(index)
+
+    def __iter__(self) -> Iterator[dict]:
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def row(self, index: int) -> dict:
+        return {field: values[index] for field, values in self.columns.items()}
@@ -0,0 +1,163 @@
+import argparse
+import json
+import multiprocessing
+import time
+from collections import Counter
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from app.config import RAW_ARCHIVE_PATH
+from app.services.payload_archive import PayloadArchive
+from app.services.horizons import parse_horizons_ephemeris
+from app.services.horizons import parse_horizons_ephemeris_series
+from app.services.horizons import parse_horizons_elements, parse_horizons_vectors
+
+PARSERS = {
+    "ephemeris": parse_horizons_ephemeris,
+    "series": parse_horizons_ephemeris_series,
+    "elements": parse_horizons_elements,
+    "vectors": parse_horizons_vectors,
+}
+DEFAULT_PARSERS = {"OBSERVER": "series", "ELEMENTS": "elements", "VECTORS": "vectors"}
+REPLAY_CHUNK_SIZE = 64
+
+_worker_archive: PayloadArchive | None = None
+
+
+def _init_worker(archive_path: str) -> None:
+    global _worker_archive
+    _worker_archive = PayloadArchive(archive_path)
+
+
+def _to_jsonable(value):
+    if isinstance(value, dict):
+        return value
+    if isinstance(value, Sequence) and not isinstance(value, str):
+        return list(value)
+
+    return value
+
+
+def _json_default(value):
+    if hasattr(value, "tolist"):
+        return value.tolist()
+
+    return str(value)
+
+
+def replay_chunk(
+    items: list[tuple[str, str]], parser_name: str | None, keep_results: bool
+) -> tuple[dict, list]:
+    outcomes = Counter()
+    results = []
+
+    for payload_hash, kind in items:
+        payload = _worker_archive.load(payload_hash)
+        parse = PARSERS[parser_name or DEFAULT_PARSERS.get(kind, "ephemeris")]
+
+        try:
+            parsed = parse(payload)
+        except Exception as e:
+            outcomes[type(e).__name__] += 1
+            continue
+
+        outcomes["ok"] += 1
+        if keep_results:
+            results.append((payload_hash, _to_jsonable(parsed)))
+
+    return dict(outcomes), results
+
+
+def replay_archive(
+    archive_path: str,
+    parser_name: str | None = None,
+    workers: int | None = None,
+    output_path: str | None = None,
+    **filters,
+) -> dict:
+    archive = PayloadArchive(archive_path)
+
+    items = {}
+    for reference in archive.find(**filters):
+        items.setdefault(reference["payload_hash"], reference["kind"])
+    items = list(items.items())
+
+    chunks = [
+        items[index : index + REPLAY_CHUNK_SIZE]
+        for index in range(0, len(items), REPLAY_CHUNK_SIZE)
+    ]
+
+    outcomes = Counter()
+    start = time.perf_counter()
+    output_file = open(output_path, "w") if output_path else None
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(archive_path,),
+        ) as executor:
+            for chunk_outcomes, results in executor.map(
+                replay_chunk,
+                chunks,
+                [parser_name] * len(chunks),
+                [output_file is not None] * len(chunks),
+            ):
+                outcomes.update(chunk_outcomes)
+
+                for payload_hash, parsed in results:
+                    output_file.write(
+                        json.dumps(
+                            {"payload_hash": payload_hash, "result": parsed},
+                            default=_json_default,
+                        )
+                        + "\n"
+                    )
+    finally:
+        if output_file is not None:
+            output_file.close()
+
+    seconds = time.perf_counter() - start
+
+    return {
+        "payloads": len(items),
+        "outcomes": dict(outcomes),
+        "seconds": seconds,
+        "payloads_per_second": len(items) / seconds if seconds else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Re-parse archived Horizons payloads in bulk."
+    )
+    parser.add_argument("--archive", default=RAW_ARCHIVE_PATH)
+    parser.add_argument("--parser", choices=sorted(PARSERS))
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--output", help="write parsed results as JSON lines")
+    parser.add_argument("--object-id")
+    parser.add_argument("--site")
+    parser.add_argument("--kind", choices=sorted(DEFAULT_PARSERS))
+    parser.add_argument("--start", type=datetime.fromisoformat)
+    parser.add_argument("--stop", type=datetime.fromisoformat)
+    args = parser.parse_args()
+
+    summary = replay_archive(
+        args.archive,
+        parser_name=args.parser,
+        workers=args.workers,
+        output_path=args.output,
+        object_id=args.object_id,
+        site=args.site,
+        start_time=args.start,
+        stop_time=args.stop,
+        kind=args.kind,
+    )
+    summary["archive"] = PayloadArchive(args.archive).stats()
+
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+from datetime import date, datetime
+
+
+class ObservationIn(BaseModel):
+    object_name: str
+    object_id: str
+    observed_at: datetime
+    site: str | None = None
+    azimuth_deg: float | None = None
+    altitude_deg: float | None = None
+    apparent_magnitude: float | None = None
+    surface_brightness: float | None = None
+    illumination_percent: float | None = None
+    angular_diameter_arcsec: float | None = None
+    sun_distance_au: float | None = None
+    earth_distance_au: float | None = None
+    solar_elong_deg: float | None = None
+    constellation: str | None = None
+
+
+class ObservationOut(ObservationIn):
+    id: int
+    created_at: datetime
+
+
+class ObservationPage(BaseModel):
+    items: list[dict]
+    next_cursor: str | None = None
+
+
+class NightlySummary(BaseModel):
+    object_id: str
+    night: date
+    observation_count: int
+    min_altitude_deg: float | None = None
+    max_altitude_deg: float | None = None
+    mean_magnitude: float | None = None
+    magnitude_trend_per_day: float | None = None
@@ -1,3 +1,4 @@
+from datetime import date, datetime
 from pydantic import BaseModel
 
 
@@ -23,3 +24,67 @@ class HorizonsMatchObject(BaseModel):
     epoch_year: int | None = None
     designation: str | None = None
     aliases: str | None = None
+
+
+class VisibilityWindow(BaseModel):
+    start: datetime
+    end: datetime
+    max_altitude_deg: float
+
+
+class HorizonsVisibilityResponse(BaseModel):
+    object_name: str
+    object_id: str
+    date: date
+    min_altitude_deg: float
+    rise_time: datetime | None = None
+    rise_azimuth_deg: float | None = None
+    transit_time: datetime | None = None
+    transit_altitude_deg: float | None = None
+    transit_azimuth_deg: float | None = None
+    set_time: datetime | None = None
+    set_azimuth_deg: float | None = None
+    windows: list[VisibilityWindow] = []
+
+
+class SkySummaryObject(BaseModel):
+    object_name: str
+    object_id: str
+    date: str
+    azimuth_deg: float | None = None
+    altitude_deg: float | None = None
+    apparent_magnitude: float | None = None
+    constellation: str | None = None
+
+
+class SkySummaryResponse(BaseModel):
+    site: str
+    bucket_start: datetime
+    objects: list[SkySummaryObject]
+    unavailable: list[str] = []
+
+
+class SiteCacheStats(BaseModel):
+    hits: int
+    misses: int
+    hit_rate: float
+
+
+class QuantizationLevelStats(BaseModel):
+    level: str
+    error_bound_deg: float
+    caches: dict[str, SiteCacheStats]
+
+
+class SiteCacheStatsResponse(BaseModel):
+    active_level: str
+    error_bound_deg: float
+    levels: list[QuantizationLevelStats]
+
+
+class PlaceMatch(BaseModel):
+    name: str
+    country_code: str
+    latitude: float
+    longitude: float
+    population: int
@@ -0,0 +1,13 @@
+from pydantic import BaseModel
+from datetime import datetime
+
+
+class WatchlistItemIn(BaseModel):
+    object_id: str
+    location: str
+    elevation: float | None = None
+
+
+class WatchlistItemOut(WatchlistItemIn):
+    id: int
+    created_at: datetime
@@ -0,0 +1,155 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Callable
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from app.config import ADMISSION_MAX_CONCURRENT, ADMISSION_MAX_QUEUE
+from app.config import ADMISSION_BUDGET_SECONDS, ADMISSION_INITIAL_SERVICE_SECONDS
+from app.exceptions import RequestShedError
+from app.services.metrics import admission_in_flight, admission_queue_depth
+from app.services.metrics import requests_shed
+from app.services.profiling import ProfiledRoute
+
+BUDGET_HEADER = "X-Request-Budget"
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        route: str,
+        max_concurrent: int = ADMISSION_MAX_CONCURRENT,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        initial_service_seconds: float = ADMISSION_INITIAL_SERVICE_SECONDS,
+    ):
+        self.route = route
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.active = 0
+        self.service_seconds = initial_service_seconds
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def estimated_wait(self, queue_position: int) -> float:
+        return (queue_position // self.max_concurrent + 1) * self.service_seconds
+
+    def _shed(self, status_code: int, detail: str, reason: str) -> RequestShedError:
+        requests_shed.inc(route=self.route, reason=reason)
+        retry_after = max(1, math.ceil(self.estimated_wait(len(self._waiters))))
+
+        return RequestShedError(status_code, detail, retry_after)
+
+    def _record_sizes(self) -> None:
+        admission_in_flight.set(self.active, route=self.route)
+        admission_queue_depth.set(len(self._waiters), route=self.route)
+
+    async def acquire(self, budget_seconds: float) -> None:
+        loop = asyncio.get_running_loop()
+
+        with self._lock:
+            if self.active < self.max_concurrent and not self._waiters:
+                self.active += 1
+                self._record_sizes()
+                return
+
+            if len(self._waiters) >= self.max_queue:
+                raise self._shed(429, "Too many concurrent requests", "queue_full")
+
+            if self.estimated_wait(len(self._waiters)) > budget_seconds:
+                raise self._shed(503, "Server is overloaded", "deadline")
+
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+            self._record_sizes()
+
+        try:
+            await asyncio.wait_for(waiter[1], budget_seconds)
+        except BaseException as e:
+            with self._lock:
+                queued = waiter in self._waiters
+                if queued:
+                    self._waiters.remove(waiter)
+                    self._record_sizes()
+
+            if not queued and isinstance(e, TimeoutError):
+                return
+            if not queued:
+                self.release()
+            if queued and isinstance(e, TimeoutError):
+                raise self._shed(503, "Server is overloaded", "queue_timeout")
+            raise
+
+    def release(self, service_seconds: float | None = None) -> None:
+        with self._lock:
+            if service_seconds is not None:
+                self.service_seconds += SERVICE_TIME_SMOOTHING * (
+                    service_seconds - self.service_seconds
+                )
+
+            if self._waiters:
+                loop, future = self._waiters.popleft()
+                loop.call_soon_threadsafe(_wake, future)
+            else:
+                self.active -= 1
+
+            self._record_sizes()
+
+    @asynccontextmanager
+    async def admit(self, budget_seconds: float = ADMISSION_BUDGET_SECONDS):
+        await self.acquire(budget_seconds)
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - start)
+
+
+def request_budget(request: Request) -> float:
+    try:
+        budget_seconds = float(request.headers.get(BUDGET_HEADER, ""))
+    except ValueError:
+        return ADMISSION_BUDGET_SECONDS
+
+    if not 0 < budget_seconds < ADMISSION_BUDGET_SECONDS:
+        return ADMISSION_BUDGET_SECONDS
+
+    return budget_seconds
+
+
+admission_controllers: dict[str, AdmissionController] = {}
+
+
+class AdmissionRoute(ProfiledRoute):
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        self.admission = admission_controllers[path] = AdmissionController(path)
+        super().__init__(path, endpoint, **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        route_handler = super().get_route_handler()
+
+        async def admitted_route_handler(request: Request):
+            try:
+                async with self.admission.admit(request_budget(request)):
+                    return await route_handler(request)
+            except RequestShedError as e:
+                return JSONResponse(
+                    {"detail": e.detail},
+                    status_code=e.status_code,
+                    headers={"Retry-After": str(e.retry_after)},
+                )
+
+        return admitted_route_handler
@@ -0,0 +1,170 @@
+import base64
+from datetime import datetime, timezone
+from sqlalchemy import select, func, case, tuple_
+from sqlalchemy.orm import Session
+from app.db.functions import night_date, days_since_night
+from app.models.archive import Observation
+from app.schemas.archive import ObservationIn
+from app.exceptions import InvalidCursorError, InvalidFieldError
+
+PROJECTABLE_FIELDS = (
+    "id",
+    "object_name",
+    "object_id",
+    "observed_at",
+    "site",
+    "azimuth_deg",
+    "altitude_deg",
+    "apparent_magnitude",
+    "surface_brightness",
+    "illumination_percent",
+    "angular_diameter_arcsec",
+    "sun_distance_au",
+    "earth_distance_au",
+    "solar_elong_deg",
+    "constellation",
+    "created_at",
+)
+CURSOR_FIELDS = ("id", "observed_at")
+NIGHT_OFFSET_HOURS = 12
+
+
+def _to_naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return value
+
+
+def encode_cursor(observed_at: datetime, observation_id: int) -> str:
+    raw_cursor = f"{observed_at.isoformat()}|{observation_id}"
+
+    return base64.urlsafe_b64encode(raw_cursor.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw_cursor = base64.urlsafe_b64decode(cursor.encode()).decode()
+        raw_observed_at, raw_id = raw_cursor.split("|")
+        observed_at = datetime.fromisoformat(raw_observed_at)
+        observation_id = int(raw_id)
+    except ValueError:
+        raise InvalidCursorError("Invalid cursor")
+
+    return _to_naive_utc(observed_at), observation_id
+
+
+def create_observation(
+    user_id: int, observation_in: ObservationIn, session_instance: Session
+) -> Observation:
+    observation_data = observation_in.model_dump()
+    observation_data["observed_at"] = _to_naive_utc(observation_in.observed_at)
+
+    new_observation = Observation(user_id=user_id, **observation_data)
+
+    session_instance.add(new_observation)
+    session_instance.commit()
+    session_instance.refresh(new_observation)
+
+    return new_observation
+
+
+def list_observations(
+    user_id: int,
+    session_instance: Session,
+    limit: int,
+    cursor: str | None = None,
+    object_id: str | None = None,
+    fields: list[str] | None = None,
+) -> tuple[list[dict], str | None]:
+    if fields:
+        unknown_fields = [field for field in fields if field not in PROJECTABLE_FIELDS]
+        if unknown_fields:
+            raise InvalidFieldError(f"Unknown fields: {', '.join(unknown_fields)}")
+
+        requested_fields = list(dict.fromkeys(fields))
+    else:
+        requested_fields = list(PROJECTABLE_FIELDS)
+
+    selected_fields = list(dict.fromkeys([*CURSOR_FIELDS, *requested_fields]))
+
+    columns = [getattr(Observation, field) for field in selected_fields]
+
+    stmt = select(*columns).where(Observation.user_id == user_id)
+
+    if object_id is not None:
+        stmt = stmt.where(Observation.object_id == object_id)
+
+    if cursor is not None:
+        cursor_observed_at, cursor_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Observation.observed_at, Observation.id)
+            < tuple_(cursor_observed_at, cursor_id)
+        )
+
+    stmt = stmt.order_by(Observation.observed_at.desc(), Observation.id.desc())
+    stmt = stmt.limit(limit + 1)
+
+    rows = session_instance.execute(stmt).all()
+
+    items = [
+        {field: row._mapping[field] for field in requested_fields}
+        for row in rows[:limit]
+    ]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last_row = rows[limit - 1]
+        next_cursor = encode_cursor(last_row.observed_at, last_row.id)
+
+    return items, next_cursor
+
+
+def summarize_nights(
+    user_id: int,
+    session_instance: Session,
+    object_id: str | None = None,
+    start: datetime | None = None,
+    stop: datetime | None = None,
+) -> list[dict]:
+    night = night_date(Observation.observed_at, NIGHT_OFFSET_HOURS)
+    magnitude = Observation.apparent_magnitude
+
+    night_offset_days = days_since_night(Observation.observed_at, NIGHT_OFFSET_HOURS)
+    x = case((magnitude.is_not(None), night_offset_days))
+
+    n = func.count(magnitude)
+    sum_x = func.sum(x)
+    sum_y = func.sum(magnitude)
+    sum_xy = func.sum(x * magnitude)
+    sum_xx = func.sum(x * x)
+
+    magnitude_trend = (n * sum_xy - sum_x * sum_y) / func.nullif(
+        n * sum_xx - sum_x * sum_x, 0
+    )
+
+    stmt = select(
+        Observation.object_id,
+        night.label("night"),
+        func.count(Observation.id).label("observation_count"),
+        func.min(Observation.altitude_deg).label("min_altitude_deg"),
+        func.max(Observation.altitude_deg).label("max_altitude_deg"),
+        func.avg(magnitude).label("mean_magnitude"),
+        magnitude_trend.label("magnitude_trend_per_day"),
+    ).where(Observation.user_id == user_id)
+
+    if object_id is not None:
+        stmt = stmt.where(Observation.object_id == object_id)
+
+    if start is not None:
+        stmt = stmt.where(Observation.observed_at >= _to_naive_utc(start))
+
+    if stop is not None:
+        stmt = stmt.where(Observation.observed_at < _to_naive_utc(stop))
+
+    stmt = stmt.group_by(Observation.object_id, night)
+    stmt = stmt.order_by(night.desc(), Observation.object_id)
+
+    rows = session_instance.execute(stmt).all()
+
+    return [dict(row._mapping) for row in rows]
@@ -7,9 +7,10 @@ import jwt
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from fastapi.security import OAuth2PasswordBearer
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, WebSocket
 from jwt.exceptions import PyJWTError
 from app.db.session import get_session
+from app.services.metrics import stage_timer
 
 password_hash = PasswordHash.recommended()
 
@@ -68,7 +69,8 @@ def get_current_user(
 
     stmt = select(User).where(User.id == user_id)
 
-    current_user = session_instance.execute(stmt).scalar()
+    with stage_timer("auth_db"):
+        current_user = session_instance.execute(stmt).scalar()
 
     if not current_user:
         raise HTTPException(status_code=401, detail="Could not validate credentials")
@@ -86,3 +88,24 @@ def create_user(user_name: str, password: str, session_instance: Session) -> Use
     session_instance.refresh(new_user)
 
     return new_user
+
+
+def get_websocket_user(
+    websocket: WebSocket, session_instance: Session = Depends(get_session)
+) -> User | None:
+    token = websocket.query_params.get("token")
+    scheme, _, header_token = websocket.headers.get("authorization", "").partition(" ")
+    if token is None and scheme.lower() == "bearer":
+        token = header_token
+
+    if not token:
+        return None
+
+    try:
+        user_id = validate_access_token(token)
+    except PyJWTError:
+        return None
+
+    stmt = select(User).where(User.id == user_id)
+
+    return session_instance.execute(stmt).scalar()
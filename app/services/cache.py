@@ -0,0 +1,279 @@
+import itertools
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable
+from app.config import CACHE_BACKEND, CACHE_PATH
+from app.services.metrics import cache_lookups, count
+
+COALESCE_LOCK_TTL_SECONDS = 30.0
+COALESCE_POLL_SECONDS = 0.05
+
+
+class CacheBackend(ABC):
+    def __init__(self, name: str):
+        self.name = name
+
+    def get(self, key: Any) -> Any | None:
+        value = self._get(key)
+        count(
+            cache_lookups, cache=self.name, outcome="miss" if value is None else "hit"
+        )
+
+        return value
+
+    @abstractmethod
+    def set(self, key: Any, value: Any, ttl: float) -> None:
+        pass
+
+    @abstractmethod
+    def add(self, key: Any, value: Any, ttl: float) -> bool:
+        pass
+
+    @abstractmethod
+    def delete(self, key: Any) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def _get(self, key: Any) -> Any | None:
+        pass
+
+    def get_or_set(
+        self,
+        key: Any,
+        factory: Callable[[], Any],
+        ttl: float | Callable[[Any], float],
+        lock_ttl: float = COALESCE_LOCK_TTL_SECONDS,
+    ) -> Any:
+        value = self.get(key)
+
+        if value is not None:
+            return value
+
+        lock_key = ("lock", key)
+        deadline = time.monotonic() + lock_ttl
+
+        while time.monotonic() < deadline:
+            if self.add(lock_key, True, lock_ttl):
+                try:
+                    value = factory()
+                    self.set(key, value, ttl(value) if callable(ttl) else ttl)
+                    return value
+                finally:
+                    self.delete(lock_key)
+
+            time.sleep(COALESCE_POLL_SECONDS)
+
+            value = self._get(key)
+            if value is not None:
+                count(cache_lookups, cache=self.name, outcome="coalesced")
+                return value
+
+        return factory()
+
+
+class MemoryCacheBackend(CacheBackend):
+    def __init__(self, name: str, max_entries: int = 10000):
+        super().__init__(name)
+        self.max_entries = max_entries
+        self._entries: dict[Any, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key: Any) -> Any | None:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            return value
+
+    def set(self, key: Any, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._set(key, value, ttl)
+
+    def add(self, key: Any, value: Any, ttl: float) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] > time.monotonic():
+                return False
+
+            self._set(key, value, ttl)
+            return True
+
+    def delete(self, key: Any) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._evict_expired()
+            return len(self._entries)
+
+    def _set(self, key: Any, value: Any, ttl: float) -> None:
+        if key not in self._entries and len(self._entries) >= self.max_entries:
+            self._evict_expired()
+
+            if len(self._entries) >= self.max_entries:
+                oldest_key = next(iter(self._entries))
+                del self._entries[oldest_key]
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+
+    def _evict_expired(self) -> None:
+        now = time.monotonic()
+        expired_keys = [
+            key for key, (expires_at, _) in self._entries.items() if expires_at <= now
+        ]
+
+        for key in expired_keys:
+            del self._entries[key]
+
+
+class SQLiteCacheBackend(CacheBackend):
+    PURGE_EVERY_WRITES = 1000
+
+    def __init__(self, name: str, path: str):
+        super().__init__(name)
+        self.path = path
+        self._local = threading.local()
+        self._writes = itertools.count(1)
+
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "namespace TEXT NOT NULL, "
+            "key TEXT NOT NULL, "
+            "value TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, "
+            "PRIMARY KEY (namespace, key)"
+            ") WITHOUT ROWID"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at "
+            "ON cache_entries (expires_at)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+
+        return connection
+
+    @staticmethod
+    def _encode_key(key: Any) -> str:
+        return json.dumps(key, separators=(",", ":"))
+
+    def _get(self, key: Any) -> Any | None:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM cache_entries "
+                "WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (self.name, self._encode_key(key), time.time()),
+            )
+            .fetchone()
+        )
+
+        if row is None:
+            return None
+
+        return json.loads(row[0])
+
+    def set(self, key: Any, value: Any, ttl: float) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at) "
+            "VALUES (?, ?, ?, ?)",
+            (self.name, self._encode_key(key), json.dumps(value), time.time() + ttl),
+        )
+        self._after_write()
+
+    def add(self, key: Any, value: Any, ttl: float) -> bool:
+        now = time.time()
+        cursor = self._connection().execute(
+            "INSERT INTO cache_entries (namespace, key, value, expires_at) "
+            "VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (namespace, key) DO UPDATE SET "
+            "value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE cache_entries.expires_at <= ?",
+            (self.name, self._encode_key(key), json.dumps(value), now + ttl, now),
+        )
+        self._after_write()
+
+        return cursor.rowcount == 1
+
+    def delete(self, key: Any) -> None:
+        self._connection().execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.name, self._encode_key(key)),
+        )
+
+    def clear(self) -> None:
+        self._connection().execute(
+            "DELETE FROM cache_entries WHERE namespace = ?", (self.name,)
+        )
+
+    def __len__(self) -> int:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT COUNT(*) FROM cache_entries "
+                "WHERE namespace = ? AND expires_at > ?",
+                (self.name, time.time()),
+            )
+            .fetchone()
+        )
+
+        return row[0]
+
+    def _after_write(self) -> None:
+        if next(self._writes) % self.PURGE_EVERY_WRITES == 0:
+            self._connection().execute(
+                "DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)
+            )
+
+
+def create_cache(name: str) -> CacheBackend:
+    if CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(name)
+    elif CACHE_BACKEND == "sqlite":
+        return SQLiteCacheBackend(name, CACHE_PATH)
+    else:
+        raise ValueError(f"Unknown cache backend {CACHE_BACKEND!r}")
+
+
+ephemeris_cache = create_cache("ephemeris")
+object_aliases = create_cache("object_aliases")
+watched_objects = create_cache("watched_objects")
+geocode_cache = create_cache("geocode")
+visibility_cache = create_cache("visibility")
+sky_summary_cache = create_cache("sky_summary")
+refresh_claims = create_cache("refresh_claims")
+elements_cache = create_cache("elements")
+track_cache = create_cache("track")
+object_details = create_cache("object_details")
@@ -0,0 +1,271 @@
+import logging
+import os
+import re
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from app.config import EPHEMERIS_STORE_DIR, EPHEMERIS_STORE_DAYS
+from app.config import EPHEMERIS_STORE_MIN_REMAINING_DAYS, EPHEMERIS_STORE_STEP_MINUTES
+from app.config import EPHEMERIS_SEGMENT_DAYS, EPHEMERIS_SEGMENT_DEGREE
+from app.config import EPHEMERIS_DETAILS_TTL_SECONDS
+from app.services.cache import object_details
+from app.services.horizons import search_vectors, parse_horizons_vectors
+from app.services.horizons import HORIZONS_TIME_FORMAT
+from app.services.kepler import EARTH_ID, DELTA_T_SECONDS, resolve_body, julian_date
+from app.services.kepler import get_elements, stack_elements, orbital_positions
+from app.services.kepler import ecliptic_to_equatorial, observe
+
+logger = logging.getLogger(__name__)
+
+STORE_MAGIC = b"SKYCHEB1"
+STORE_SUFFIX = ".cheb"
+HEADER_DTYPE = np.dtype(
+    [
+        ("magic", "S8"),
+        ("object_id", "S16"),
+        ("object_name", "S40"),
+        ("start_jd", "<f8"),
+        ("segment_days", "<f8"),
+        ("segment_count", "<i8"),
+        ("degree", "<i8"),
+    ]
+)
+DETAIL_FIELDS = (
+    "apparent_magnitude",
+    "surface_brightness",
+    "angular_diameter_arcsec",
+    "constellation",
+)
+
+
+class SegmentStore:
+    def __init__(self, path: Path):
+        self.path = path
+
+        header = np.memmap(path, dtype=HEADER_DTYPE, mode="r", shape=(1,))[0]
+        if header["magic"] != STORE_MAGIC:
+            raise ValueError(f"{path} is not an ephemeris segment store")
+
+        self.object_id = header["object_id"].decode()
+        self.object_name = header["object_name"].decode()
+        self.start_jd = float(header["start_jd"])
+        self.segment_days = float(header["segment_days"])
+        self.segment_count = int(header["segment_count"])
+        self.degree = int(header["degree"])
+        self.stop_jd = self.start_jd + self.segment_count * self.segment_days
+
+        self.coefficients = np.memmap(
+            path,
+            dtype="<f8",
+            mode="r",
+            offset=HEADER_DTYPE.itemsize,
+            shape=(self.segment_count, 3, self.degree + 1),
+        )
+
+    def covers(self, jd: np.ndarray) -> bool:
+        return bool(np.all((jd >= self.start_jd) & (jd <= self.stop_jd)))
+
+    def positions(self, jd: np.ndarray) -> np.ndarray:
+        offset = (np.asarray(jd, dtype=np.float64) - self.start_jd) / self.segment_days
+        segment = np.clip(np.floor(offset).astype(np.int64), 0, self.segment_count - 1)
+        x = (2 * (offset - segment) - 1)[..., np.newaxis]
+
+        coefficients = self.coefficients[segment]
+        b1 = np.zeros(coefficients.shape[:-1])
+        b2 = np.zeros(coefficients.shape[:-1])
+        for k in range(self.degree, 0, -1):
+            b1, b2 = 2 * x * b1 - b2 + coefficients[..., k], b1
+
+        return x * b1 - b2 + coefficients[..., 0]
+
+
+def fit_segments(
+    jd: np.ndarray, positions: np.ndarray, segment_days: float, degree: int
+) -> np.ndarray:
+    step_days = jd[1] - jd[0]
+    samples_per_segment = round(segment_days / step_days)
+
+    if not np.allclose(np.diff(jd), step_days) or not np.isclose(
+        samples_per_segment * step_days, segment_days
+    ):
+        raise ValueError("Vector samples must be evenly spaced within each segment")
+    if degree > samples_per_segment:
+        raise ValueError("Not enough samples per segment for the requested degree")
+
+    segment_count = (len(jd) - 1) // samples_per_segment
+    if segment_count < 1:
+        raise ValueError("Not enough samples for a single segment")
+
+    x = np.linspace(-1, 1, samples_per_segment + 1)
+    vandermonde = np.polynomial.chebyshev.chebvander(x, degree)
+
+    sample_index = np.arange(segment_count)[
+        :, np.newaxis
+    ] * samples_per_segment + np.arange(samples_per_segment + 1)
+    samples = positions[sample_index].transpose(1, 0, 2)
+
+    coefficients, *_ = np.linalg.lstsq(
+        vandermonde, samples.reshape(samples_per_segment + 1, -1), rcond=None
+    )
+
+    return coefficients.reshape(degree + 1, segment_count, 3).transpose(1, 2, 0)
+
+
+def store_path(object_name: str | int) -> Path:
+    store_key = re.sub(r"[^a-z0-9_-]", "_", resolve_body(object_name))
+
+    return Path(EPHEMERIS_STORE_DIR) / f"{store_key}{STORE_SUFFIX}"
+
+
+def write_segment_store(
+    path: Path,
+    object_name: str,
+    object_id: str,
+    start_jd: float,
+    segment_days: float,
+    coefficients: np.ndarray,
+) -> None:
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = STORE_MAGIC
+    header["object_id"] = object_id.encode()[:16]
+    header["object_name"] = object_name.encode()[:40]
+    header["start_jd"] = start_jd
+    header["segment_days"] = segment_days
+    header["segment_count"] = coefficients.shape[0]
+    header["degree"] = coefficients.shape[2] - 1
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+    with open(temporary_path, "wb") as store_file:
+        store_file.write(header.tobytes())
+        store_file.write(np.ascontiguousarray(coefficients, dtype="<f8").tobytes())
+
+    os.replace(temporary_path, path)
+
+
+def build_segment_store(
+    object_name: str | int,
+    start_time: datetime,
+    days: int = EPHEMERIS_STORE_DAYS,
+) -> Path:
+    start_time = start_time.replace(hour=0, minute=0, second=0, microsecond=0)
+    stop_time = start_time + timedelta(days=days)
+
+    output = search_vectors(
+        resolve_body(object_name),
+        start_time,
+        stop_time,
+        f"{EPHEMERIS_STORE_STEP_MINUTES}m",
+    )
+    vectors = parse_horizons_vectors(output)
+
+    jd = np.asarray(vectors["jd"], dtype=np.float64)
+    coefficients = fit_segments(
+        jd,
+        np.asarray(vectors["positions"], dtype=np.float64),
+        EPHEMERIS_SEGMENT_DAYS,
+        EPHEMERIS_SEGMENT_DEGREE,
+    )
+
+    path = store_path(object_name)
+    write_segment_store(
+        path,
+        vectors["object_name"],
+        vectors["object_id"],
+        float(jd[0]),
+        EPHEMERIS_SEGMENT_DAYS,
+        coefficients,
+    )
+
+    return path
+
+
+_open_stores: dict[Path, tuple[int, SegmentStore]] = {}
+
+
+def load_segment_store(object_name: str | int) -> SegmentStore | None:
+    path = store_path(object_name)
+
+    try:
+        modified_ns = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+    opened = _open_stores.get(path)
+    if opened is not None and opened[0] == modified_ns:
+        return opened[1]
+
+    try:
+        store = SegmentStore(path)
+    except ValueError:
+        logger.warning("Ignoring invalid ephemeris segment store %s", path)
+        return None
+
+    _open_stores[path] = (modified_ns, store)
+
+    return store
+
+
+def remember_object_details(object_id: str, row: dict) -> None:
+    details = {
+        field: row[field] for field in DETAIL_FIELDS if row.get(field) is not None
+    }
+
+    if details:
+        object_details.set(object_id, details, EPHEMERIS_DETAILS_TTL_SECONDS)
+
+
+def stored_ephemeris(
+    object_name: str | int,
+    coords: str,
+    when: datetime | None = None,
+    require_details: bool = False,
+) -> dict | None:
+    store = load_segment_store(object_name)
+
+    if store is None:
+        return None
+
+    details = object_details.get(store.object_id)
+    if details is None and require_details:
+        return None
+
+    if when is None:
+        when = datetime.now(timezone.utc)
+    when = when.replace(second=0, microsecond=0)
+
+    jd_ut = julian_date([when])
+    jd_tdb = jd_ut + DELTA_T_SECONDS / 86400
+
+    if not store.covers(jd_tdb):
+        return None
+
+    earth = stack_elements([get_elements(EARTH_ID, when, offline=True)])
+    sun_geocentric = ecliptic_to_equatorial(-orbital_positions(earth, jd_tdb)[0])
+
+    ephemerides = observe(store.positions(jd_tdb), sun_geocentric, jd_ut, coords)
+
+    ephemeris = {
+        "object_name": store.object_name,
+        "object_id": store.object_id,
+        "date": when.strftime(HORIZONS_TIME_FORMAT),
+    }
+    for field, values in ephemerides.items():
+        ephemeris[field] = round(float(values[0]), 6)
+
+    if details is not None:
+        ephemeris.update(details)
+
+    return ephemeris
+
+
+def segment_store_is_current(object_name: str | int, now: datetime) -> bool:
+    store = load_segment_store(object_name)
+
+    if store is None:
+        return False
+
+    return store.covers(
+        julian_date([now, now + timedelta(days=EPHEMERIS_STORE_MIN_REMAINING_DAYS)])
+    )
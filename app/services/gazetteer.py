@@ -0,0 +1,320 @@
+import bisect
+import csv
+import logging
+import re
+import sys
+import threading
+import unicodedata
+import numpy as np
+from app.config import GAZETTEER_PATH, GAZETTEER_MIN_POPULATION
+
+GEONAMES_NAME = 1
+GEONAMES_ASCII_NAME = 2
+GEONAMES_ALTERNATE_NAMES = 3
+GEONAMES_LATITUDE = 4
+GEONAMES_LONGITUDE = 5
+GEONAMES_COUNTRY_CODE = 8
+GEONAMES_POPULATION = 14
+PREFIX_END = chr(sys.maxunicode)
+FUZZY_PREFIX_LENGTH = 2
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_place_name(name: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+
+    return " ".join(re.sub(r"[^\w]+", " ", stripped.casefold()).split())
+
+
+class StringArray:
+    def __init__(self, strings: list[str]):
+        encoded = [string.encode() for string in strings]
+        lengths = np.fromiter(
+            (len(value) for value in encoded), np.uint32, len(encoded)
+        )
+
+        self.offsets = np.zeros(len(encoded) + 1, dtype=np.uint64)
+        np.cumsum(lengths, out=self.offsets[1:])
+        self.blob = b"".join(encoded)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.blob[self.offsets[index] : self.offsets[index + 1]].decode()
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.blob) + self.offsets.nbytes
+
+    def byte_matrix(self, indices: np.ndarray, width: int) -> np.ndarray:
+        codes = np.frombuffer(self.blob, dtype=np.uint8)
+        positions = self.offsets[indices][:, np.newaxis] + np.arange(
+            width, dtype=np.uint64
+        )
+        inside = positions < self.offsets[indices + 1][:, np.newaxis]
+
+        return np.where(inside, codes[np.minimum(positions, len(codes) - 1)], 0)
+
+
+def _edit_distances(query: bytes, candidates: np.ndarray) -> np.ndarray:
+    rows, width = candidates.shape
+    previous = np.broadcast_to(np.arange(width + 1), (rows, width + 1)).copy()
+
+    for i, query_byte in enumerate(query, 1):
+        current = np.empty_like(previous)
+        current[:, 0] = i
+        substitutions = previous[:, :-1] + (candidates != query_byte)
+        deletions = previous[:, 1:] + 1
+        for j in range(1, width + 1):
+            current[:, j] = np.minimum(
+                np.minimum(deletions[:, j - 1], current[:, j - 1] + 1),
+                substitutions[:, j - 1],
+            )
+        previous = current
+
+    return previous
+
+
+class Gazetteer:
+    def __init__(
+        self,
+        names: list[str],
+        latitudes: list[float],
+        longitudes: list[float],
+        populations: list[int],
+        country_codes: list[str],
+        alternate_names: list[list[str]] | None = None,
+    ):
+        self.names = StringArray(names)
+        self.latitudes = np.asarray(latitudes, dtype=np.float32)
+        self.longitudes = np.asarray(longitudes, dtype=np.float32)
+        self.populations = np.asarray(populations, dtype=np.uint32)
+        self.country_codes = np.asarray(country_codes, dtype="S2")
+
+        entries = []
+        for place, name in enumerate(names):
+            place_keys = {normalize_place_name(name)}
+            if alternate_names is not None:
+                place_keys.update(
+                    normalize_place_name(alt) for alt in alternate_names[place]
+                )
+
+            for key in place_keys:
+                if key:
+                    entries.append((key, -populations[place], place))
+
+        entries.sort()
+
+        self.keys = StringArray([key for key, _, _ in entries])
+        self.key_places = np.fromiter(
+            (place for _, _, place in entries), np.uint32, len(entries)
+        )
+        self.key_lengths = np.fromiter(
+            (len(key.encode()) for key, _, _ in entries), np.uint16, len(entries)
+        )
+
+    @classmethod
+    def from_geonames(
+        cls, path: str, min_population: int = 0, alternate_names: bool = False
+    ) -> "Gazetteer":
+        names = []
+        latitudes = []
+        longitudes = []
+        populations = []
+        country_codes = []
+        place_alternate_names = []
+
+        with open(path, encoding="utf-8", newline="") as geonames_file:
+            for row in csv.reader(
+                geonames_file, delimiter="\t", quoting=csv.QUOTE_NONE
+            ):
+                if len(row) <= GEONAMES_POPULATION:
+                    continue
+
+                population = int(row[GEONAMES_POPULATION] or 0)
+                if population < min_population:
+                    continue
+
+                names.append(row[GEONAMES_NAME])
+                latitudes.append(float(row[GEONAMES_LATITUDE]))
+                longitudes.append(float(row[GEONAMES_LONGITUDE]))
+                populations.append(population)
+                country_codes.append(row[GEONAMES_COUNTRY_CODE])
+
+                place_names = [row[GEONAMES_ASCII_NAME]]
+                if alternate_names:
+                    place_names.extend(row[GEONAMES_ALTERNATE_NAMES].split(","))
+                place_alternate_names.append(place_names)
+
+        return cls(
+            names,
+            latitudes,
+            longitudes,
+            populations,
+            country_codes,
+            place_alternate_names,
+        )
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self.names.nbytes
+            + self.keys.nbytes
+            + self.key_places.nbytes
+            + self.key_lengths.nbytes
+            + self.latitudes.nbytes
+            + self.longitudes.nbytes
+            + self.populations.nbytes
+            + self.country_codes.nbytes
+        )
+
+    def place(self, index: int) -> dict:
+        return {
+            "name": self.names[index],
+            "country_code": self.country_codes[index].decode(),
+            "latitude": float(self.latitudes[index]),
+            "longitude": float(self.longitudes[index]),
+            "population": int(self.populations[index]),
+        }
+
+    def _key_range(self, prefix: str, exact: bool = False) -> tuple[int, int]:
+        start = bisect.bisect_left(self.keys, prefix)
+        stop = bisect.bisect_right(self.keys, prefix if exact else prefix + PREFIX_END)
+
+        return start, stop
+
+    def _ranked_places(
+        self, key_indices: np.ndarray, country_code: str | None, limit: int
+    ) -> list[int]:
+        places = self.key_places[key_indices]
+
+        if country_code is not None:
+            places = places[self.country_codes[places] == country_code.encode()]
+
+        places = np.unique(places)
+        ranked = places[np.argsort(-self.populations[places].astype(np.int64))]
+
+        return [int(place) for place in ranked[:limit]]
+
+    @staticmethod
+    def _split_country(query: str) -> tuple[str, str | None]:
+        name, _, qualifier = query.rpartition(",")
+        qualifier = qualifier.strip()
+
+        if name and len(qualifier) == 2 and qualifier.isalpha():
+            return name, qualifier.upper()
+
+        return query, None
+
+    def lookup(self, query: str) -> dict | None:
+        name, country_code = self._split_country(query)
+        start, stop = self._key_range(normalize_place_name(name), exact=True)
+
+        places = self._ranked_places(np.arange(start, stop), country_code, 1)
+
+        return self.place(places[0]) if places else None
+
+    def search(self, prefix: str, limit: int = 10) -> list[dict]:
+        name, country_code = self._split_country(prefix)
+        normalized = normalize_place_name(name)
+
+        if not normalized:
+            return []
+
+        start, stop = self._key_range(normalized)
+        places = self._ranked_places(np.arange(start, stop), country_code, limit)
+
+        return [self.place(place) for place in places]
+
+    def fuzzy_search(
+        self, query: str, limit: int = 10, max_distance: int = 2
+    ) -> list[dict]:
+        name, country_code = self._split_country(query)
+        normalized = normalize_place_name(name)
+
+        if not normalized:
+            return []
+
+        encoded = normalized.encode()
+        start, stop = self._key_range(normalized[:FUZZY_PREFIX_LENGTH])
+        length_difference = np.abs(
+            self.key_lengths[start:stop].astype(np.int32) - len(encoded)
+        )
+        candidates = start + np.flatnonzero(length_difference <= max_distance)
+
+        if len(candidates) == 0:
+            return []
+
+        lengths = self.key_lengths[candidates].astype(np.int64)
+        distances = _edit_distances(
+            encoded,
+            self.keys.byte_matrix(candidates, len(encoded) + max_distance),
+        )[np.arange(len(candidates)), lengths]
+        close = distances <= max_distance
+        matches = zip(distances[close].tolist(), candidates[close].tolist())
+
+        best_places = {}
+        for distance, key_index in matches:
+            place = int(self.key_places[key_index])
+            if country_code is not None and (
+                self.country_codes[place].decode() != country_code
+            ):
+                continue
+
+            rank = (distance, -int(self.populations[place]))
+            if place not in best_places or rank < best_places[place]:
+                best_places[place] = rank
+
+        ranked = sorted(best_places, key=best_places.__getitem__)
+
+        return [self.place(place) for place in ranked[:limit]]
+
+
+_gazetteer: Gazetteer | None = None
+_gazetteer_loader: threading.Thread | None = None
+_gazetteer_lock = threading.Lock()
+
+
+def _load_gazetteer() -> None:
+    global _gazetteer
+
+    try:
+        gazetteer = Gazetteer.from_geonames(GAZETTEER_PATH, GAZETTEER_MIN_POPULATION)
+    except (OSError, ValueError) as e:
+        logger.warning(
+            "Gazetteer %s could not be loaded, using Nominatim only: %r",
+            GAZETTEER_PATH,
+            e,
+        )
+        return
+
+    _gazetteer = gazetteer
+
+
+def start_gazetteer_loading() -> threading.Thread | None:
+    global _gazetteer_loader
+
+    if not GAZETTEER_PATH:
+        return None
+
+    with _gazetteer_lock:
+        if _gazetteer_loader is None:
+            _gazetteer_loader = threading.Thread(
+                target=_load_gazetteer, name="gazetteer-loader", daemon=True
+            )
+            _gazetteer_loader.start()
+
+    return _gazetteer_loader
+
+
+def get_gazetteer() -> Gazetteer | None:
+    if _gazetteer is None and _gazetteer_loader is None:
+        start_gazetteer_loading()
+
+    return _gazetteer
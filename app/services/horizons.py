@@ -1,34 +1,122 @@
+import logging
+import re
+import sqlite3
 import httpx
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime, timedelta, timezone
 from geopy.geocoders import Nominatim
 from app.exceptions import InvalidLocationError, ObjectNotFoundError
 from app.exceptions import EphemerisDataMissing, UpstreamServiceError
+from app.exceptions import AmbiguousObjectError
 from ..parsers.horizons_mappings import multi_match_mapping_table as m_mapping_table
 from ..parsers.horizons_grammar import horizons_grammar as grammar_map
 from ..parsers.horizons_mappings import single_match_mapping_table as s_mapping_table
-from ..parsers.horizons_grammar import DROP_TOKENS
+from ..parsers.horizons_grammar import DROP_TOKENS, DATE_TOKENS, MAX_MARKER_TOKENS
+from ..parsers.horizons_grammar import PRESENCE_MARKER
+from ..parsers.horizons_tables import EphemerisSeries, MatchTable
+from app.services.cache import ephemeris_cache, geocode_cache, object_aliases
+from app.services.cache import watched_objects
+from app.config import GEOCODE_CACHE_TTL_SECONDS, RAW_ARCHIVE_ENABLED
+from app.config import OBJECT_ALIAS_TTL_SECONDS
+from app.services.quantization import site_quantizer, cell_quantizer
+from app.services.quantization import record_site_cache_lookup
+from app.services.metrics import stage_timer, timed, count
+from app.services.metrics import upstream_responses, parse_results, cache_lookups
+from app.services.gazetteer import get_gazetteer
+from app.services.payload_archive import get_payload_archive
+
+logger = logging.getLogger(__name__)
 
 HORIZONS_URL = "https://ssd.jpl.nasa.gov/api/horizons.api"
+HORIZONS_TIME_FORMAT = r"%Y-%b-%d %H:%M"
 DEFAULT_ELEVATION_KM = 0.3
+ELEMENT_PATTERN = re.compile(r"([A-Z]{1,2})\s*=\s*([-+]?\d+\.\d+(?:E[-+]\d+)?)")
+ELEMENT_RECORD_PATTERN = re.compile(r"^\s*(\d+\.\d+)\s*=", re.MULTILINE)
+ELEMENT_LABELS = {
+    "EC": "e",
+    "IN": "i",
+    "OM": "node",
+    "W": "peri",
+    "MA": "mean_anomaly",
+    "N": "mean_motion",
+    "A": "a",
+}
 
 geolocator = Nominatim(user_agent="SkyArchive")
+archive_executor = ThreadPoolExecutor(
+    max_workers=1, thread_name_prefix="payload-archive"
+)
 
 
 def get_coords(city_name: str, elevation: float | None = None) -> str:
-    location = geolocator.geocode(city_name)
+    place = find_place(city_name)
 
-    if not location:
-        raise InvalidLocationError("Invalid location")
+    if place is not None:
+        longitude, latitude = place["longitude"], place["latitude"]
+    else:
+        location_key = city_name.strip().lower()
+        longitude, latitude = geocode_cache.get_or_set(
+            location_key, partial(_geocode, city_name), GEOCODE_CACHE_TTL_SECONDS
+        )
 
     if elevation is None:
         elevation = DEFAULT_ELEVATION_KM
 
-    coords = f"{location.longitude},{location.latitude},{elevation}"  # pyright: ignore[reportAttributeAccessIssue]
+    longitude, latitude, elevation = site_quantizer.quantize(
+        longitude, latitude, elevation
+    )
+
+    coords = f"{longitude},{latitude},{elevation}"
 
     return coords
 
 
+def find_place(city_name: str) -> dict | None:
+    gazetteer = get_gazetteer()
+
+    if gazetteer is None:
+        return None
+
+    with stage_timer("gazetteer"):
+        place = gazetteer.lookup(city_name)
+
+    count(cache_lookups, cache="gazetteer", outcome="miss" if place is None else "hit")
+
+    return place
+
+
+def _geocode(city_name: str) -> tuple[float, float]:
+    with stage_timer("geocode"):
+        location = geolocator.geocode(city_name)
+
+    if not location:
+        raise InvalidLocationError("Invalid location")
+
+    longitude = location.longitude  # pyright: ignore[reportAttributeAccessIssue]
+    latitude = location.latitude  # pyright: ignore[reportAttributeAccessIssue]
+
+    return longitude, latitude
+
+
+def site_cell(coords: str) -> str:
+    return cell_quantizer.quantize_coords(coords)
+
+
 def search_object(object_name: str | int, coords: str) -> dict:
+    start_time = datetime.now(timezone.utc)
+    stop_time = start_time + timedelta(minutes=1)
+
+    return search_object_range(object_name, coords, start_time, stop_time)
+
+
+def search_object_range(
+    object_name: str | int,
+    coords: str,
+    start_time: datetime,
+    stop_time: datetime,
+    step_size: str = "1m",
+) -> dict:
 
     params = {
         "format": "json",
@@ -39,124 +127,187 @@ def search_object(object_name: str | int, coords: str) -> dict:
         "COORD_TYPE": "GEODETIC",
         "SITE_COORD": f"'{coords}'",
         "OBJ_DATA": "YES",
-        "START_TIME": f"'{datetime.now(timezone.utc).strftime(r"%Y-%b-%d %H:%M")}'",
-        "STOP_TIME": f"'{(datetime.now(timezone.utc) + timedelta(minutes=1)).strftime(r"%Y-%b-%d %H:%M")}'",
-        "STEP_SIZE": "1m",
+        "START_TIME": f"'{start_time.strftime(HORIZONS_TIME_FORMAT)}'",
+        "STOP_TIME": f"'{stop_time.strftime(HORIZONS_TIME_FORMAT)}'",
+        "STEP_SIZE": step_size,
         "TIME_TYPE": "UT",
         "CAL_FORMAT": "CAL",
     }
 
-    response = httpx.get(url=HORIZONS_URL, params=params)
+    return _request_horizons(params)
+
+
+def search_elements(object_name: str | int, center: str, epoch: datetime) -> dict:
+    params = {
+        "format": "json",
+        "COMMAND": f"'{object_name}'",
+        "MAKE_EPHEM": "YES",
+        "EPHEM_TYPE": "ELEMENTS",
+        "CENTER": f"'{center}'",
+        "OBJ_DATA": "NO",
+        "REF_PLANE": "ECLIPTIC",
+        "REF_SYSTEM": "ICRF",
+        "OUT_UNITS": "AU-D",
+        "TP_TYPE": "ABSOLUTE",
+        "START_TIME": f"'{epoch.strftime(HORIZONS_TIME_FORMAT)}'",
+        "STOP_TIME": f"'{(epoch + timedelta(minutes=1)).strftime(HORIZONS_TIME_FORMAT)}'",
+        "STEP_SIZE": "1d",
+    }
+
+    return _request_horizons(params)
+
+
+def search_vectors(
+    object_name: str | int,
+    start_time: datetime,
+    stop_time: datetime,
+    step_size: str,
+) -> dict:
+    params = {
+        "format": "json",
+        "COMMAND": f"'{object_name}'",
+        "MAKE_EPHEM": "YES",
+        "EPHEM_TYPE": "VECTORS",
+        "CENTER": "'500@399'",
+        "OBJ_DATA": "NO",
+        "REF_PLANE": "FRAME",
+        "REF_SYSTEM": "ICRF",
+        "VEC_TABLE": "1",
+        "VEC_CORR": "LT",
+        "VEC_LABELS": "NO",
+        "CSV_FORMAT": "YES",
+        "OUT_UNITS": "AU-D",
+        "TIME_TYPE": "TDB",
+        "START_TIME": f"'{start_time.strftime(HORIZONS_TIME_FORMAT)}'",
+        "STOP_TIME": f"'{stop_time.strftime(HORIZONS_TIME_FORMAT)}'",
+        "STEP_SIZE": step_size,
+    }
+
+    return _request_horizons(params)
+
+
+def _request_horizons(params: dict) -> dict:
+    with stage_timer("upstream"):
+        try:
+            response = httpx.get(url=HORIZONS_URL, params=params)
+        except httpx.HTTPError:
+            count(upstream_responses, service="horizons", status="error")
+            raise
+
+    count(upstream_responses, service="horizons", status=response.status_code)
     response.raise_for_status()
 
     data = response.json()
 
+    if RAW_ARCHIVE_ENABLED:
+        archive_executor.submit(archive_payload, params, data)
+
     return data
 
 
-def _slice_substring_into_list(substring: str, index_list: list[int]) -> list[str]:
-    new_list = []
+def _parse_param_time(params: dict, name: str) -> datetime | None:
+    value = params.get(name)
 
-    for index in range(len(index_list) - 1):
-        first_slice = index_list[index]
-        second_slice = index_list[index + 1]
-        sliced_string = substring[first_slice:second_slice].strip()
+    if value is None:
+        return None
 
-        new_list.append(sliced_string)
+    return datetime.strptime(value.strip("'"), HORIZONS_TIME_FORMAT).replace(
+        tzinfo=timezone.utc
+    )
 
-    new_list.append(substring[second_slice:].strip())
-    return new_list
 
+def archive_payload(params: dict, raw_data: dict) -> str | None:
+    result = raw_data.get("result", "")
+    object_id = None
+    if "Target body name:" in result:
+        _, object_id = _parse_target_name(result)
 
-def _parse_single_match_ephemeris(
-    token_headers: list[str], data_list: list[str]
-) -> dict:
-    output_dict = {}
-    i = 0
+    site = params.get("SITE_COORD", params.get("CENTER", ""))
 
-    grammar = dict(grammar_map)
+    try:
+        with stage_timer("archive"):
+            return get_payload_archive().store(
+                raw_data,
+                kind=params.get("EPHEM_TYPE", "OBSERVER"),
+                query=params.get("COMMAND", "").strip("'"),
+                params=params,
+                object_id=object_id,
+                site=site.strip("'") or None,
+                start_time=_parse_param_time(params, "START_TIME"),
+                stop_time=_parse_param_time(params, "STOP_TIME"),
+            )
+    except (sqlite3.Error, ValueError) as e:
+        logger.warning("Could not archive Horizons payload: %r", e)
+        return None
 
-    for header in token_headers:
-        span = grammar.get(header, 1)
-        if i + span > len(data_list):
-            raise IndexError("Index out of bounds.")
 
-        if header in s_mapping_table:
-            output_dict[header] = data_list[i : i + span]
+def _object_key(object_name: str | int) -> str:
+    return str(object_name).strip().lower()
 
-        i += span
 
-    return output_dict
+def mark_watched_object(object_id: str) -> None:
+    watched_objects.set(_object_key(object_id), True, OBJECT_ALIAS_TTL_SECONDS)
 
 
-def _map_single_match_ephemeris(data: dict) -> dict:
-    output_dict = {}
+def remember_object_alias(object_name: str | int, object_id: str) -> None:
+    alias = _object_key(object_name)
+    object_key = _object_key(object_id)
 
-    for header, value in data.items():
-        if header in s_mapping_table:
-            if len(s_mapping_table[header]) > 1:
-                zipped = zip(s_mapping_table[header], value)
+    if not alias or alias == object_key or watched_objects.get(object_key) is None:
+        return
 
-                for key, obj_data in zipped:
-                    output_dict[key] = obj_data
-            else:
-                key = s_mapping_table[header][0]
-                output_dict[key] = " ".join(value)
+    object_aliases.set(alias, object_key, OBJECT_ALIAS_TTL_SECONDS)
 
-    for key, value in output_dict.items():
-        if value == "n.a.":
-            output_dict[key] = None
 
-    return output_dict
+def resolve_object_id(object_name: str | int) -> str:
+    object_key = _object_key(object_name)
 
+    return object_aliases.get(object_key) or object_key
 
-def _parse_multi_match_results(
-    column_list: list[str], data_rows_list: list[str]
-) -> list[dict]:
-    parsed_list = []
 
-    for row in data_rows_list:
-        raw_dict = {}
-        zipped_output = zip(column_list, row)
+def ephemeris_cache_key(object_id: str | int, coords: str, date: str) -> tuple:
+    return (_object_key(object_id), coords, date)
 
-        for key, value in zipped_output:
-            raw_dict[key] = value
 
-        parsed_list.append(raw_dict)
+def get_cached_ephemeris(object_name: str | int, coords: str) -> dict | None:
+    current_date = datetime.now(timezone.utc).strftime(HORIZONS_TIME_FORMAT)
 
-    return parsed_list
+    cached_data = ephemeris_cache.get(
+        ephemeris_cache_key(resolve_object_id(object_name), coords, current_date)
+    )
+    record_site_cache_lookup("ephemeris", cached_data is not None)
 
+    return cached_data
 
-def _map_multi_match_results(data_list: list[dict]) -> list[dict]:
-    mapped_list = []
 
-    for data in data_list:
-        new_dict = {}
-        for key, value in data.items():
-            if key in m_mapping_table and m_mapping_table[key] not in new_dict:
-                new_dict[m_mapping_table[key]] = value
+def _slice_substring_into_list(substring: str, index_list: list[int]) -> list[str]:
+    new_list = []
+
+    for index in range(len(index_list) - 1):
+        first_slice = index_list[index]
+        second_slice = index_list[index + 1]
+        sliced_string = substring[first_slice:second_slice].strip()
 
-        mapped_list.append(new_dict)
+        new_list.append(sliced_string)
 
-    return mapped_list
+    new_list.append(substring[second_slice:].strip())
+    return new_list
 
 
-def parse_horizons_ephemeris(raw_data: dict) -> dict | list[dict]:
-    data_dict = {}
-    data_dict["source"] = raw_data.get("signature", {}).get("source", "Unknown source")
+@timed("parse")
+def parse_horizons_ephemeris(raw_data: dict) -> dict | MatchTable:
+    source = raw_data.get("signature", {}).get("source", "Unknown source")
 
     data = raw_data["result"]
-    start_index = data.find("$$SOE") + 5
     end_index = data.find("$$EOE")
 
-    name_start_index = data.find("Target body name:")
-    name_end_index = data.find(r"{source:")
-
     if any(
         msg in data for msg in ("out of bounds", "No such record", "No matches found")
     ):
+        count(parse_results, branch="not_found")
         raise ObjectNotFoundError
     elif data.find("No ephemeris for target") != -1:
+        count(parse_results, branch="no_ephemeris")
         raise EphemerisDataMissing
     elif any(msg in data for msg in ("Number of matches =", "Matching small-bodies:")):
         if data.find("ID#") != -1:
@@ -184,11 +335,19 @@ def parse_horizons_ephemeris(raw_data: dict) -> dict | list[dict]:
 
         column_names_list = _slice_substring_into_list(header_row, dash_index_list)
 
+        fields = []
+        column_indices = []
+        for column_index, column_name in enumerate(column_names_list):
+            field = m_mapping_table.get(column_name)
+            if field is not None and field not in fields:
+                fields.append(field)
+                column_indices.append(column_index)
+
         data_row_first_slice = dashed_second_slice + 1
 
         data_row_list = data[data_row_first_slice:].splitlines()
 
-        parsed_data_list = []
+        matches = MatchTable(fields)
 
         for row in data_row_list:
             if row.strip() == "":
@@ -196,56 +355,217 @@ def parse_horizons_ephemeris(raw_data: dict) -> dict | list[dict]:
             offset_row = row[offset_index:]
 
             parsed_row = _slice_substring_into_list(offset_row, dash_index_list)
-            parsed_data_list.append(parsed_row)
-
-        output_list = _parse_multi_match_results(column_names_list, parsed_data_list)
-        mapped_list = _map_multi_match_results(output_list)
+            matches.append([parsed_row[index] for index in column_indices])
 
-        return mapped_list
+        count(parse_results, branch="multi")
+        return matches
     elif data.find("$$SOE") != -1 and end_index != -1:
-        raw_name_id_string = data[name_start_index:name_end_index].strip()
-        name_id_string = raw_name_id_string.split(":")[1]
-
-        if name_id_string.find("(spacecraft)") != -1:
-            first_slice_index = name_id_string.find(")")
-            object_name = name_id_string[: first_slice_index + 1].strip()
-            second_slice_index = name_id_string.find(")", len(object_name) + 1)
-            object_id = name_id_string[first_slice_index + 3 : second_slice_index]
-        else:
-            first_slice_index = name_id_string.find("(")
-            second_slice_index = name_id_string.find(")")
-            object_name = name_id_string[:first_slice_index].strip()
-            object_id = name_id_string[
-                first_slice_index + 1 : second_slice_index
-            ].strip()
-
-        data_dict["object_name"] = object_name
-        data_dict["object_id"] = object_id
-
-        h_row_first_slice = data.find("Date__(UT)")
-        h_row_second_slice = data.find("\n", h_row_first_slice)
-        raw_header_string = data[h_row_first_slice:h_row_second_slice].replace("/r", "")
-        header_tokens = raw_header_string.split()
-
-        data_string = data[start_index:end_index].strip()
-
-        clean_data = data_string.splitlines()[0].split()
-        data_list = []
-        for data in clean_data:
-            if data in DROP_TOKENS:
-                continue
-            data_list.append(data)
-
-        output_data = _parse_single_match_ephemeris(header_tokens, data_list)
-
-        mapped_dict = _map_single_match_ephemeris(output_data)
-        data_dict.update(mapped_dict)
-
-        return data_dict
+        object_name, object_id = _parse_target_name(data)
+
+        series = _parse_ephemeris_rows(data, source, object_name, object_id, max_rows=1)
+
+        count(parse_results, branch="single")
+        return series[0]
     else:
+        count(parse_results, branch="upstream_error")
         raise UpstreamServiceError
 
 
+def parse_horizons_ephemeris_series(raw_data: dict) -> EphemerisSeries:
+    source = raw_data.get("signature", {}).get("source", "Unknown source")
+
+    data = raw_data["result"]
+
+    if any(
+        msg in data for msg in ("out of bounds", "No such record", "No matches found")
+    ):
+        raise ObjectNotFoundError
+    elif data.find("No ephemeris for target") != -1:
+        raise EphemerisDataMissing
+    elif any(msg in data for msg in ("Number of matches =", "Matching small-bodies:")):
+        raise AmbiguousObjectError
+    elif data.find("$$SOE") != -1 and data.find("$$EOE") != -1:
+        object_name, object_id = _parse_target_name(data)
+
+        return _parse_ephemeris_rows(data, source, object_name, object_id)
+    else:
+        raise UpstreamServiceError
+
+
+def parse_horizons_elements(raw_data: dict) -> dict:
+    data = raw_data["result"]
+
+    if any(
+        msg in data for msg in ("out of bounds", "No such record", "No matches found")
+    ):
+        raise ObjectNotFoundError
+    elif any(msg in data for msg in ("Number of matches =", "Matching small-bodies:")):
+        raise AmbiguousObjectError
+    elif data.find("$$SOE") != -1 and data.find("$$EOE") != -1:
+        object_name, object_id = _parse_target_name(data)
+
+        elements_block = data[data.find("$$SOE") + 5 : data.find("$$EOE")]
+        records = list(ELEMENT_RECORD_PATTERN.finditer(elements_block))
+
+        if not records:
+            raise UpstreamServiceError
+
+        record_end = records[1].start() if len(records) > 1 else len(elements_block)
+        values = dict(
+            ELEMENT_PATTERN.findall(elements_block[records[0].end() : record_end])
+        )
+
+        try:
+            elements = {
+                element: float(values[label])
+                for label, element in ELEMENT_LABELS.items()
+            }
+        except (KeyError, ValueError):
+            raise UpstreamServiceError
+
+        elements["epoch_jd"] = float(records[0].group(1))
+
+        elements["object_name"] = object_name
+        elements["object_id"] = object_id
+
+        return elements
+    else:
+        raise UpstreamServiceError
+
+
+def parse_horizons_vectors(raw_data: dict) -> dict:
+    data = raw_data["result"]
+
+    if any(
+        msg in data for msg in ("out of bounds", "No such record", "No matches found")
+    ):
+        raise ObjectNotFoundError
+    elif data.find("No ephemeris for target") != -1:
+        raise EphemerisDataMissing
+    elif any(msg in data for msg in ("Number of matches =", "Matching small-bodies:")):
+        raise AmbiguousObjectError
+    elif data.find("$$SOE") != -1 and data.find("$$EOE") != -1:
+        object_name, object_id = _parse_target_name(data)
+
+        vectors_block = data[data.find("$$SOE") + 5 : data.find("$$EOE")]
+
+        jd = []
+        positions = []
+        for row in vectors_block.strip().splitlines():
+            fields = row.split(",")
+
+            try:
+                jd.append(float(fields[0]))
+                positions.append([float(value) for value in fields[2:5]])
+            except (ValueError, IndexError):
+                raise UpstreamServiceError
+
+        return {
+            "object_name": object_name,
+            "object_id": object_id,
+            "jd": jd,
+            "positions": positions,
+        }
+    else:
+        raise UpstreamServiceError
+
+
+def _parse_target_name(data: str) -> tuple[str, str]:
+    name_start_index = data.find("Target body name:")
+    name_end_index = data.find(r"{source:")
+
+    raw_name_id_string = data[name_start_index:name_end_index].strip()
+    name_id_string = raw_name_id_string.split(":")[1]
+
+    if name_id_string.find("(spacecraft)") != -1:
+        first_slice_index = name_id_string.find(")")
+        object_name = name_id_string[: first_slice_index + 1].strip()
+        second_slice_index = name_id_string.find(")", len(object_name) + 1)
+        object_id = name_id_string[first_slice_index + 3 : second_slice_index]
+    else:
+        first_slice_index = name_id_string.find("(")
+        second_slice_index = name_id_string.find(")")
+        object_name = name_id_string[:first_slice_index].strip()
+        object_id = name_id_string[first_slice_index + 1 : second_slice_index].strip()
+
+    return object_name, object_id
+
+
+def _ephemeris_column_plan(
+    header_tokens: list[str],
+) -> tuple[list[str], list[tuple[int, int, tuple[str, ...]]], int]:
+    grammar = dict(grammar_map)
+    fields = []
+    plan = []
+    i = 0
+
+    for header in header_tokens:
+        span = grammar.get(header, 1)
+
+        if header in s_mapping_table:
+            header_fields = s_mapping_table[header]
+            fields.extend(header_fields)
+            plan.append((i, span, header_fields))
+
+        i += span
+
+    return fields, plan, i
+
+
+def _row_tokens(row: str) -> list[str]:
+    tokens = row.split()
+    marker_end = DATE_TOKENS
+
+    while (
+        marker_end < min(len(tokens), DATE_TOKENS + MAX_MARKER_TOKENS)
+        and PRESENCE_MARKER.fullmatch(tokens[marker_end]) is not None
+    ):
+        marker_end += 1
+
+    values = [token for token in tokens[marker_end:] if token not in DROP_TOKENS]
+
+    return tokens[:DATE_TOKENS] + values
+
+
+def _parse_ephemeris_rows(
+    data: str,
+    source: str,
+    object_name: str,
+    object_id: str,
+    max_rows: int | None = None,
+) -> EphemerisSeries:
+    start_index = data.find("$$SOE") + 5
+    end_index = data.find("$$EOE")
+
+    h_row_first_slice = data.find("Date__(UT)")
+    h_row_second_slice = data.find("\n", h_row_first_slice)
+    raw_header_string = data[h_row_first_slice:h_row_second_slice].replace("/r", "")
+    fields, plan, row_span = _ephemeris_column_plan(raw_header_string.split())
+
+    series = EphemerisSeries(source, object_name, object_id, fields)
+
+    data_string = data[start_index:end_index].strip()
+
+    for row in data_string.splitlines()[:max_rows]:
+        if row.strip() == "":
+            continue
+
+        tokens = _row_tokens(row)
+        if row_span > len(tokens):
+            raise IndexError("Index out of bounds.")
+
+        values = []
+        for start, span, header_fields in plan:
+            if len(header_fields) > 1:
+                values.extend(tokens[start : start + span][: len(header_fields)])
+            else:
+                values.append(" ".join(tokens[start : start + span]))
+
+        series.append(values)
+
+    return series
+
+
 # coords = "120,-21.5,0.3"
 # object = search_object("mars", coords)
 # print(parse_horizons_ephemeris(object))
@@ -0,0 +1,54 @@
+import hashlib
+import json
+import math
+from collections.abc import Callable
+from datetime import datetime, timezone
+from fastapi import Request, Response
+
+EPHEMERIS_STEP_SECONDS = 60
+
+
+def payload_etag(payload: dict | list) -> str:
+    encoded = json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), default=str
+    ).encode()
+
+    return f'"{hashlib.sha256(encoded).hexdigest()[:32]}"'
+
+
+def seconds_until_next_step(now: datetime | None = None) -> int:
+    if now is None:
+        now = datetime.now(timezone.utc)
+
+    elapsed = now.timestamp() % EPHEMERIS_STEP_SECONDS
+
+    return max(1, math.ceil(EPHEMERIS_STEP_SECONDS - elapsed))
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+
+    return "*" in candidates or any(
+        candidate.removeprefix("W/") == etag for candidate in candidates
+    )
+
+
+def conditional_response(
+    request: Request,
+    payload: dict | list,
+    render: Callable[[], Response],
+    max_age: int,
+) -> Response:
+    etag = payload_etag(payload)
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={max_age}"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    response = render()
+    response.headers.update(headers)
+
+    return response
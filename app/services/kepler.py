@@ -0,0 +1,415 @@
+import httpx
+import numpy as np
+from datetime import datetime, timezone
+from functools import partial
+from app.config import ELEMENTS_CACHE_TTL_SECONDS
+from app.exceptions import UpstreamServiceError
+from app.services.cache import elements_cache
+from app.services.horizons import search_elements, parse_horizons_elements
+from app.services.horizons import HORIZONS_TIME_FORMAT
+
+J2000_JD = 2451545.0
+UNIX_EPOCH_JD = 2440587.5
+DELTA_T_SECONDS = 69.2
+AU_KM = 149597870.7
+LIGHT_TIME_DAYS_PER_AU = 0.0057755183
+OBLIQUITY_J2000_DEG = 23.4392911
+EARTH_EQUATORIAL_RADIUS_KM = 6378.137
+EARTH_FLATTENING = 1 / 298.257223563
+KEPLER_ITERATIONS = 10
+
+EARTH_ID = "399"
+GEOCENTRIC_BODIES = {"301"}
+MAJOR_BODY_IDS = {
+    "mercury": "199",
+    "venus": "299",
+    "earth": "399",
+    "moon": "301",
+    "mars": "499",
+    "jupiter": "599",
+    "saturn": "699",
+    "uranus": "799",
+    "neptune": "899",
+}
+
+# Standish, "Keplerian Elements for Approximate Positions of the Major Planets"
+# (1800 AD - 2050 AD): a [AU], e, I, L, long. perihelion, long. ascending node
+# [deg], each followed by its rate per Julian century. Earth uses the EM
+# barycenter row.
+STANDISH_ELEMENTS = {
+    "199": (
+        "Mercury",
+        (0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593),
+        (0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081),
+    ),
+    "299": (
+        "Venus",
+        (0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255),
+        (0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418),
+    ),
+    "399": (
+        "Earth",
+        (1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0),
+        (0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0),
+    ),
+    "499": (
+        "Mars",
+        (1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891),
+        (0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343),
+    ),
+    "599": (
+        "Jupiter",
+        (5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909),
+        (-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106),
+    ),
+    "699": (
+        "Saturn",
+        (9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448),
+        (-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794),
+    ),
+    "799": (
+        "Uranus",
+        (19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503),
+        (-0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589),
+    ),
+    "899": (
+        "Neptune",
+        (30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574),
+        (0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.01262724),
+    ),
+}
+
+ELEMENT_FIELDS = ("a", "e", "i", "node", "peri", "mean_anomaly", "mean_motion")
+
+
+def resolve_body(object_name: str | int) -> str:
+    body = str(object_name).strip().lower()
+
+    return MAJOR_BODY_IDS.get(body, body)
+
+
+def julian_date(times: list[datetime]) -> np.ndarray:
+    timestamps = np.array([time.timestamp() for time in times], dtype=np.float64)
+
+    return UNIX_EPOCH_JD + timestamps / 86400
+
+
+def standish_elements(body: str, jd: float) -> dict:
+    object_name, base, rates = STANDISH_ELEMENTS[body]
+    centuries = (jd - J2000_JD) / 36525
+    a, e, i, mean_longitude, perihelion_longitude, node = (
+        value + rate * centuries for value, rate in zip(base, rates)
+    )
+
+    return {
+        "object_name": object_name,
+        "object_id": body,
+        "center": "sun",
+        "epoch_jd": jd,
+        "a": a,
+        "e": e,
+        "i": i,
+        "node": node,
+        "peri": perihelion_longitude - node,
+        "mean_anomaly": mean_longitude - perihelion_longitude,
+        "mean_motion": rates[3] / 36525,
+    }
+
+
+def _fetch_elements(body: str, epoch: datetime) -> dict:
+    center = "500@399" if body in GEOCENTRIC_BODIES else "500@10"
+    elements = parse_horizons_elements(search_elements(body, center, epoch))
+    elements["center"] = "earth" if body in GEOCENTRIC_BODIES else "sun"
+
+    return elements
+
+
+def get_elements(
+    object_name: str | int, epoch: datetime | None = None, offline: bool = False
+) -> dict:
+    if epoch is None:
+        epoch = datetime.now(timezone.utc)
+
+    body = resolve_body(object_name)
+
+    if offline:
+        elements = elements_cache.get(body)
+        if elements is not None:
+            return elements
+    else:
+        try:
+            return elements_cache.get_or_set(
+                body,
+                partial(_fetch_elements, body, epoch.replace(minute=0, second=0)),
+                ELEMENTS_CACHE_TTL_SECONDS,
+            )
+        except (httpx.HTTPError, UpstreamServiceError):
+            pass
+
+    if body in STANDISH_ELEMENTS:
+        return standish_elements(body, float(julian_date([epoch])[0]))
+
+    raise UpstreamServiceError
+
+
+def solve_kepler(mean_anomaly: np.ndarray, eccentricity: np.ndarray) -> np.ndarray:
+    eccentric_anomaly = mean_anomaly + eccentricity * np.sin(mean_anomaly)
+
+    for _ in range(KEPLER_ITERATIONS):
+        eccentric_anomaly = eccentric_anomaly - (
+            eccentric_anomaly - eccentricity * np.sin(eccentric_anomaly) - mean_anomaly
+        ) / (1 - eccentricity * np.cos(eccentric_anomaly))
+
+    return eccentric_anomaly
+
+
+def stack_elements(element_sets: list[dict]) -> dict[str, np.ndarray]:
+    stacked = {
+        field: np.array([elements[field] for elements in element_sets])[:, np.newaxis]
+        for field in ELEMENT_FIELDS + ("epoch_jd",)
+    }
+
+    if np.any(stacked["e"] >= 1):
+        raise ValueError("Only elliptic orbits are supported")
+
+    return stacked
+
+
+def orbital_positions(elements: dict[str, np.ndarray], jd: np.ndarray) -> np.ndarray:
+    a, e = elements["a"], elements["e"]
+    inclination = np.radians(elements["i"])
+    node = np.radians(elements["node"])
+    peri = np.radians(elements["peri"])
+
+    mean_anomaly = np.radians(
+        elements["mean_anomaly"] + elements["mean_motion"] * (jd - elements["epoch_jd"])
+    )
+    mean_anomaly = np.remainder(mean_anomaly + np.pi, 2 * np.pi) - np.pi
+    eccentric_anomaly = solve_kepler(mean_anomaly, e)
+
+    x_orbit = a * (np.cos(eccentric_anomaly) - e)
+    y_orbit = a * np.sqrt(1 - e**2) * np.sin(eccentric_anomaly)
+
+    cos_peri, sin_peri = np.cos(peri), np.sin(peri)
+    cos_node, sin_node = np.cos(node), np.sin(node)
+    cos_i, sin_i = np.cos(inclination), np.sin(inclination)
+
+    x = (cos_peri * cos_node - sin_peri * sin_node * cos_i) * x_orbit + (
+        -sin_peri * cos_node - cos_peri * sin_node * cos_i
+    ) * y_orbit
+    y = (cos_peri * sin_node + sin_peri * cos_node * cos_i) * x_orbit + (
+        -sin_peri * sin_node + cos_peri * cos_node * cos_i
+    ) * y_orbit
+    z = sin_peri * sin_i * x_orbit + cos_peri * sin_i * y_orbit
+
+    return np.stack((x, y, z), axis=-1)
+
+
+def ecliptic_to_equatorial(vectors: np.ndarray) -> np.ndarray:
+    obliquity = np.radians(OBLIQUITY_J2000_DEG)
+    cos_obliquity, sin_obliquity = np.cos(obliquity), np.sin(obliquity)
+
+    x, y, z = vectors[..., 0], vectors[..., 1], vectors[..., 2]
+
+    return np.stack(
+        (
+            x,
+            cos_obliquity * y - sin_obliquity * z,
+            sin_obliquity * y + cos_obliquity * z,
+        ),
+        axis=-1,
+    )
+
+
+def _precession_matrices(jd_tt: np.ndarray) -> np.ndarray:
+    centuries = (jd_tt - J2000_JD) / 36525
+    arcsec = np.pi / (180 * 3600)
+
+    zeta = (2306.2181 + (0.30188 + 0.017998 * centuries) * centuries) * centuries
+    z = (2306.2181 + (1.09468 + 0.018203 * centuries) * centuries) * centuries
+    theta = (2004.3109 - (0.42665 + 0.041833 * centuries) * centuries) * centuries
+
+    cos_zeta, sin_zeta = np.cos(zeta * arcsec), np.sin(zeta * arcsec)
+    cos_z, sin_z = np.cos(z * arcsec), np.sin(z * arcsec)
+    cos_theta, sin_theta = np.cos(theta * arcsec), np.sin(theta * arcsec)
+
+    return np.stack(
+        (
+            np.stack(
+                (
+                    cos_zeta * cos_z * cos_theta - sin_zeta * sin_z,
+                    -sin_zeta * cos_z * cos_theta - cos_zeta * sin_z,
+                    -cos_z * sin_theta,
+                ),
+                axis=-1,
+            ),
+            np.stack(
+                (
+                    cos_zeta * sin_z * cos_theta + sin_zeta * cos_z,
+                    -sin_zeta * sin_z * cos_theta + cos_zeta * cos_z,
+                    -sin_z * sin_theta,
+                ),
+                axis=-1,
+            ),
+            np.stack((cos_zeta * sin_theta, -sin_zeta * sin_theta, cos_theta), axis=-1),
+        ),
+        axis=-2,
+    )
+
+
+def _sidereal_time_rad(jd_ut: np.ndarray, longitude_deg: float) -> np.ndarray:
+    days = jd_ut - J2000_JD
+    centuries = days / 36525
+    gmst_deg = (
+        280.46061837
+        + 360.98564736629 * days
+        + 0.000387933 * centuries**2
+        - centuries**3 / 38710000
+    )
+
+    return np.radians(np.remainder(gmst_deg + longitude_deg, 360))
+
+
+def _observer_position(
+    latitude: float, elevation_km: float, sidereal_time: np.ndarray
+) -> np.ndarray:
+    latitude_rad = np.radians(latitude)
+    cos_latitude, sin_latitude = np.cos(latitude_rad), np.sin(latitude_rad)
+    c = 1 / np.sqrt(cos_latitude**2 + (1 - EARTH_FLATTENING) ** 2 * sin_latitude**2)
+    s = (1 - EARTH_FLATTENING) ** 2 * c
+
+    equatorial_km = (EARTH_EQUATORIAL_RADIUS_KM * c + elevation_km) * cos_latitude
+    polar_km = (EARTH_EQUATORIAL_RADIUS_KM * s + elevation_km) * sin_latitude
+
+    return (
+        np.stack(
+            (
+                equatorial_km * np.cos(sidereal_time),
+                equatorial_km * np.sin(sidereal_time),
+                np.full_like(sidereal_time, polar_km),
+            ),
+            axis=-1,
+        )
+        / AU_KM
+    )
+
+
+def _angle_between_deg(first: np.ndarray, second: np.ndarray) -> np.ndarray:
+    cosine = np.sum(first * second, axis=-1) / (
+        np.linalg.norm(first, axis=-1) * np.linalg.norm(second, axis=-1)
+    )
+
+    return np.degrees(np.arccos(np.clip(cosine, -1, 1)))
+
+
+def compute_ephemerides(
+    element_sets: list[dict],
+    earth_elements: dict,
+    times: list[datetime],
+    coords: str,
+) -> dict[str, np.ndarray]:
+    jd_ut = julian_date(times)
+    jd_tt = jd_ut + DELTA_T_SECONDS / 86400
+
+    elements = stack_elements(element_sets)
+    earth = stack_elements([earth_elements])
+    geocentric = np.array([body["center"] == "earth" for body in element_sets])[
+        :, np.newaxis, np.newaxis
+    ]
+
+    def heliocentric(jd: np.ndarray) -> np.ndarray:
+        positions = orbital_positions(elements, jd)
+        return np.where(
+            geocentric, positions + orbital_positions(earth, jd)[0], positions
+        )
+
+    earth_position = orbital_positions(earth, jd_tt)[0]
+    body_position = heliocentric(jd_tt)
+    light_time = (
+        np.linalg.norm(body_position - earth_position, axis=-1) * LIGHT_TIME_DAYS_PER_AU
+    )
+    body_position = heliocentric(jd_tt - light_time)
+
+    return observe(
+        ecliptic_to_equatorial(body_position - earth_position),
+        ecliptic_to_equatorial(-earth_position),
+        jd_ut,
+        coords,
+    )
+
+
+def observe(
+    body_geocentric: np.ndarray,
+    sun_geocentric: np.ndarray,
+    jd_ut: np.ndarray,
+    coords: str,
+) -> dict[str, np.ndarray]:
+    longitude, latitude, elevation_km = (float(value) for value in coords.split(","))
+    jd_tt = jd_ut + DELTA_T_SECONDS / 86400
+
+    precession = _precession_matrices(jd_tt)
+    sidereal_time = _sidereal_time_rad(jd_ut, longitude)
+    observer = _observer_position(latitude, elevation_km, sidereal_time)
+
+    def topocentric(equatorial: np.ndarray) -> np.ndarray:
+        return np.einsum("tij,...tj->...ti", precession, equatorial) - observer
+
+    body_topocentric = topocentric(body_geocentric)
+    sun_topocentric = topocentric(sun_geocentric)
+
+    latitude_rad = np.radians(latitude)
+    cos_latitude, sin_latitude = np.cos(latitude_rad), np.sin(latitude_rad)
+    cos_sidereal, sin_sidereal = np.cos(sidereal_time), np.sin(sidereal_time)
+    x, y, z = (body_topocentric[..., axis] for axis in range(3))
+
+    east = -sin_sidereal * x + cos_sidereal * y
+    north = (
+        -sin_latitude * cos_sidereal * x
+        - sin_latitude * sin_sidereal * y
+        + cos_latitude * z
+    )
+    up = (
+        cos_latitude * cos_sidereal * x
+        + cos_latitude * sin_sidereal * y
+        + sin_latitude * z
+    )
+
+    phase_angle = _angle_between_deg(sun_geocentric - body_geocentric, -body_geocentric)
+
+    return {
+        "azimuth_deg": np.remainder(np.degrees(np.arctan2(east, north)), 360),
+        "altitude_deg": np.degrees(np.arctan2(up, np.hypot(east, north))),
+        "sun_distance_au": np.linalg.norm(body_geocentric - sun_geocentric, axis=-1),
+        "earth_distance_au": np.linalg.norm(body_topocentric, axis=-1),
+        "solar_elong_deg": _angle_between_deg(sun_topocentric, body_topocentric),
+        "illumination_percent": 50 * (1 + np.cos(np.radians(phase_angle))),
+    }
+
+
+def approximate_ephemeris(
+    object_name: str | int,
+    coords: str,
+    when: datetime | None = None,
+    offline: bool = False,
+) -> dict:
+    if when is None:
+        when = datetime.now(timezone.utc)
+    when = when.replace(second=0, microsecond=0)
+
+    elements = get_elements(object_name, when, offline)
+    earth_elements = get_elements(EARTH_ID, when, offline)
+
+    try:
+        ephemerides = compute_ephemerides([elements], earth_elements, [when], coords)
+    except ValueError:
+        raise UpstreamServiceError
+
+    ephemeris = {
+        "object_name": elements["object_name"],
+        "object_id": elements["object_id"],
+        "date": when.strftime(HORIZONS_TIME_FORMAT),
+    }
+    for field, values in ephemerides.items():
+        ephemeris[field] = round(float(values[0, 0]), 6)
+
+    return ephemeris
@@ -0,0 +1,273 @@
+import threading
+import time
+from contextlib import nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from app.config import METRICS_ENABLED
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_labels(labelnames: tuple[str, ...], labelvalues: tuple, extra="") -> str:
+    pairs = [
+        f'{name}="{_escape_label_value(str(value))}"'
+        for name, value in zip(labelnames, labelvalues)
+    ]
+    if extra:
+        pairs.append(extra)
+
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value))
+
+
+class Counter:
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def get(self, **labels) -> float:
+        return self.values.get(self._key(labels), 0)
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted(self.values.items())
+
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+
+        with self._lock:
+            self.values[key] = value
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram:
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self.values: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels[name]) for name in self.labelnames)
+
+        with self._lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    series[0][index] += 1
+                    break
+
+            series[1] += value
+            series[2] += 1
+
+    def collect(self) -> list[str]:
+        with self._lock:
+            items = sorted(
+                (key, list(counts), total, count)
+                for key, (counts, total, count) in self.values.items()
+            )
+
+        lines = []
+        for key, counts, total, count in items:
+            cumulative = 0
+            for upper_bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le_label = f'le="{_format_value(upper_bound)}"'
+                labels = _format_labels(self.labelnames, key, le_label)
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            lines.extend(metric.collect())
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_duration = registry.register(
+    Histogram(
+        "skyarchive_stage_duration_seconds",
+        "Time spent in each stage of the search pipeline.",
+        ("stage",),
+    )
+)
+upstream_responses = registry.register(
+    Counter(
+        "skyarchive_upstream_responses_total",
+        "Upstream responses by service and HTTP status.",
+        ("service", "status"),
+    )
+)
+cache_lookups = registry.register(
+    Counter(
+        "skyarchive_cache_lookups_total",
+        "Cache lookups by cache and outcome.",
+        ("cache", "outcome"),
+    )
+)
+site_cache_lookups = registry.register(
+    Counter(
+        "skyarchive_site_cache_lookups_total",
+        "Site-keyed cache lookups by quantization level, cache and outcome.",
+        ("level", "cache", "outcome"),
+    )
+)
+parse_results = registry.register(
+    Counter(
+        "skyarchive_parse_results_total",
+        "Horizons payloads parsed, by parser branch.",
+        ("branch",),
+    )
+)
+track_feeds = registry.register(
+    Gauge(
+        "skyarchive_track_feeds",
+        "Shared live-tracking feeds, one per object and site cell.",
+    )
+)
+track_subscribers = registry.register(
+    Gauge(
+        "skyarchive_track_subscribers",
+        "WebSocket clients subscribed to live-tracking feeds.",
+    )
+)
+admission_in_flight = registry.register(
+    Gauge(
+        "skyarchive_admission_in_flight",
+        "Requests holding an admission slot, by route.",
+        ("route",),
+    )
+)
+admission_queue_depth = registry.register(
+    Gauge(
+        "skyarchive_admission_queue_depth",
+        "Requests waiting for an admission slot, by route.",
+        ("route",),
+    )
+)
+requests_shed = registry.register(
+    Counter(
+        "skyarchive_requests_shed_total",
+        "Requests rejected by admission control, by route and reason.",
+        ("route", "reason"),
+    )
+)
+
+
+stage_timings: ContextVar[list | None] = ContextVar("stage_timings", default=None)
+
+
+class _StageTimer:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+
+        if METRICS_ENABLED:
+            stage_duration.observe(elapsed, stage=self.stage)
+
+        request_timings = stage_timings.get()
+        if request_timings is not None:
+            request_timings.append((self.stage, elapsed))
+
+
+_NULL_TIMER = nullcontext()
+
+
+def stage_timer(stage: str):
+    if not METRICS_ENABLED and stage_timings.get() is None:
+        return _NULL_TIMER
+
+    return _StageTimer(stage)
+
+
+def timed(stage: str):
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count(counter: Counter, **labels) -> None:
+    if METRICS_ENABLED:
+        counter.inc(**labels)
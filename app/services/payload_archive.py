@@ -0,0 +1,222 @@
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from app.config import RAW_ARCHIVE_PATH, RAW_ARCHIVE_COMPRESSION_LEVEL
+
+VOLATILE_HEADER_LINE = re.compile(r"^[ \t]*Ephemeris / .*$", re.MULTILINE)
+
+
+def _utc_isoformat(value: datetime | None) -> str | None:
+    if value is None:
+        return None
+
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return value.isoformat()
+
+
+class PayloadArchive:
+    def __init__(
+        self, path: str, compression_level: int = RAW_ARCHIVE_COMPRESSION_LEVEL
+    ):
+        self.path = path
+        self.compression_level = compression_level
+        self._local = threading.local()
+
+        connection = self._connection()
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS payloads ("
+            "payload_hash TEXT PRIMARY KEY, "
+            "data BLOB NOT NULL, "
+            "raw_size INTEGER NOT NULL, "
+            "stored_size INTEGER NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS payload_index ("
+            "id INTEGER PRIMARY KEY, "
+            "payload_hash TEXT NOT NULL REFERENCES payloads (payload_hash), "
+            "kind TEXT NOT NULL, "
+            "query TEXT NOT NULL, "
+            "object_id TEXT, "
+            "site TEXT, "
+            "start_time TEXT, "
+            "stop_time TEXT, "
+            "params TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL"
+            ")"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_payload_index_object_site_span "
+            "ON payload_index (object_id, site, start_time, stop_time)"
+        )
+        connection.execute(
+            "CREATE INDEX IF NOT EXISTS ix_payload_index_payload_hash "
+            "ON payload_index (payload_hash)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+
+        return connection
+
+    @staticmethod
+    def encode_payload(payload: dict) -> bytes:
+        return json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+
+    @staticmethod
+    def normalize_payload(payload: dict) -> dict:
+        result = payload.get("result")
+
+        if not isinstance(result, str):
+            return payload
+
+        return {**payload, "result": VOLATILE_HEADER_LINE.sub("", result)}
+
+    def payload_hash(self, payload: dict) -> str:
+        encoded = self.encode_payload(self.normalize_payload(payload))
+
+        return hashlib.sha256(encoded).hexdigest()
+
+    def store(
+        self,
+        payload: dict,
+        kind: str,
+        query: str,
+        params: dict,
+        object_id: str | None = None,
+        site: str | None = None,
+        start_time: datetime | None = None,
+        stop_time: datetime | None = None,
+    ) -> str:
+        encoded = self.encode_payload(payload)
+        payload_hash = self.payload_hash(payload)
+        connection = self._connection()
+
+        stored = connection.execute(
+            "SELECT 1 FROM payloads WHERE payload_hash = ?", (payload_hash,)
+        ).fetchone()
+        if stored is None:
+            compressed = zlib.compress(encoded, self.compression_level)
+            connection.execute(
+                "INSERT OR IGNORE INTO payloads "
+                "(payload_hash, data, raw_size, stored_size) VALUES (?, ?, ?, ?)",
+                (payload_hash, compressed, len(encoded), len(compressed)),
+            )
+
+        connection.execute(
+            "INSERT INTO payload_index (payload_hash, kind, query, object_id, site, "
+            "start_time, stop_time, params, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                payload_hash,
+                kind,
+                query,
+                object_id,
+                site,
+                _utc_isoformat(start_time),
+                _utc_isoformat(stop_time),
+                json.dumps(params, sort_keys=True),
+                time.time(),
+            ),
+        )
+
+        return payload_hash
+
+    def load(self, payload_hash: str) -> dict | None:
+        row = (
+            self._connection()
+            .execute(
+                "SELECT data FROM payloads WHERE payload_hash = ?", (payload_hash,)
+            )
+            .fetchone()
+        )
+
+        if row is None:
+            return None
+
+        return json.loads(zlib.decompress(row[0]))
+
+    def find(
+        self,
+        object_id: str | None = None,
+        site: str | None = None,
+        start_time: datetime | None = None,
+        stop_time: datetime | None = None,
+        kind: str | None = None,
+    ) -> list[dict]:
+        conditions = []
+        values = []
+
+        if object_id is not None:
+            conditions.append("object_id = ?")
+            values.append(object_id)
+        if site is not None:
+            conditions.append("site = ?")
+            values.append(site)
+        if start_time is not None:
+            conditions.append("stop_time >= ?")
+            values.append(_utc_isoformat(start_time))
+        if stop_time is not None:
+            conditions.append("start_time <= ?")
+            values.append(_utc_isoformat(stop_time))
+        if kind is not None:
+            conditions.append("kind = ?")
+            values.append(kind)
+
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        cursor = self._connection().execute(
+            "SELECT payload_hash, kind, query, object_id, site, start_time, "
+            f"stop_time, fetched_at FROM payload_index {where}ORDER BY id",
+            values,
+        )
+        columns = [column[0] for column in cursor.description]
+
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def stats(self) -> dict:
+        payloads, raw_bytes, stored_bytes = (
+            self._connection()
+            .execute(
+                "SELECT COUNT(*), COALESCE(SUM(raw_size), 0), "
+                "COALESCE(SUM(stored_size), 0) FROM payloads"
+            )
+            .fetchone()
+        )
+        (references,) = (
+            self._connection().execute("SELECT COUNT(*) FROM payload_index").fetchone()
+        )
+
+        return {
+            "payloads": payloads,
+            "references": references,
+            "raw_bytes": raw_bytes,
+            "stored_bytes": stored_bytes,
+        }
+
+
+_payload_archive: PayloadArchive | None = None
+_payload_archive_lock = threading.Lock()
+
+
+def get_payload_archive() -> PayloadArchive:
+    global _payload_archive
+
+    if _payload_archive is None:
+        with _payload_archive_lock:
+            if _payload_archive is None:
+                _payload_archive = PayloadArchive(RAW_ARCHIVE_PATH)
+
+    return _payload_archive
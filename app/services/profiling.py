@@ -0,0 +1,214 @@
+import asyncio
+import cProfile
+import hmac
+import io
+import json
+import pstats
+import random
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import wraps
+from pathlib import Path
+from typing import Callable
+from fastapi import Request
+from fastapi.routing import APIRoute
+from app.config import PROFILE_TOKEN, PROFILE_SAMPLE_RATE
+from app.config import PROFILE_DIR, PROFILE_MAX_FILES
+from app.services.metrics import stage_timings
+
+PROFILE_HEADER = "X-Profile-Token"
+PROFILE_TOP_FUNCTIONS = 25
+UNPROFILED_PATH_PREFIXES = ("/admin", "/metrics")
+
+
+class RequestProfile:
+    def __init__(self, reason: str):
+        timestamp = datetime.now(timezone.utc).strftime(r"%Y%m%dT%H%M%S%f")
+        self.profile_id = f"{timestamp}-{uuid.uuid4().hex[:8]}"
+        self.reason = reason
+        self.profiler = cProfile.Profile()
+        self.profiled_calls = 0
+        self.stage_timings: list[tuple[str, float]] = []
+
+
+current_profile: ContextVar[RequestProfile | None] = ContextVar(
+    "current_profile", default=None
+)
+
+# cProfile hooks are process-wide on recent Pythons, so only one request is
+# profiled at a time; concurrent candidates are simply not sampled.
+_profiler_lock = threading.Lock()
+
+
+def is_valid_profile_token(token: str | None) -> bool:
+    if not PROFILE_TOKEN or token is None:
+        return False
+
+    return hmac.compare_digest(token.encode(), PROFILE_TOKEN.encode())
+
+
+def profile_reason(request: Request) -> str | None:
+    if request.url.path.startswith(UNPROFILED_PATH_PREFIXES):
+        return None
+
+    if is_valid_profile_token(request.headers.get(PROFILE_HEADER)):
+        return "header"
+
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+
+    return None
+
+
+def profiled(func: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(func):
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        request_profile = current_profile.get()
+
+        if request_profile is None or not _profiler_lock.acquire(blocking=False):
+            return func(*args, **kwargs)
+
+        try:
+            request_profile.profiled_calls += 1
+            return request_profile.profiler.runcall(func, *args, **kwargs)
+        finally:
+            _profiler_lock.release()
+
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, profiled(endpoint), **kwargs)
+
+
+def _top_functions(profiler: cProfile.Profile) -> list[dict]:
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+
+    top_functions = []
+    for function_key in stats.fcn_list[:PROFILE_TOP_FUNCTIONS]:
+        filename, line_number, function_name = function_key
+        _, total_calls, total_time, cumulative_time, _ = stats.stats[function_key]
+        top_functions.append(
+            {
+                "function": f"{filename}:{line_number}({function_name})",
+                "calls": total_calls,
+                "total_time": total_time,
+                "cumulative_time": cumulative_time,
+            }
+        )
+
+    return top_functions
+
+
+def _prune_profiles(profile_dir: Path, max_files: int) -> None:
+    metadata_files = sorted(profile_dir.glob("*.json"))
+
+    for metadata_file in metadata_files[: max(len(metadata_files) - max_files, 0)]:
+        metadata_file.unlink(missing_ok=True)
+        metadata_file.with_suffix(".prof").unlink(missing_ok=True)
+
+
+def save_profile(
+    request_profile: RequestProfile,
+    request: Request,
+    status_code: int,
+    duration_seconds: float,
+) -> Path:
+    profile_dir = Path(PROFILE_DIR)
+    profile_dir.mkdir(parents=True, exist_ok=True)
+
+    metadata = {
+        "profile_id": request_profile.profile_id,
+        "reason": request_profile.reason,
+        "method": request.method,
+        "path": request.url.path,
+        "params": dict(request.query_params),
+        "status_code": status_code,
+        "duration_seconds": duration_seconds,
+        "stage_timings": [
+            {"stage": stage, "seconds": seconds}
+            for stage, seconds in request_profile.stage_timings
+        ],
+        "top_functions": [],
+    }
+
+    if request_profile.profiled_calls:
+        request_profile.profiler.dump_stats(
+            profile_dir / f"{request_profile.profile_id}.prof"
+        )
+        metadata["top_functions"] = _top_functions(request_profile.profiler)
+
+    metadata_path = profile_dir / f"{request_profile.profile_id}.json"
+    metadata_path.write_text(json.dumps(metadata, indent=2))
+
+    _prune_profiles(profile_dir, PROFILE_MAX_FILES)
+
+    return metadata_path
+
+
+def list_profiles(limit: int) -> list[dict]:
+    profile_dir = Path(PROFILE_DIR)
+
+    if not profile_dir.is_dir():
+        return []
+
+    profiles = []
+    for metadata_file in sorted(profile_dir.glob("*.json"), reverse=True)[:limit]:
+        metadata = json.loads(metadata_file.read_text())
+        metadata.pop("top_functions", None)
+        metadata["has_profile"] = metadata_file.with_suffix(".prof").exists()
+        profiles.append(metadata)
+
+    return profiles
+
+
+def get_profile_path(profile_id: str, suffix: str) -> Path | None:
+    profile_path = Path(PROFILE_DIR) / f"{Path(profile_id).name}{suffix}"
+
+    if not profile_path.is_file():
+        return None
+
+    return profile_path
+
+
+def get_profile(profile_id: str) -> dict | None:
+    metadata_path = get_profile_path(profile_id, ".json")
+
+    if metadata_path is None:
+        return None
+
+    return json.loads(metadata_path.read_text())
+
+
+async def profiling_middleware(request: Request, call_next):
+    reason = profile_reason(request)
+
+    if reason is None:
+        return await call_next(request)
+
+    request_profile = RequestProfile(reason)
+    profile_token = current_profile.set(request_profile)
+    timings_token = stage_timings.set(request_profile.stage_timings)
+    start = time.perf_counter()
+
+    try:
+        response = await call_next(request)
+    finally:
+        current_profile.reset(profile_token)
+        stage_timings.reset(timings_token)
+
+    duration_seconds = time.perf_counter() - start
+    await asyncio.to_thread(
+        save_profile, request_profile, request, response.status_code, duration_seconds
+    )
+    response.headers["X-Profile-Id"] = request_profile.profile_id
+
+    return response
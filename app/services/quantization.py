@@ -0,0 +1,162 @@
+import math
+from app.config import SITE_QUANTIZATION, SITE_ELEVATION_BAND_KM
+from app.config import SITE_CELL_QUANTIZATION
+from app.services.metrics import count, site_cache_lookups
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int) -> str:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    geohash = []
+    bits = 0
+    bit_count = 0
+    even_bit = True
+
+    while len(geohash) < precision:
+        value_range, value = (
+            (lon_range, longitude) if even_bit else (lat_range, latitude)
+        )
+        middle = (value_range[0] + value_range[1]) / 2
+
+        if value >= middle:
+            bits = (bits << 1) | 1
+            value_range[0] = middle
+        else:
+            bits = bits << 1
+            value_range[1] = middle
+
+        even_bit = not even_bit
+        bit_count += 1
+
+        if bit_count == 5:
+            geohash.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(geohash)
+
+
+def geohash_decode(geohash: str) -> tuple[float, float]:
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even_bit = True
+
+    for char in geohash:
+        bits = GEOHASH_ALPHABET.index(char)
+
+        for shift in range(4, -1, -1):
+            value_range = lon_range if even_bit else lat_range
+            middle = (value_range[0] + value_range[1]) / 2
+
+            if (bits >> shift) & 1:
+                value_range[0] = middle
+            else:
+                value_range[1] = middle
+
+            even_bit = not even_bit
+
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+class SiteQuantizer:
+    def __init__(self, spec: str, elevation_band_km: float = 0.0):
+        self.spec = spec.strip().lower()
+        self.elevation_band_km = elevation_band_km
+
+        method, _, raw_value = self.spec.partition(":")
+        self.method = method
+
+        if method == "none":
+            self.value = 0.0
+        elif method == "grid":
+            self.value = float(raw_value)
+        elif method == "geohash":
+            self.value = int(raw_value)
+        else:
+            raise ValueError(f"Unknown site quantization {spec!r}")
+
+        if method != "none" and self.value <= 0:
+            raise ValueError(f"Invalid site quantization {spec!r}")
+
+    @property
+    def half_cell_deg(self) -> tuple[float, float]:
+        if self.method == "grid":
+            half_step = self.value / 60 / 2
+            return half_step, half_step
+        elif self.method == "geohash":
+            total_bits = 5 * int(self.value)
+            lat_bits = total_bits // 2
+            lon_bits = total_bits - lat_bits
+            return 90 / 2**lat_bits, 180 / 2**lon_bits
+
+        return 0.0, 0.0
+
+    @property
+    def error_bound_deg(self) -> float:
+        half_lat, half_lon = self.half_cell_deg
+
+        return math.hypot(half_lat, half_lon)
+
+    def quantize(
+        self, longitude: float, latitude: float, elevation: float
+    ) -> tuple[float, float, float]:
+        if self.method == "grid":
+            step = self.value / 60
+            longitude = round(longitude / step) * step
+            latitude = round(latitude / step) * step
+        elif self.method == "geohash":
+            geohash = geohash_encode(latitude, longitude, int(self.value))
+            latitude, longitude = geohash_decode(geohash)
+
+        if self.elevation_band_km > 0:
+            elevation = (
+                round(elevation / self.elevation_band_km) * self.elevation_band_km
+            )
+
+        return round(longitude, 6), round(latitude, 6), round(elevation, 6)
+
+    def quantize_coords(self, coords: str) -> str:
+        longitude, latitude, elevation = (float(value) for value in coords.split(","))
+        longitude, latitude, elevation = self.quantize(longitude, latitude, elevation)
+
+        return f"{longitude},{latitude},{elevation}"
+
+
+site_quantizer = SiteQuantizer(SITE_QUANTIZATION, SITE_ELEVATION_BAND_KM)
+cell_quantizer = SiteQuantizer(SITE_CELL_QUANTIZATION)
+
+
+def record_site_cache_lookup(cache_name: str, hit: bool) -> None:
+    count(
+        site_cache_lookups,
+        level=site_quantizer.spec,
+        cache=cache_name,
+        outcome="hit" if hit else "miss",
+    )
+
+
+def get_site_cache_stats() -> list[dict]:
+    level_stats = {}
+    for (level, cache_name, outcome), value in list(site_cache_lookups.values.items()):
+        cache_stats = level_stats.setdefault(level, {}).setdefault(
+            cache_name, {"hits": 0, "misses": 0}
+        )
+        cache_stats["hits" if outcome == "hit" else "misses"] += int(value)
+
+    levels = []
+    for level, caches in level_stats.items():
+        for cache_stats in caches.values():
+            lookups = cache_stats["hits"] + cache_stats["misses"]
+            cache_stats["hit_rate"] = cache_stats["hits"] / lookups if lookups else 0.0
+
+        levels.append(
+            {
+                "level": level,
+                "error_bound_deg": SiteQuantizer(level).error_bound_deg,
+                "caches": caches,
+            }
+        )
+
+    return levels
@@ -0,0 +1,194 @@
+import logging
+import threading
+import time
+import httpx
+from datetime import datetime, timedelta, timezone
+from sqlalchemy.orm import Session
+from app.config import WATCHLIST_PREFETCH_MINUTES, WATCHLIST_REFRESH_INTERVAL_SECONDS
+from app.config import HORIZONS_MAX_REQUESTS_PER_SECOND, EPHEMERIS_STORE_ENABLED
+from app.db.session import SessionLocal
+from app.exceptions import InvalidLocationError, ObjectNotFoundError
+from app.exceptions import EphemerisDataMissing, UpstreamServiceError
+from app.exceptions import AmbiguousObjectError
+from app.services.cache import ephemeris_cache, refresh_claims
+from app.services.horizons import get_coords, search_object_range
+from app.services.horizons import parse_horizons_ephemeris_series, ephemeris_cache_key
+from app.services.horizons import remember_object_alias, mark_watched_object
+from app.services.watchlist import get_watched_sites
+from app.services.chebyshev import build_segment_store, segment_store_is_current
+from app.services.chebyshev import remember_object_details
+
+logger = logging.getLogger(__name__)
+
+
+class RateLimiter:
+    def __init__(self, max_per_second: float):
+        self.min_interval = 1 / max_per_second
+        self._next_allowed_at = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, stop_event: threading.Event | None = None) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            wait_seconds = self._next_allowed_at - now
+            self._next_allowed_at = max(now, self._next_allowed_at) + self.min_interval
+
+        if wait_seconds > 0:
+            if stop_event is not None:
+                return not stop_event.wait(wait_seconds)
+            time.sleep(wait_seconds)
+
+        return True
+
+
+horizons_rate_limiter = RateLimiter(HORIZONS_MAX_REQUESTS_PER_SECOND)
+
+
+def refresh_site(
+    location: str,
+    elevation: float | None,
+    object_ids: set[str],
+    start_time: datetime,
+    stop_time: datetime,
+    stop_event: threading.Event | None = None,
+) -> int:
+    try:
+        coords = get_coords(location, elevation)
+    except InvalidLocationError:
+        logger.warning("Skipping watchlist site with invalid location %r", location)
+        return 0
+
+    cache_ttl = (stop_time - start_time).total_seconds() + 60
+    cached_rows = 0
+
+    for object_id in sorted(object_ids):
+        claim_key = (object_id, coords, start_time.isoformat())
+        if not refresh_claims.add(claim_key, True, cache_ttl):
+            continue
+
+        if not horizons_rate_limiter.acquire(stop_event):
+            refresh_claims.delete(claim_key)
+            break
+
+        try:
+            output = search_object_range(object_id, coords, start_time, stop_time)
+            series = parse_horizons_ephemeris_series(output)
+        except (
+            ObjectNotFoundError,
+            AmbiguousObjectError,
+            EphemerisDataMissing,
+            UpstreamServiceError,
+            httpx.HTTPError,
+        ) as e:
+            logger.warning("Could not refresh %r at %r: %r", object_id, location, e)
+            continue
+
+        resolved_id = series.object_id or object_id
+        mark_watched_object(resolved_id)
+        remember_object_alias(object_id, resolved_id)
+        remember_object_alias(series.object_name, resolved_id)
+
+        for row in series:
+            ephemeris_cache.set(
+                ephemeris_cache_key(resolved_id, coords, row["date"]), row, cache_ttl
+            )
+            cached_rows += 1
+
+        if EPHEMERIS_STORE_ENABLED and len(series):
+            remember_object_details(resolved_id, series[0])
+
+    return cached_rows
+
+
+def refresh_watchlist(
+    session_instance: Session,
+    now: datetime | None = None,
+    stop_event: threading.Event | None = None,
+) -> int:
+    if now is None:
+        now = datetime.now(timezone.utc)
+
+    start_time = now.replace(second=0, microsecond=0)
+    stop_time = start_time + timedelta(minutes=WATCHLIST_PREFETCH_MINUTES)
+
+    watched_sites = get_watched_sites(session_instance)
+
+    cached_rows = 0
+    for (location, elevation), object_ids in watched_sites.items():
+        cached_rows += refresh_site(
+            location, elevation, object_ids, start_time, stop_time, stop_event
+        )
+
+    if EPHEMERIS_STORE_ENABLED:
+        refresh_segment_stores(set().union(*watched_sites.values()), now, stop_event)
+
+    return cached_rows
+
+
+def refresh_segment_stores(
+    object_ids: set[str],
+    now: datetime,
+    stop_event: threading.Event | None = None,
+) -> int:
+    built_stores = 0
+
+    for object_id in sorted(object_ids):
+        if segment_store_is_current(object_id, now):
+            continue
+
+        if not horizons_rate_limiter.acquire(stop_event):
+            break
+
+        try:
+            build_segment_store(object_id, now)
+        except (
+            ObjectNotFoundError,
+            AmbiguousObjectError,
+            EphemerisDataMissing,
+            UpstreamServiceError,
+            ValueError,
+            httpx.HTTPError,
+        ) as e:
+            logger.warning("Could not build segment store for %r: %r", object_id, e)
+            continue
+
+        built_stores += 1
+
+    return built_stores
+
+
+class WatchlistRefresher:
+    def __init__(self, interval_seconds: float = WATCHLIST_REFRESH_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="watchlist-refresher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                with SessionLocal() as session:
+                    refresh_watchlist(session, stop_event=self._stop_event)
+            except Exception:
+                logger.exception("Watchlist refresh failed")
+
+            self._stop_event.wait(self.interval_seconds)
+
+
+watchlist_refresher = WatchlistRefresher()
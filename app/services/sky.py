@@ -0,0 +1,128 @@
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from app.config import SKY_SUMMARY_BODIES, SKY_SUMMARY_BUCKET_MINUTES
+from app.config import SKY_SUMMARY_MAX_WORKERS, SKY_SUMMARY_DEGRADED_TTL_SECONDS
+from app.exceptions import ObjectNotFoundError, EphemerisDataMissing
+from app.exceptions import UpstreamServiceError
+from app.services.cache import sky_summary_cache
+from app.services.quantization import record_site_cache_lookup
+from app.services.horizons import search_object, parse_horizons_ephemeris, site_cell
+from app.services.horizons import get_cached_ephemeris
+from app.services.refresher import horizons_rate_limiter
+
+SUMMARY_FIELDS = (
+    "object_name",
+    "object_id",
+    "date",
+    "azimuth_deg",
+    "altitude_deg",
+    "apparent_magnitude",
+    "constellation",
+)
+
+sky_executor = ThreadPoolExecutor(
+    max_workers=SKY_SUMMARY_MAX_WORKERS, thread_name_prefix="sky-summary"
+)
+
+
+def time_bucket(now: datetime, bucket_minutes: int) -> tuple[datetime, float]:
+    bucket_seconds = bucket_minutes * 60
+    timestamp = now.timestamp()
+    bucket_start = datetime.fromtimestamp(
+        timestamp - timestamp % bucket_seconds, timezone.utc
+    )
+    bucket_end = bucket_start + timedelta(seconds=bucket_seconds)
+
+    return bucket_start, (bucket_end - now).total_seconds()
+
+
+def _fetch_body(body: str, coords: str, cell_coords: str) -> dict | None:
+    data = get_cached_ephemeris(body, coords)
+
+    if data is not None:
+        return {field: data.get(field) for field in SUMMARY_FIELDS}
+
+    horizons_rate_limiter.acquire()
+
+    try:
+        output = search_object(object_name=body, coords=cell_coords)
+        data = parse_horizons_ephemeris(output)
+    except (
+        ObjectNotFoundError,
+        EphemerisDataMissing,
+        UpstreamServiceError,
+        httpx.HTTPError,
+    ):
+        return None
+
+    if not isinstance(data, dict):
+        return None
+
+    return {field: data.get(field) for field in SUMMARY_FIELDS}
+
+
+def _visibility_sort_key(body_summary: dict) -> tuple:
+    altitude = body_summary.get("altitude_deg")
+    altitude = float(altitude) if altitude is not None else float("-inf")
+
+    return (altitude <= 0, -altitude)
+
+
+def get_sky_summary(
+    coords: str,
+    bodies: list[str] | None = None,
+    now: datetime | None = None,
+) -> dict:
+    if bodies is None:
+        bodies = SKY_SUMMARY_BODIES
+
+    if now is None:
+        now = datetime.now(timezone.utc)
+
+    cell_coords = site_cell(coords)
+    bucket_start, bucket_ttl = time_bucket(now, SKY_SUMMARY_BUCKET_MINUTES)
+
+    cache_key = (cell_coords, bucket_start.isoformat(), tuple(bodies))
+
+    fetched = False
+
+    def fetch_summary() -> dict:
+        nonlocal fetched
+        fetched = True
+
+        results = sky_executor.map(
+            _fetch_body,
+            bodies,
+            [coords] * len(bodies),
+            [cell_coords] * len(bodies),
+        )
+
+        objects = []
+        unavailable = []
+        for body, body_summary in zip(bodies, results):
+            if body_summary is None:
+                unavailable.append(body)
+                continue
+
+            objects.append(body_summary)
+
+        objects.sort(key=_visibility_sort_key)
+
+        return {
+            "site": cell_coords,
+            "bucket_start": bucket_start.isoformat(),
+            "objects": objects,
+            "unavailable": unavailable,
+        }
+
+    def summary_ttl(summary: dict) -> float:
+        if summary["unavailable"]:
+            return min(bucket_ttl, SKY_SUMMARY_DEGRADED_TTL_SECONDS)
+
+        return bucket_ttl
+
+    summary = sky_summary_cache.get_or_set(cache_key, fetch_summary, summary_ttl)
+    record_site_cache_lookup("sky_summary", not fetched)
+
+    return summary
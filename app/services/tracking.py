@@ -0,0 +1,213 @@
+import logging
+import threading
+import httpx
+import numpy as np
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from app.config import TRACK_REFRESH_MINUTES
+from app.exceptions import ObjectNotFoundError, EphemerisDataMissing
+from app.exceptions import AmbiguousObjectError, UpstreamServiceError
+from app.services.cache import track_cache
+from app.services.horizons import search_object_range, parse_horizons_ephemeris_series
+from app.services.horizons import site_cell, HORIZONS_TIME_FORMAT
+from app.services.metrics import track_feeds, track_subscribers
+from app.services.refresher import horizons_rate_limiter
+
+logger = logging.getLogger(__name__)
+
+TRACK_STEP_SIZE = "1m"
+TRACK_POLL_SECONDS = 1.0
+TRACK_RETRY_SECONDS = 30
+
+
+def track_window(now: datetime) -> tuple[datetime, datetime]:
+    period_seconds = TRACK_REFRESH_MINUTES * 60
+    window_start = datetime.fromtimestamp(
+        now.timestamp() // period_seconds * period_seconds, tz=timezone.utc
+    )
+
+    return window_start, window_start + timedelta(minutes=TRACK_REFRESH_MINUTES)
+
+
+def fetch_track(
+    object_name: str, cell_coords: str, start_time: datetime, stop_time: datetime
+) -> dict:
+    output = search_object_range(
+        object_name, cell_coords, start_time, stop_time, step_size=TRACK_STEP_SIZE
+    )
+    series = parse_horizons_ephemeris_series(output)
+
+    altitude = series.floats("altitude_deg")
+    azimuth = series.floats("azimuth_deg")
+    valid = ~(np.isnan(altitude) | np.isnan(azimuth))
+
+    return {
+        "object_name": series.object_name,
+        "object_id": series.object_id,
+        "times": series.timestamps(HORIZONS_TIME_FORMAT)[valid].tolist(),
+        "azimuth": azimuth[valid].tolist(),
+        "altitude": altitude[valid].tolist(),
+    }
+
+
+class TrackFeed:
+    def __init__(self, object_name: str, cell_coords: str):
+        self.key = (object_name, cell_coords)
+        self.object_name = object_name
+        self.cell_coords = cell_coords
+        self.subscribers = 0
+        self.track: dict | None = None
+        self.next_refresh_at = 0.0
+        self._lock = threading.Lock()
+
+    def needs_refresh(self, now: datetime) -> bool:
+        return now.timestamp() >= self.next_refresh_at
+
+    def refresh(self, now: datetime) -> bool:
+        with self._lock:
+            if not self.needs_refresh(now):
+                return False
+
+            window_start, next_refresh_at = track_window(now)
+            stop_time = next_refresh_at + timedelta(minutes=TRACK_REFRESH_MINUTES)
+
+            track = track_cache.get_or_set(
+                (self.object_name, self.cell_coords, window_start.isoformat()),
+                partial(
+                    fetch_track,
+                    self.object_name,
+                    self.cell_coords,
+                    window_start,
+                    stop_time,
+                ),
+                (stop_time - now).total_seconds(),
+            )
+
+            self.track = {
+                "object_name": track["object_name"],
+                "object_id": track["object_id"],
+                "times": np.asarray(track["times"], dtype=np.float64),
+                "azimuth": np.unwrap(
+                    np.asarray(track["azimuth"], dtype=np.float64), period=360
+                ),
+                "altitude": np.asarray(track["altitude"], dtype=np.float64),
+            }
+            self.next_refresh_at = next_refresh_at.timestamp()
+
+            return True
+
+    def position(self, when: datetime) -> dict | None:
+        track = self.track
+
+        if track is None or len(track["times"]) < 2:
+            return None
+
+        timestamp = when.timestamp()
+        if not track["times"][0] <= timestamp <= track["times"][-1]:
+            return None
+
+        azimuth = np.interp(timestamp, track["times"], track["azimuth"]) % 360
+        altitude = np.interp(timestamp, track["times"], track["altitude"])
+
+        return {
+            "object_name": track["object_name"],
+            "object_id": track["object_id"],
+            "time": when.isoformat(timespec="milliseconds"),
+            "azimuth_deg": round(float(azimuth), 6),
+            "altitude_deg": round(float(altitude), 6),
+        }
+
+
+class TrackingHub:
+    def __init__(self, poll_seconds: float = TRACK_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self.feeds: dict[tuple, TrackFeed] = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def subscribe(self, object_name: str | int, coords: str) -> TrackFeed:
+        key = (str(object_name).strip().lower(), site_cell(coords))
+
+        with self._lock:
+            feed = self.feeds.get(key)
+            if feed is None:
+                feed = self.feeds[key] = TrackFeed(*key)
+            feed.subscribers += 1
+            self._record_sizes()
+
+        try:
+            feed.refresh(datetime.now(timezone.utc))
+        except Exception:
+            self.unsubscribe(feed)
+            raise
+
+        return feed
+
+    def unsubscribe(self, feed: TrackFeed) -> None:
+        with self._lock:
+            feed.subscribers -= 1
+            if feed.subscribers <= 0 and self.feeds.get(feed.key) is feed:
+                del self.feeds[feed.key]
+            self._record_sizes()
+
+    def _record_sizes(self) -> None:
+        track_feeds.set(len(self.feeds))
+        track_subscribers.set(sum(feed.subscribers for feed in self.feeds.values()))
+
+    def refresh_feeds(self, now: datetime) -> int:
+        with self._lock:
+            feeds = list(self.feeds.values())
+
+        refreshed_feeds = 0
+        for feed in feeds:
+            if not feed.needs_refresh(now):
+                continue
+
+            if not horizons_rate_limiter.acquire(self._stop_event):
+                break
+
+            try:
+                refreshed_feeds += feed.refresh(now)
+            except (
+                httpx.HTTPError,
+                ObjectNotFoundError,
+                EphemerisDataMissing,
+                AmbiguousObjectError,
+                UpstreamServiceError,
+                ValueError,
+                IndexError,
+            ) as e:
+                logger.warning("Could not refresh track feed %r: %r", feed.key, e)
+                feed.next_refresh_at = now.timestamp() + TRACK_RETRY_SECONDS
+
+        return refreshed_feeds
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="tracking-hub", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.refresh_feeds(datetime.now(timezone.utc))
+            except Exception:
+                logger.exception("Track feed refresh failed")
+
+            self._stop_event.wait(self.poll_seconds)
+
+
+tracking_hub = TrackingHub()
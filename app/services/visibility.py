@@ -0,0 +1,233 @@
+import numpy as np
+from datetime import date, datetime, timedelta, timezone
+from app.config import VISIBILITY_STEP_MINUTES, VISIBILITY_CACHE_TTL_SECONDS
+from app.services.cache import visibility_cache
+from app.services.quantization import record_site_cache_lookup
+from app.services.horizons import search_object_range, parse_horizons_ephemeris_series
+from app.services.horizons import site_cell, HORIZONS_TIME_FORMAT
+from app.parsers.horizons_tables import EphemerisSeries
+
+HORIZON_ALTITUDE_DEG = 0.0
+
+
+def observing_window(
+    observing_date: date, longitude: float
+) -> tuple[datetime, datetime]:
+    local_noon = datetime(
+        observing_date.year,
+        observing_date.month,
+        observing_date.day,
+        12,
+        tzinfo=timezone.utc,
+    ) - timedelta(hours=longitude / 15)
+    start_time = local_noon.replace(second=0, microsecond=0)
+
+    return start_time, start_time + timedelta(days=1)
+
+
+def current_observing_date(longitude: float) -> date:
+    local_time = datetime.now(timezone.utc) + timedelta(hours=longitude / 15)
+
+    return (local_time - timedelta(hours=12)).date()
+
+
+def _series_to_columns(series: EphemerisSeries) -> dict:
+    altitude = series.floats("altitude_deg")
+    azimuth = series.floats("azimuth_deg")
+    valid = ~(np.isnan(altitude) | np.isnan(azimuth))
+
+    return {
+        "times": series.timestamps(HORIZONS_TIME_FORMAT)[valid].tolist(),
+        "altitude": altitude[valid].tolist(),
+        "azimuth": azimuth[valid].tolist(),
+    }
+
+
+def _to_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(round(timestamp), tz=timezone.utc)
+
+
+def _find_crossings(
+    times: np.ndarray, values: np.ndarray, threshold: float
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    above = values >= threshold
+    indices = np.flatnonzero(above[1:] != above[:-1])
+
+    start_values = values[indices]
+    stop_values = values[indices + 1]
+    fractions = (threshold - start_values) / (stop_values - start_values)
+
+    crossing_times = times[indices] + fractions * (times[indices + 1] - times[indices])
+    rising = ~above[indices]
+
+    return crossing_times, rising, indices, fractions
+
+
+def _interpolate(values: np.ndarray, index: int, fraction: float) -> float:
+    if fraction == 0 or index + 1 >= len(values):
+        return float(values[index])
+
+    return float(values[index] + fraction * (values[index + 1] - values[index]))
+
+
+def _refine_maximum(
+    times: np.ndarray, values: np.ndarray
+) -> tuple[float, float, int, float] | None:
+    index = int(np.argmax(values))
+
+    if index == 0 or index == len(values) - 1:
+        return None
+
+    previous_value, peak_value, next_value = values[index - 1 : index + 2]
+    curvature = previous_value - 2 * peak_value + next_value
+
+    offset = 0.0
+    if curvature != 0:
+        offset = float(
+            np.clip(0.5 * (previous_value - next_value) / curvature, -0.5, 0.5)
+        )
+
+    step = times[index + 1] - times[index]
+    peak_time = times[index] + offset * step
+    refined_value = peak_value - 0.25 * (previous_value - next_value) * offset
+
+    if offset < 0:
+        return float(peak_time), float(refined_value), index - 1, 1 + offset
+
+    return float(peak_time), float(refined_value), index, offset
+
+
+def compute_visibility(columns: dict, min_altitude_deg: float) -> dict:
+    times = np.asarray(columns["times"], dtype=np.float64)
+    altitude = np.asarray(columns["altitude"], dtype=np.float64)
+    azimuth = np.degrees(np.unwrap(np.radians(columns["azimuth"])))
+
+    result = {
+        "rise_time": None,
+        "rise_azimuth_deg": None,
+        "transit_time": None,
+        "transit_altitude_deg": None,
+        "transit_azimuth_deg": None,
+        "set_time": None,
+        "set_azimuth_deg": None,
+        "windows": [],
+    }
+
+    if len(times) < 2:
+        return result
+
+    crossing_times, rising, indices, fractions = _find_crossings(
+        times, altitude, HORIZON_ALTITUDE_DEG
+    )
+
+    rise_positions = np.flatnonzero(rising)
+    if len(rise_positions):
+        rise = rise_positions[0]
+        result["rise_time"] = _to_datetime(crossing_times[rise])
+        result["rise_azimuth_deg"] = (
+            _interpolate(azimuth, indices[rise], fractions[rise]) % 360
+        )
+
+    set_positions = np.flatnonzero(~rising)
+    if result["rise_time"] is not None:
+        set_positions = set_positions[set_positions > rise_positions[0]]
+    if len(set_positions):
+        setting = set_positions[0]
+        result["set_time"] = _to_datetime(crossing_times[setting])
+        result["set_azimuth_deg"] = (
+            _interpolate(azimuth, indices[setting], fractions[setting]) % 360
+        )
+
+    maximum = _refine_maximum(times, altitude)
+    if maximum is not None:
+        peak_time, peak_altitude, index, fraction = maximum
+        result["transit_time"] = _to_datetime(peak_time)
+        result["transit_altitude_deg"] = peak_altitude
+        result["transit_azimuth_deg"] = _interpolate(azimuth, index, fraction) % 360
+
+    window_times, window_rising, _, _ = _find_crossings(
+        times, altitude, min_altitude_deg
+    )
+
+    window_start = times[0] if altitude[0] >= min_altitude_deg else None
+    window_bounds = []
+    for crossing_time, is_rising in zip(window_times, window_rising):
+        if is_rising:
+            window_start = crossing_time
+        elif window_start is not None:
+            window_bounds.append((window_start, crossing_time))
+            window_start = None
+
+    if window_start is not None:
+        window_bounds.append((window_start, times[-1]))
+
+    for window_start, window_end in window_bounds:
+        inside = (times >= window_start) & (times <= window_end)
+        max_altitude = (
+            float(altitude[inside].max()) if inside.any() else min_altitude_deg
+        )
+
+        result["windows"].append(
+            {
+                "start": _to_datetime(window_start),
+                "end": _to_datetime(window_end),
+                "max_altitude_deg": max(max_altitude, min_altitude_deg),
+            }
+        )
+
+    return result
+
+
+def get_visibility(
+    object_name: str | int,
+    coords: str,
+    min_altitude_deg: float,
+    observing_date: date | None = None,
+) -> dict:
+    cell_coords = site_cell(coords)
+    longitude = float(cell_coords.split(",")[0])
+
+    if observing_date is None:
+        observing_date = current_observing_date(longitude)
+
+    cache_key = (
+        str(object_name).strip().lower(),
+        cell_coords,
+        observing_date.isoformat(),
+    )
+
+    fetched = False
+
+    def fetch_series() -> dict:
+        nonlocal fetched
+        fetched = True
+
+        start_time, stop_time = observing_window(observing_date, longitude)
+
+        output = search_object_range(
+            object_name,
+            cell_coords,
+            start_time,
+            stop_time,
+            step_size=f"{VISIBILITY_STEP_MINUTES}m",
+        )
+        series = parse_horizons_ephemeris_series(output)
+
+        return {
+            "object_name": series[0]["object_name"] if series else str(object_name),
+            "object_id": series[0]["object_id"] if series else str(object_name),
+            "columns": _series_to_columns(series),
+        }
+
+    cached_series = visibility_cache.get_or_set(
+        cache_key, fetch_series, VISIBILITY_CACHE_TTL_SECONDS
+    )
+    record_site_cache_lookup("visibility", not fetched)
+
+    visibility = compute_visibility(cached_series["columns"], min_altitude_deg)
+    visibility["object_name"] = cached_series["object_name"]
+    visibility["object_id"] = cached_series["object_id"]
+    visibility["date"] = observing_date
+    visibility["min_altitude_deg"] = min_altitude_deg
+
+    return visibility
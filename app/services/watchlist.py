@@ -0,0 +1,73 @@
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.watchlist import WatchlistItem
+from app.schemas.watchlist import WatchlistItemIn
+
+
+def get_watchlist(user_id: int, session_instance: Session) -> list[WatchlistItem]:
+    stmt = (
+        select(WatchlistItem)
+        .where(WatchlistItem.user_id == user_id)
+        .order_by(WatchlistItem.id)
+    )
+
+    return list(session_instance.execute(stmt).scalars())
+
+
+def get_watchlist_item(
+    user_id: int, item_in: WatchlistItemIn, session_instance: Session
+) -> WatchlistItem | None:
+    stmt = select(WatchlistItem).where(
+        WatchlistItem.user_id == user_id,
+        WatchlistItem.object_id == item_in.object_id,
+        WatchlistItem.location == item_in.location,
+    )
+
+    if item_in.elevation is None:
+        stmt = stmt.where(WatchlistItem.elevation.is_(None))
+    else:
+        stmt = stmt.where(WatchlistItem.elevation == item_in.elevation)
+
+    return session_instance.execute(stmt).scalar()
+
+
+def add_watchlist_item(
+    user_id: int, item_in: WatchlistItemIn, session_instance: Session
+) -> WatchlistItem:
+    new_item = WatchlistItem(user_id=user_id, **item_in.model_dump())
+
+    session_instance.add(new_item)
+    session_instance.commit()
+    session_instance.refresh(new_item)
+
+    return new_item
+
+
+def delete_watchlist_item(
+    user_id: int, item_id: int, session_instance: Session
+) -> bool:
+    stmt = select(WatchlistItem).where(
+        WatchlistItem.id == item_id, WatchlistItem.user_id == user_id
+    )
+    item = session_instance.execute(stmt).scalar()
+
+    if not item:
+        return False
+
+    session_instance.delete(item)
+    session_instance.commit()
+
+    return True
+
+
+def get_watched_sites(session_instance: Session) -> dict[tuple, set[str]]:
+    stmt = select(
+        WatchlistItem.location, WatchlistItem.elevation, WatchlistItem.object_id
+    ).distinct()
+
+    sites = {}
+    for location, elevation, object_id in session_instance.execute(stmt):
+        site_key = (location.strip().lower(), elevation)
+        sites.setdefault(site_key, set()).add(object_id)
+
+    return sites
@@ -0,0 +1,107 @@
+import argparse
+import random
+import resource
+import string
+import tempfile
+import time
+from pathlib import Path
+from app.services.gazetteer import Gazetteer
+
+SYLLABLES = [
+    consonant + vowel for consonant in "bcdfghjklmnprstvz" for vowel in "aeiou"
+]
+
+
+def random_place_name(rng: random.Random) -> str:
+    words = [
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))).title()
+        for _ in range(rng.choice((1, 1, 1, 2)))
+    ]
+
+    return " ".join(words)
+
+
+def write_geonames_file(path: Path, places: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    names = []
+
+    with open(path, "w", encoding="utf-8") as geonames_file:
+        for geonameid in range(places):
+            name = random_place_name(rng)
+            names.append(name)
+            country_code = "".join(rng.choices(string.ascii_uppercase, k=2))
+            population = int(rng.paretovariate(1.2) * 100)
+
+            geonames_file.write(
+                f"{geonameid}\t{name}\t{name}\t\t"
+                f"{rng.uniform(-90, 90):.5f}\t{rng.uniform(-180, 180):.5f}\t"
+                f"P\tPPL\t{country_code}\t\t\t\t\t\t{population}\t\t0\tUTC\t"
+                "2024-01-01\n"
+            )
+
+    return names
+
+
+def rate(operations: int, seconds: float) -> str:
+    return f"{operations / seconds:,.0f}/s ({seconds / operations * 1e6:,.1f} µs each)"
+
+
+def misspell(name: str, rng: random.Random) -> str:
+    position = rng.randrange(2, len(name))
+
+    return name[:position] + rng.choice(string.ascii_lowercase) + name[position + 1 :]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the offline gazetteer.")
+    parser.add_argument("--places", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=100_000)
+    parser.add_argument("--fuzzy-queries", type=int, default=1_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as temporary_dir:
+        path = Path(temporary_dir) / "places.tsv"
+
+        start = time.perf_counter()
+        names = write_geonames_file(path, args.places, args.seed)
+        print(f"generated {args.places:,} places in {time.perf_counter() - start:.1f}s")
+
+        rss_before_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        start = time.perf_counter()
+        gazetteer = Gazetteer.from_geonames(str(path))
+        load_seconds = time.perf_counter() - start
+        rss_after_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"loaded in {load_seconds:.1f}s")
+    print(f"index arrays: {gazetteer.nbytes / 2**20:.1f} MiB")
+    print(
+        f"peak RSS growth while loading: {(rss_after_kb - rss_before_kb) / 2**10:.1f} MiB"
+    )
+
+    queries = [rng.choice(names) for _ in range(args.queries)]
+    start = time.perf_counter()
+    hits = sum(gazetteer.lookup(query) is not None for query in queries)
+    print(
+        f"exact lookup: {rate(len(queries), time.perf_counter() - start)}, {hits:,} hits"
+    )
+
+    prefixes = [query[: rng.randint(3, 6)] for query in queries]
+    start = time.perf_counter()
+    for prefix in prefixes:
+        gazetteer.search(prefix, limit=10)
+    print(f"prefix search: {rate(len(prefixes), time.perf_counter() - start)}")
+
+    typos = [misspell(query, rng) for query in queries[: args.fuzzy_queries]]
+    start = time.perf_counter()
+    found = sum(bool(gazetteer.fuzzy_search(typo, limit=5)) for typo in typos)
+    print(
+        f"fuzzy search: {rate(len(typos), time.perf_counter() - start)}, "
+        f"{found:,} with results"
+    )
+
+
+if __name__ == "__main__":
+    main()
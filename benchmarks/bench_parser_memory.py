@@ -0,0 +1,238 @@
+import argparse
+import gc
+import multiprocessing
+import resource
+import time
+import tracemalloc
+from app.parsers.horizons_grammar import horizons_grammar as grammar_map
+from app.parsers.horizons_mappings import multi_match_mapping_table as m_mapping_table
+from app.parsers.horizons_mappings import single_match_mapping_table as s_mapping_table
+from app.services.horizons import parse_horizons_ephemeris
+from app.services.horizons import parse_horizons_ephemeris_series
+from app.services.horizons import _parse_target_name, _slice_substring_into_list
+from app.services.horizons import _row_tokens
+
+SERIES_HEADER = (
+    " Date__(UT)__HR:MN  R.A.__(a-apparent)__DEC  Azi____(a-app)___Elev  APmag"
+    "   S-brt  Illu%  Ang-diam  r  rdot  delta  deldot  S-T-O  Cnst"
+)
+SERIES_ROW = (
+    " 2025-Dec-{day:02d} {hour:02d}:{minute:02d} *m  18 30 43.42 -24 05 40.2"
+    "  {azimuth:.6f}  {altitude:.6f}  1.091   3.770  99.94014  3.876377"
+    "  1.436626158701  -1.8934692  2.41599313076047  -0.7162227  4.1043  Sgr"
+)
+MATCH_HEADER = (
+    "  ID#      Name                               Designation  IAU/aliases/other\n"
+    "  -------  ---------------------------------- -----------  -------------------"
+)
+
+
+def series_payload(rows: int) -> dict:
+    lines = []
+    for index in range(rows):
+        day, minute_of_day = divmod(index, 1440)
+        lines.append(
+            SERIES_ROW.format(
+                day=day % 28 + 1,
+                hour=minute_of_day // 60,
+                minute=minute_of_day % 60,
+                azimuth=index * 0.25 % 360,
+                altitude=index * 0.05 % 90,
+            )
+        )
+
+    return {
+        "result": "Target body name: Mars (499)  {source: mar097}\n"
+        + SERIES_HEADER
+        + "\n$$SOE\n"
+        + "\n".join(lines)
+        + "\n$$EOE\n"
+    }
+
+
+def match_payload(rows: int) -> dict:
+    lines = [
+        f"  {-index:>7}  {f'Spacecraft {index} (spacecraft)':<34} "
+        f"{f'2013-{index % 1000:03d}A':<11}  MSN-{index}"
+        for index in range(1, rows + 1)
+    ]
+
+    return {
+        "result": ' Multiple major-bodies match string "S*"\n\n'
+        + MATCH_HEADER
+        + "\n"
+        + "\n".join(lines)
+        + f"\n\n   Number of matches = {rows}. Use ID# to make unique selection.\n"
+    }
+
+
+def legacy_parse_series(raw_data: dict) -> list[dict]:
+    data = raw_data["result"]
+    object_name, object_id = _parse_target_name(data)
+    grammar = dict(grammar_map)
+
+    h_row_first_slice = data.find("Date__(UT)")
+    h_row_second_slice = data.find("\n", h_row_first_slice)
+    header_tokens = data[h_row_first_slice:h_row_second_slice].split()
+    data_string = data[data.find("$$SOE") + 5 : data.find("$$EOE")].strip()
+
+    series = []
+    for row in data_string.splitlines():
+        data_list = _row_tokens(row)
+
+        raw_dict = {}
+        i = 0
+        for header in header_tokens:
+            span = grammar.get(header, 1)
+            if header in s_mapping_table:
+                raw_dict[header] = data_list[i : i + span]
+            i += span
+
+        mapped_dict = {}
+        for header, value in raw_dict.items():
+            if len(s_mapping_table[header]) > 1:
+                for key, obj_data in zip(s_mapping_table[header], value):
+                    mapped_dict[key] = obj_data
+            else:
+                mapped_dict[s_mapping_table[header][0]] = " ".join(value)
+
+        for key, value in mapped_dict.items():
+            if value == "n.a.":
+                mapped_dict[key] = None
+
+        row_dict = {
+            "source": "Unknown source",
+            "object_name": object_name,
+            "object_id": object_id,
+        }
+        row_dict.update(mapped_dict)
+        series.append(row_dict)
+
+    return series
+
+
+def legacy_parse_matches(raw_data: dict) -> list[dict]:
+    data = raw_data["result"]
+
+    h_row_first_slice_i = data.find("ID#")
+    h_row_second_slice_i = data.find("\n", h_row_first_slice_i)
+    header_row = data[h_row_first_slice_i:h_row_second_slice_i]
+
+    raw_dashed_first_slice = data.find(" ", h_row_second_slice_i)
+    raw_dashed_second_slice = data.find("\n", raw_dashed_first_slice)
+    raw_dashed_row = data[raw_dashed_first_slice:raw_dashed_second_slice]
+    offset_index = raw_dashed_row.find("-")
+
+    dashed_first_slice = data.find("-", h_row_second_slice_i)
+    dashed_second_slice = data.find("\n", dashed_first_slice)
+    dashed_row = data[dashed_first_slice:dashed_second_slice]
+
+    dash_index_list = [0] + [
+        i
+        for i in range(1, len(dashed_row))
+        if dashed_row[i] == "-" and dashed_row[i - 1] != "-"
+    ]
+    column_names_list = _slice_substring_into_list(header_row, dash_index_list)
+
+    mapped_list = []
+    for row in data[dashed_second_slice + 1 :].splitlines():
+        if row.strip() == "":
+            break
+
+        parsed_row = _slice_substring_into_list(row[offset_index:], dash_index_list)
+        raw_dict = dict(zip(column_names_list, parsed_row))
+
+        new_dict = {}
+        for key, value in raw_dict.items():
+            if key in m_mapping_table and m_mapping_table[key] not in new_dict:
+                new_dict[m_mapping_table[key]] = value
+        mapped_list.append(new_dict)
+
+    return mapped_list
+
+
+def columnar_series(raw_data: dict):
+    series = parse_horizons_ephemeris_series(raw_data)
+    series.floats("altitude_deg")
+    series.floats("azimuth_deg")
+
+    return series
+
+
+SCENARIOS = {
+    "series/legacy dicts": (series_payload, legacy_parse_series),
+    "series/columnar": (series_payload, columnar_series),
+    "matches/legacy dicts": (match_payload, legacy_parse_matches),
+    "matches/columnar": (match_payload, parse_horizons_ephemeris),
+}
+
+
+def measure(scenario: str, rows: int, traced: bool) -> dict:
+    make_payload, parse = SCENARIOS[scenario]
+    payload = make_payload(rows)
+    gc.collect()
+
+    collections_before = sum(stats["collections"] for stats in gc.get_stats())
+    rss_before_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if traced:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+    result = parse(payload)
+    seconds = time.perf_counter() - start
+
+    measurement = {
+        "rows": len(result),
+        "seconds": seconds,
+        "rss_growth_mib": (
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before_kb
+        )
+        / 2**10,
+        "gc_collections": sum(stats["collections"] for stats in gc.get_stats())
+        - collections_before,
+    }
+
+    if traced:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        measurement["retained_mib"] = current / 2**20
+        measurement["peak_mib"] = peak / 2**20
+        measurement["retained_blocks"] = sum(
+            statistic.count for statistic in snapshot.statistics("filename")
+        )
+
+    return measurement
+
+
+def run_isolated(scenario: str, rows: int, traced: bool) -> dict:
+    context = multiprocessing.get_context("spawn")
+
+    with context.Pool(1) as pool:
+        return pool.apply(measure, (scenario, rows, traced))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Compare memory use of legacy dict rows and columnar tables."
+    )
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(
+        f"{'scenario':<22} {'rows':>7} {'parse s':>8} {'RSS MiB':>8} "
+        f"{'peak MiB':>9} {'kept MiB':>9} {'blocks':>9} {'GCs':>5}"
+    )
+    for scenario in SCENARIOS:
+        untraced = run_isolated(scenario, args.rows, traced=False)
+        traced = run_isolated(scenario, args.rows, traced=True)
+        print(
+            f"{scenario:<22} {untraced['rows']:>7} {untraced['seconds']:>8.3f} "
+            f"{untraced['rss_growth_mib']:>8.1f} {traced['peak_mib']:>9.1f} "
+            f"{traced['retained_mib']:>9.1f} {traced['retained_blocks']:>9,} "
+            f"{untraced['gc_collections']:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
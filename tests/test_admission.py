@@ -0,0 +1,213 @@
+from app.main import app
+from app.services.admission import AdmissionController, admission_controllers
+from app.services.metrics import admission_queue_depth, requests_shed
+from app.exceptions import RequestShedError
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.session import get_session
+from app.services.auth import create_user
+import asyncio
+import pytest
+
+client = TestClient(app)
+
+fake_engine = create_engine(
+    "sqlite:///:memory:", connect_args={"check_same_thread": False}
+)
+
+Base.metadata.create_all(bind=fake_engine)
+
+
+@pytest.fixture
+def override_get_session(db_session):
+    def override_dependency():
+        return db_session
+
+    app.dependency_overrides[get_session] = override_dependency
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db_session():
+    connection = fake_engine.connect()
+    transaction = connection.begin()
+    SessionLocal = sessionmaker(bind=connection)
+    session = SessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    transaction.close()
+
+
+@pytest.fixture
+def auth_header(db_session, override_get_session):
+    create_user("admission", "fortest", db_session)
+    response = client.post(
+        "/auth/login", data={"username": "admission", "password": "fortest"}
+    )
+    token = response.json()["access_token"]
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def saturated_search():
+    controller = admission_controllers["/horizons/search"]
+    max_queue = controller.max_queue
+    service_seconds = controller.service_seconds
+    controller.active = controller.max_concurrent
+    controller.max_queue = 0
+    yield controller
+    controller.active = 0
+    controller.max_queue = max_queue
+    controller.service_seconds = service_seconds
+
+
+def test_queued_requests_are_admitted_in_order():
+    async def scenario():
+        controller = AdmissionController(
+            "/test/order", max_concurrent=1, max_queue=4, initial_service_seconds=0.0
+        )
+        admitted = []
+
+        async def request(name: str):
+            async with controller.admit(budget_seconds=5):
+                admitted.append(name)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(request(name) for name in "abcd"))
+
+        return controller, admitted
+
+    controller, admitted = asyncio.run(scenario())
+
+    assert admitted == ["a", "b", "c", "d"]
+    assert controller.active == 0
+    assert controller.queue_depth == 0
+    assert controller.service_seconds > 0
+
+
+def test_full_queue_is_rejected_with_429():
+    async def scenario():
+        controller = AdmissionController("/test/full", max_concurrent=1, max_queue=1)
+        await controller.acquire(budget_seconds=5)
+        queued = asyncio.create_task(controller.acquire(budget_seconds=5))
+        await asyncio.sleep(0)
+
+        assert admission_queue_depth.get(route="/test/full") == 1
+
+        with pytest.raises(RequestShedError) as shed:
+            await controller.acquire(budget_seconds=5)
+
+        controller.release()
+        await queued
+
+        return shed.value
+
+    shed = asyncio.run(scenario())
+
+    assert shed.status_code == 429
+    assert shed.retry_after >= 1
+    assert requests_shed.get(route="/test/full", reason="queue_full") == 1
+
+
+def test_requests_that_would_miss_their_budget_are_shed_up_front():
+    async def scenario():
+        controller = AdmissionController("/test/deadline", max_concurrent=2)
+        controller.service_seconds = 3.0
+        await controller.acquire(budget_seconds=5)
+        await controller.acquire(budget_seconds=5)
+
+        with pytest.raises(RequestShedError) as shed:
+            await controller.acquire(budget_seconds=1)
+
+        return controller, shed.value
+
+    controller, shed = asyncio.run(scenario())
+
+    assert shed.status_code == 503
+    assert shed.retry_after == 3
+    assert controller.queue_depth == 0
+    assert requests_shed.get(route="/test/deadline", reason="deadline") == 1
+
+
+def test_queue_wait_is_bounded_by_budget():
+    async def scenario():
+        controller = AdmissionController(
+            "/test/timeout", max_concurrent=1, initial_service_seconds=0.0
+        )
+        await controller.acquire(budget_seconds=5)
+
+        with pytest.raises(RequestShedError) as shed:
+            await controller.acquire(budget_seconds=0.05)
+
+        controller.release()
+
+        return controller, shed.value
+
+    controller, shed = asyncio.run(scenario())
+
+    assert shed.status_code == 503
+    assert controller.active == 0
+    assert controller.queue_depth == 0
+    assert requests_shed.get(route="/test/timeout", reason="queue_timeout") == 1
+
+
+def test_saturated_search_sheds_while_login_keeps_working(
+    auth_header, saturated_search
+):
+    response = client.get(
+        "/horizons/search",
+        params={"query": "mars", "location": "prague"},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many concurrent requests"}
+    assert int(response.headers["Retry-After"]) >= 1
+
+    response = client.post(
+        "/auth/login", data={"username": "admission", "password": "fortest"}
+    )
+    assert response.status_code == 200
+
+
+def test_shed_metrics_are_exported(auth_header, saturated_search):
+    client.get(
+        "/horizons/search",
+        params={"query": "mars", "location": "prague"},
+        headers=auth_header,
+    )
+
+    body = client.get("/metrics").text
+
+    assert (
+        'skyarchive_requests_shed_total{route="/horizons/search",reason="queue_full"}'
+        in body
+    )
+    assert "skyarchive_admission_queue_depth" in body
+
+
+def test_wait_estimate_is_seeded_before_first_sample():
+    async def scenario():
+        controller = AdmissionController(
+            "/test/seeded", max_concurrent=1, initial_service_seconds=4.0
+        )
+        await controller.acquire(budget_seconds=10)
+
+        with pytest.raises(RequestShedError) as shed:
+            await controller.acquire(budget_seconds=2)
+
+        controller.release(service_seconds=1.0)
+
+        return controller, shed.value
+
+    controller, shed = asyncio.run(scenario())
+
+    assert shed.status_code == 503
+    assert shed.retry_after == 4
+    assert controller.service_seconds == pytest.approx(3.4)
+    assert requests_shed.get(route="/test/seeded", reason="deadline") == 1
@@ -0,0 +1,152 @@
+from app.services import cache as cache_module
+from app.services.cache import CacheBackend, MemoryCacheBackend, SQLiteCacheBackend
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+import pytest
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCacheBackend("test")
+
+    return SQLiteCacheBackend("test", str(tmp_path / "cache.db"))
+
+
+def test_set_and_get_round_trip(backend):
+    backend.set(("mars", "1.0,2.0,0.3"), {"object_id": "499", "rows": [1, 2]}, 60)
+
+    assert backend.get(("mars", "1.0,2.0,0.3")) == {
+        "object_id": "499",
+        "rows": [1, 2],
+    }
+    assert backend.get(("venus", "1.0,2.0,0.3")) is None
+    assert len(backend) == 1
+
+
+def test_expired_entries_are_misses(backend):
+    backend.set("short", "value", 0.05)
+    backend.set("long", "value", 60)
+
+    time.sleep(0.1)
+
+    assert backend.get("short") is None
+    assert backend.get("long") == "value"
+    assert len(backend) == 1
+
+
+def test_add_only_sets_absent_or_expired_keys(backend):
+    assert backend.add("lock", "first", 0.05) is True
+    assert backend.add("lock", "second", 60) is False
+    assert backend.get("lock") == "first"
+
+    time.sleep(0.1)
+
+    assert backend.add("lock", "third", 60) is True
+    assert backend.get("lock") == "third"
+
+
+def test_delete_and_clear(backend):
+    backend.set("a", 1, 60)
+    backend.set("b", 2, 60)
+
+    backend.delete("a")
+    assert backend.get("a") is None
+    assert backend.get("b") == 2
+
+    backend.clear()
+    assert len(backend) == 0
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "cache.db")
+    first_worker = SQLiteCacheBackend("ephemeris", path)
+    second_worker = SQLiteCacheBackend("ephemeris", path)
+    other_namespace = SQLiteCacheBackend("geocode", path)
+
+    first_worker.set(["499", "1.0,2.0,0.3", "2025-Dec-24 13:35"], {"r": 1.43}, 60)
+
+    assert second_worker.get(["499", "1.0,2.0,0.3", "2025-Dec-24 13:35"]) == {"r": 1.43}
+    assert other_namespace.get(["499", "1.0,2.0,0.3", "2025-Dec-24 13:35"]) is None
+
+    assert first_worker.add("lock", True, 60) is True
+    assert second_worker.add("lock", True, 60) is False
+
+
+def test_get_or_set_coalesces_concurrent_misses(backend):
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"value": 42}
+
+    def lookup():
+        barrier.wait()
+        return backend.get_or_set("slow", factory, 60)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda _: lookup(), range(8)))
+
+    assert len(calls) == 1
+    assert results == [{"value": 42}] * 8
+
+
+def test_get_or_set_releases_lock_when_factory_fails(backend):
+    def failing_factory():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        backend.get_or_set("flaky", failing_factory, 60)
+
+    assert backend.get_or_set("flaky", lambda: "recovered", 60) == "recovered"
+
+
+def test_create_cache_uses_configured_backend(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache_module, "CACHE_BACKEND", "sqlite")
+    monkeypatch.setattr(cache_module, "CACHE_PATH", str(tmp_path / "shared.db"))
+
+    assert isinstance(cache_module.create_cache("ephemeris"), SQLiteCacheBackend)
+
+    monkeypatch.setattr(cache_module, "CACHE_BACKEND", "redis")
+
+    with pytest.raises(ValueError):
+        cache_module.create_cache("ephemeris")
+
+
+def test_incomplete_backend_cannot_be_instantiated():
+    class GetOnlyBackend(CacheBackend):
+        def _get(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        GetOnlyBackend("incomplete")
+
+
+def test_memory_backend_length_skips_expired_entries():
+    backend = MemoryCacheBackend("test")
+    backend.set("short", "value", 0.05)
+    backend.set("long", "value", 60)
+
+    time.sleep(0.1)
+
+    assert len(backend) == 1
+    assert list(backend._entries) == ["long"]
+
+
+def test_sqlite_backend_purges_once_per_interval_across_threads(tmp_path, monkeypatch):
+    backend = SQLiteCacheBackend("test", str(tmp_path / "cache.db"))
+    monkeypatch.setattr(backend, "PURGE_EVERY_WRITES", 50)
+    backend.set("expired", "value", -1)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda i: backend.set(f"key-{i}", i, 60), range(399)))
+
+    assert next(backend._writes) == 401
+    count_expired = backend._connection().execute(
+        "SELECT COUNT(*) FROM cache_entries WHERE key = ?",
+        (backend._encode_key("expired"),),
+    )
+    assert count_expired.fetchone()[0] == 0
@@ -0,0 +1,294 @@
+from app.main import app
+from app.services import chebyshev
+from app.services.chebyshev import build_segment_store, fit_segments
+from app.services.chebyshev import load_segment_store, stored_ephemeris
+from app.services.chebyshev import segment_store_is_current, write_segment_store
+from app.services.chebyshev import SegmentStore
+from app.services.horizons import parse_horizons_vectors
+from app.services.kepler import approximate_ephemeris, julian_date
+from app.services.kepler import standish_elements, stack_elements
+from app.services.kepler import orbital_positions, ecliptic_to_equatorial
+from app.services.refresher import refresh_segment_stores, horizons_rate_limiter
+from app.services.cache import elements_cache, object_details
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.session import get_session
+from app.services.auth import create_user
+import httpx
+import numpy as np
+import pytest
+
+client = TestClient(app)
+
+fake_engine = create_engine(
+    "sqlite:///:memory:", connect_args={"check_same_thread": False}
+)
+
+Base.metadata.create_all(bind=fake_engine)
+
+SITE = "55,21.5,0.3"
+START_TIME = datetime(2025, 12, 24, tzinfo=timezone.utc)
+
+
+def mars_geocentric(jd: np.ndarray) -> np.ndarray:
+    epoch_jd = float(julian_date([START_TIME])[0])
+    mars = stack_elements([standish_elements("499", epoch_jd)])
+    earth = stack_elements([standish_elements("399", epoch_jd)])
+
+    return ecliptic_to_equatorial(
+        orbital_positions(mars, jd)[0] - orbital_positions(earth, jd)[0]
+    )
+
+
+def fake_vectors_result(start_time: datetime, stop_time: datetime, step: str) -> dict:
+    step_minutes = int(step.rstrip("m"))
+    times = []
+    current_time = start_time
+    while current_time <= stop_time:
+        times.append(current_time)
+        current_time += timedelta(minutes=step_minutes)
+
+    jd = julian_date(times)
+    rows = [
+        f"{row_jd:.9f}, A.D. {time:%Y-%b-%d %H:%M}:00.0000 TDB, "
+        f"{x:.16E}, {y:.16E}, {z:.16E},"
+        for row_jd, time, (x, y, z) in zip(jd, times, mars_geocentric(jd))
+    ]
+
+    return {
+        "result": "Target body name: Mars (499)  {source: mar099}\n"
+        "Center body name: Earth (399)  {source: DE441}\n"
+        "$$SOE\n" + "\n".join(rows) + "\n$$EOE\n"
+    }
+
+
+@pytest.fixture
+def override_get_session(db_session):
+    def override_dependency():
+        return db_session
+
+    app.dependency_overrides[get_session] = override_dependency
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db_session():
+    connection = fake_engine.connect()
+    transaction = connection.begin()
+    SessionLocal = sessionmaker(bind=connection)
+    session = SessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    transaction.close()
+
+
+@pytest.fixture
+def auth_header(db_session, override_get_session):
+    create_user("chebyshev", "fortest", db_session)
+    response = client.post(
+        "/auth/login", data={"username": "chebyshev", "password": "fortest"}
+    )
+    token = response.json()["access_token"]
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def store_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(chebyshev, "EPHEMERIS_STORE_DIR", str(tmp_path))
+    elements_cache.clear()
+    object_details.clear()
+    yield tmp_path
+    elements_cache.clear()
+    object_details.clear()
+
+
+@pytest.fixture
+def fake_vectors(monkeypatch):
+    calls = []
+
+    def fake_search_vectors(object_name, start_time, stop_time, step_size):
+        calls.append((object_name, start_time, stop_time))
+        return fake_vectors_result(start_time, stop_time, step_size)
+
+    monkeypatch.setattr(chebyshev, "search_vectors", fake_search_vectors)
+
+    return calls
+
+
+def test_vectors_parser_reads_positions():
+    stop_time = START_TIME + timedelta(hours=2)
+    vectors = parse_horizons_vectors(fake_vectors_result(START_TIME, stop_time, "60m"))
+
+    assert vectors["object_name"] == "Mars"
+    assert vectors["object_id"] == "499"
+    assert len(vectors["jd"]) == 3
+    assert vectors["jd"][1] - vectors["jd"][0] == pytest.approx(1 / 24)
+    assert np.asarray(vectors["positions"]).shape == (3, 3)
+
+
+def test_segments_reproduce_sampled_positions_between_samples(tmp_path):
+    jd = float(julian_date([START_TIME])[0]) + np.arange(7 * 24 + 1) / 24
+    coefficients = fit_segments(jd, mars_geocentric(jd), segment_days=1, degree=12)
+
+    assert coefficients.shape == (7, 3, 13)
+
+    path = tmp_path / "mars.cheb"
+    write_segment_store(path, "Mars", "499", float(jd[0]), 1, coefficients)
+    store = SegmentStore(path)
+
+    query_jd = jd[0] + np.linspace(0.013, 6.987, 50)
+    error = np.abs(store.positions(query_jd) - mars_geocentric(query_jd))
+    assert error.max() < 1e-10
+    assert store.covers(query_jd)
+    assert not store.covers(jd[-1:] + 0.5)
+
+
+def test_built_store_is_memory_mapped_and_matches_engine(store_dir, fake_vectors):
+    path = build_segment_store("mars", START_TIME, days=7)
+
+    assert path == store_dir / "499.cheb"
+    assert fake_vectors[0][0] == "499"
+
+    store = load_segment_store("499")
+    assert isinstance(store.coefficients, np.memmap)
+    assert store.object_name == "Mars"
+    assert store.segment_count == 7
+    assert load_segment_store("mars") is store
+
+    when = START_TIME + timedelta(days=2, hours=13, minutes=35)
+    ephemeris = stored_ephemeris("mars", SITE, when=when)
+    expected = approximate_ephemeris("mars", SITE, when=when, offline=True)
+
+    assert ephemeris["object_id"] == "499"
+    assert ephemeris["date"] == expected["date"]
+    for field in ("azimuth_deg", "altitude_deg", "solar_elong_deg"):
+        assert ephemeris[field] == pytest.approx(expected[field], abs=0.05)
+    for field in ("sun_distance_au", "earth_distance_au"):
+        assert ephemeris[field] == pytest.approx(expected[field], abs=0.001)
+
+
+def test_store_only_answers_inside_covered_span(store_dir, fake_vectors):
+    build_segment_store("mars", START_TIME, days=7)
+
+    assert stored_ephemeris("mars", SITE, when=START_TIME - timedelta(hours=1)) is None
+    assert stored_ephemeris("mars", SITE, when=START_TIME + timedelta(days=8)) is None
+    assert stored_ephemeris("venus", SITE, when=START_TIME) is None
+
+
+def test_refresher_rebuilds_only_stale_stores(store_dir, fake_vectors, monkeypatch):
+    monkeypatch.setattr(horizons_rate_limiter, "min_interval", 0)
+
+    assert segment_store_is_current("mars", START_TIME) is False
+    assert refresh_segment_stores({"mars"}, START_TIME) == 1
+    assert segment_store_is_current("mars", START_TIME) is True
+
+    assert refresh_segment_stores({"mars"}, START_TIME + timedelta(days=1)) == 0
+    assert refresh_segment_stores({"mars"}, START_TIME + timedelta(days=22)) == 1
+    assert len(fake_vectors) == 2
+
+
+def test_position_only_search_is_served_from_store_inside_span(
+    auth_header, store_dir, fake_vectors, monkeypatch
+):
+    def fake_get_coords(location: str, elevation: float | None = None):
+        return SITE
+
+    def fake_search_object(object_name, coords):
+        raise AssertionError("upstream should not be called inside the span")
+
+    monkeypatch.setattr("app.api.horizons.get_coords", fake_get_coords)
+    monkeypatch.setattr("app.api.horizons.search_object", fake_search_object)
+    monkeypatch.setattr("app.api.horizons.EPHEMERIS_STORE_ENABLED", True)
+
+    build_segment_store("mars", datetime.now(timezone.utc), days=2)
+
+    response = client.get(
+        "/horizons/search",
+        params={"query": "mars", "location": "muscat", "approximate": True},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Ephemeris-Source"] == "segment-store"
+    assert response.json()["object_name"] == "Mars"
+
+
+def test_full_search_fills_store_positions_with_cached_details(
+    auth_header, store_dir, fake_vectors, monkeypatch
+):
+    upstream_calls = []
+    upstream_down = False
+
+    def fake_get_coords(location: str, elevation: float | None = None):
+        return SITE
+
+    def fake_search_object(object_name, coords):
+        upstream_calls.append(object_name)
+        if upstream_down:
+            raise httpx.ConnectError("Horizons unreachable")
+        return {"result": ""}
+
+    def fake_parse_horizons_ephemeris(raw_data: dict):
+        return {
+            "object_name": "Mars",
+            "object_id": "499",
+            "date": "2025-Dec-24 13:35",
+            "azimuth_deg": "241.88",
+            "altitude_deg": "4.51",
+            "apparent_magnitude": "1.09",
+            "constellation": "Sgr",
+        }
+
+    monkeypatch.setattr("app.api.horizons.get_coords", fake_get_coords)
+    monkeypatch.setattr("app.api.horizons.get_cached_ephemeris", lambda *args: None)
+    monkeypatch.setattr("app.api.horizons.search_object", fake_search_object)
+    monkeypatch.setattr(
+        "app.api.horizons.parse_horizons_ephemeris", fake_parse_horizons_ephemeris
+    )
+    monkeypatch.setattr("app.api.horizons.EPHEMERIS_STORE_ENABLED", True)
+
+    build_segment_store("mars", datetime.now(timezone.utc), days=2)
+
+    response = client.get(
+        "/horizons/search",
+        params={"query": "mars", "location": "muscat"},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 200
+    assert "X-Ephemeris-Source" not in response.headers
+    assert response.json()["altitude_deg"] == 4.51
+    assert upstream_calls == ["mars"]
+
+    response = client.get(
+        "/horizons/search",
+        params={"query": "mars", "location": "muscat"},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Ephemeris-Source"] == "segment-store"
+    assert response.json()["altitude_deg"] != 4.51
+    assert response.json()["illumination_percent"] is not None
+    assert response.json()["apparent_magnitude"] == 1.09
+    assert response.json()["constellation"] == "Sgr"
+    assert upstream_calls == ["mars"]
+
+    object_details.clear()
+    upstream_down = True
+    response = client.get(
+        "/horizons/search",
+        params={"query": "mars", "location": "muscat"},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Ephemeris-Source"] == "segment-store"
+    assert response.json()["constellation"] is None
+    assert upstream_calls == ["mars", "mars"]
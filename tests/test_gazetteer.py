@@ -0,0 +1,274 @@
+from app.main import app
+from app.services import gazetteer as gazetteer_module
+from app.services.gazetteer import Gazetteer, normalize_place_name, get_gazetteer
+from app.services.gazetteer import start_gazetteer_loading
+from app.services.cache import geocode_cache
+from app.services.horizons import get_coords
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.session import get_session
+from app.services.auth import create_user
+from types import SimpleNamespace
+import threading
+import pytest
+
+client = TestClient(app)
+
+fake_engine = create_engine(
+    "sqlite:///:memory:", connect_args={"check_same_thread": False}
+)
+
+Base.metadata.create_all(bind=fake_engine)
+
+PLACES = [
+    (
+        "3067696",
+        "Prague",
+        "Prague",
+        "Praga,Praha,Prag",
+        50.08804,
+        14.42076,
+        "CZ",
+        1165581,
+    ),
+    ("4717232", "Prague", "Prague", "", 35.48674, -96.68502, "US", 2386),
+    ("2657896", "Zürich", "Zurich", "Zuerich,Zurigo", 47.36667, 8.55, "CH", 341730),
+    (
+        "2643743",
+        "London",
+        "London",
+        "Londres,Londra",
+        51.50853,
+        -0.12574,
+        "GB",
+        8961989,
+    ),
+    ("6058560", "London", "London", "", 42.98339, -81.23304, "CA", 346765),
+    ("2643741", "City of London", "City of London", "", 51.51279, -0.09184, "GB", 8071),
+    ("3117735", "Madrid", "Madrid", "", 40.4165, -3.70256, "ES", 3255944),
+    ("3119841", "Saint-Denis", "Saint-Denis", "", 48.93564, 2.35387, "FR", 111135),
+]
+
+
+def geonames_row(geonameid, name, ascii_name, alternates, lat, lon, country, pop):
+    return "\t".join(
+        [
+            geonameid,
+            name,
+            ascii_name,
+            alternates,
+            str(lat),
+            str(lon),
+            "P",
+            "PPLC",
+            country,
+            "",
+            "",
+            "",
+            "",
+            "",
+            str(pop),
+            "",
+            "200",
+            "Europe/Prague",
+            "2024-01-01",
+        ]
+    )
+
+
+@pytest.fixture
+def geonames_path(tmp_path):
+    path = tmp_path / "cities.tsv"
+    path.write_text("\n".join(geonames_row(*place) for place in PLACES) + "\n")
+
+    return str(path)
+
+
+@pytest.fixture
+def gazetteer(geonames_path):
+    return Gazetteer.from_geonames(geonames_path, alternate_names=True)
+
+
+@pytest.fixture
+def override_get_session(db_session):
+    def override_dependency():
+        return db_session
+
+    app.dependency_overrides[get_session] = override_dependency
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db_session():
+    connection = fake_engine.connect()
+    transaction = connection.begin()
+    SessionLocal = sessionmaker(bind=connection)
+    session = SessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    transaction.close()
+
+
+@pytest.fixture
+def auth_header(db_session, override_get_session):
+    create_user("gazetteer", "fortest", db_session)
+    response = client.post(
+        "/auth/login", data={"username": "gazetteer", "password": "fortest"}
+    )
+    token = response.json()["access_token"]
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_place_names_are_normalized():
+    assert normalize_place_name("  Zürich ") == "zurich"
+    assert normalize_place_name("Saint-Denis") == "saint denis"
+    assert normalize_place_name("SÃO PAULO") == normalize_place_name("sao paulo")
+
+
+def test_lookup_prefers_most_populous_match(gazetteer):
+    assert len(gazetteer) == len(PLACES)
+
+    prague = gazetteer.lookup("Prague")
+    assert prague["country_code"] == "CZ"
+    assert prague["latitude"] == pytest.approx(50.08804, abs=1e-4)
+
+    assert gazetteer.lookup("Prague, US")["country_code"] == "US"
+    assert gazetteer.lookup("London")["country_code"] == "GB"
+    assert gazetteer.lookup("london, ca")["longitude"] == pytest.approx(-81.23304)
+
+
+def test_lookup_matches_ascii_and_alternate_names(gazetteer):
+    assert gazetteer.lookup("zurich")["name"] == "Zürich"
+    assert gazetteer.lookup("Praha")["name"] == "Prague"
+    assert gazetteer.lookup("saint denis")["country_code"] == "FR"
+    assert gazetteer.lookup("Atlantis") is None
+    assert gazetteer.lookup("Prague, Old Town") is None
+
+
+def test_alternate_names_are_opt_in(geonames_path):
+    gazetteer = Gazetteer.from_geonames(geonames_path)
+
+    assert gazetteer.lookup("zurich")["name"] == "Zürich"
+    assert gazetteer.lookup("Praha") is None
+
+
+def test_prefix_search_ranks_by_population(gazetteer):
+    names = [
+        (place["name"], place["country_code"]) for place in gazetteer.search("lon")
+    ]
+    assert names == [("London", "GB"), ("London", "CA")]
+
+    names = [place["name"] for place in gazetteer.search("pra", limit=1)]
+    assert names == ["Prague"]
+
+    assert gazetteer.search("   ") == []
+
+
+def test_fuzzy_search_tolerates_typos(gazetteer):
+    assert gazetteer.fuzzy_search("Prauge")[0]["country_code"] == "CZ"
+    assert gazetteer.fuzzy_search("Madird")[0]["name"] == "Madrid"
+    assert gazetteer.fuzzy_search("Lodnon, CA")[0]["country_code"] == "CA"
+    assert gazetteer.fuzzy_search("Mxyzptlk") == []
+
+
+def test_gazetteer_memory_is_array_backed(gazetteer):
+    assert gazetteer.nbytes < 2048
+    assert gazetteer.keys.blob.count(b"prague") == 2
+
+
+def test_get_coords_uses_gazetteer_before_nominatim(gazetteer, monkeypatch):
+    def fake_geocode(city_name: str):
+        if city_name == "Old Town Square":
+            return SimpleNamespace(longitude=14.4213, latitude=50.0875)
+        raise AssertionError("Nominatim should not be called for gazetteer hits")
+
+    geocode_cache.clear()
+    monkeypatch.setattr("app.services.horizons.get_gazetteer", lambda: gazetteer)
+    monkeypatch.setattr("app.services.horizons.geolocator.geocode", fake_geocode)
+
+    assert get_coords("Prague") == "14.416667,50.083333,0.3"
+    assert get_coords("Old Town Square") == "14.416667,50.083333,0.3"
+    geocode_cache.clear()
+
+
+def test_places_endpoint_searches_by_prefix_then_fuzzy(
+    auth_header, gazetteer, monkeypatch
+):
+    monkeypatch.setattr("app.api.horizons.get_gazetteer", lambda: gazetteer)
+
+    response = client.get(
+        "/horizons/places", params={"query": "lon"}, headers=auth_header
+    )
+    assert response.status_code == 200
+    assert [place["country_code"] for place in response.json()] == ["GB", "CA"]
+
+    response = client.get(
+        "/horizons/places", params={"query": "Madird", "limit": 1}, headers=auth_header
+    )
+    assert response.status_code == 200
+    assert response.json()[0]["name"] == "Madrid"
+
+
+def test_places_endpoint_requires_configured_gazetteer(auth_header, monkeypatch):
+    monkeypatch.setattr("app.api.horizons.get_gazetteer", lambda: None)
+
+    response = client.get(
+        "/horizons/places", params={"query": "lon"}, headers=auth_header
+    )
+
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Gazetteer not configured"}
+
+
+def test_missing_gazetteer_file_falls_back_to_nominatim(monkeypatch, tmp_path, caplog):
+    monkeypatch.setattr(gazetteer_module, "GAZETTEER_PATH", str(tmp_path / "none.tsv"))
+    monkeypatch.setattr(gazetteer_module, "_gazetteer", None)
+    monkeypatch.setattr(gazetteer_module, "_gazetteer_loader", None)
+
+    start_gazetteer_loading().join()
+    start_gazetteer_loading().join()
+
+    assert get_gazetteer() is None
+    warnings = [
+        record for record in caplog.records if record.name == gazetteer_module.__name__
+    ]
+    assert len(warnings) == 1
+
+    geocode_cache.clear()
+    monkeypatch.setattr(
+        "app.services.horizons.geolocator.geocode",
+        lambda city_name: SimpleNamespace(longitude=14.4213, latitude=50.0875),
+    )
+
+    assert get_coords("Prague") == "14.416667,50.083333,0.3"
+    geocode_cache.clear()
+
+
+def test_gazetteer_loads_in_background(geonames_path, monkeypatch):
+    monkeypatch.setattr(gazetteer_module, "GAZETTEER_PATH", geonames_path)
+    monkeypatch.setattr(gazetteer_module, "_gazetteer", None)
+    monkeypatch.setattr(gazetteer_module, "_gazetteer_loader", None)
+    loading = threading.Event()
+    release = threading.Event()
+    from_geonames = Gazetteer.from_geonames
+
+    def slow_from_geonames(path, min_population=0):
+        loading.set()
+        release.wait(5)
+        return from_geonames(path, min_population)
+
+    monkeypatch.setattr(Gazetteer, "from_geonames", slow_from_geonames)
+
+    assert get_gazetteer() is None
+    assert loading.wait(5)
+    assert get_gazetteer() is None
+
+    release.set()
+    gazetteer_module._gazetteer_loader.join()
+
+    assert get_gazetteer().lookup("Prague")["country_code"] == "CZ"
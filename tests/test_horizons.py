@@ -1,14 +1,20 @@
 from app.main import app
 from app.services.horizons import parse_horizons_ephemeris
+from app.services.horizons import parse_horizons_ephemeris_series
+from app.parsers.horizons_tables import EphemerisSeries, MatchTable
+from benchmarks.bench_parser_memory import series_payload, match_payload
+from benchmarks.bench_parser_memory import legacy_parse_series, legacy_parse_matches
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.db.base import Base
 from app.db.session import get_session
 from app.services.auth import create_user
+import numpy as np
 import pytest
 from app.exceptions import ObjectNotFoundError, EphemerisDataMissing
 from app.exceptions import InvalidLocationError, UpstreamServiceError
+from app.exceptions import AmbiguousObjectError
 
 client = TestClient(app)
 
@@ -290,3 +296,103 @@ def test_single_match_ephemeris_parser():
     assert "*m" not in data
 
 
+def test_ephemeris_series_parser_returns_every_row():
+    raw_data = {
+        "result": """
+        Target body name: Mars (499)   {source: mar097}
+        Date__(UT)__HR:MN  Azi____(a-app)___Elev  APmag   S-brt  Cnst
+        $$SOE
+        2025-Dec-24 13:35 *m  241.884725   4.515307  1.091   3.770  Sgr
+        2025-Dec-24 13:36 *m  242.051190   4.352217  1.091   3.770  Sgr
+        2025-Dec-24 13:37 *m  242.217431   4.188894  n.a.    3.770  Sgr
+        $$EOE
+    """
+    }
+
+    series = parse_horizons_ephemeris_series(raw_data)
+    assert len(series) == 3
+    assert series[0]["object_id"] == "499"
+    assert [row["date"] for row in series] == [
+        "2025-Dec-24 13:35",
+        "2025-Dec-24 13:36",
+        "2025-Dec-24 13:37",
+    ]
+    assert series[1]["altitude_deg"] == "4.352217"
+    assert series[2]["apparent_magnitude"] is None
+
+
+def test_ephemeris_series_parser_rejects_multi_match():
+    raw_data = {"result": "Number of matches =  3. Use ID# to make unique selection."}
+
+    with pytest.raises(AmbiguousObjectError):
+        parse_horizons_ephemeris_series(raw_data)
+
+
+def test_multi_match_parser_returns_match_table():
+    raw_data = {
+        "result": """
+*******************************************************************************
+ Multiple major-bodies match string "MARS*"
+
+  ID#      Name                               Designation  IAU/aliases/other
+  -------  ---------------------------------- -----------  -------------------
+        4  Mars Barycenter
+      499  Mars
+       -3  Mars Orbiter Mission (spacecraft)  2013-060A    MOM Mangalyaan
+
+   Number of matches =   3. Use ID# to make unique selection.
+*******************************************************************************
+"""
+    }
+
+    matches = parse_horizons_ephemeris(raw_data)
+
+    assert isinstance(matches, MatchTable)
+    assert not hasattr(matches, "__dict__")
+    assert len(matches) == 3
+    assert matches.columns["object_id"] == ["4", "499", "-3"]
+    assert matches[1] == {
+        "object_id": "499",
+        "object_name": "Mars",
+        "designation": "",
+        "aliases": "",
+    }
+    assert [row["aliases"] for row in matches] == ["", "", "MOM Mangalyaan"]
+
+
+def test_ephemeris_series_keeps_typed_columns():
+    raw_data = {
+        "result": """
+        Target body name: Mars (499)   {source: mar097}
+        Date__(UT)__HR:MN  Azi____(a-app)___Elev  APmag   S-brt  Cnst
+        $$SOE
+        2025-Dec-24 13:35 *m  241.884725   4.515307  1.091   3.770  Sgr
+        2025-Dec-24 13:36 *m  242.051190   n.a.      1.091   3.770  Sgr
+        $$EOE
+    """
+    }
+
+    series = parse_horizons_ephemeris_series(raw_data)
+
+    assert isinstance(series, EphemerisSeries)
+    assert not hasattr(series, "__dict__")
+    assert series.columns["constellation"] == ["Sgr", "Sgr"]
+    assert series.floats("azimuth_deg").tolist() == [241.884725, 242.05119]
+    assert np.isnan(series.floats("altitude_deg")[1])
+    timestamps = series.timestamps("%Y-%b-%d %H:%M")
+    assert timestamps[1] - timestamps[0] == pytest.approx(60)
+    assert series[-1]["altitude_deg"] is None
+    assert series[:1] == [series[0]]
+
+
+def test_parser_benchmark_baselines_match_column_stores():
+    series_raw = series_payload(100)
+    assert legacy_parse_series(series_raw) == list(
+        parse_horizons_ephemeris_series(series_raw)
+    )
+    assert legacy_parse_series(series_raw)[0]["constellation"] == "Sgr"
+
+    matches_raw = match_payload(100)
+    assert legacy_parse_matches(matches_raw) == list(
+        parse_horizons_ephemeris(matches_raw)
+    )
@@ -0,0 +1,181 @@
+from app.main import app
+from app.services.http_cache import etag_matches, payload_etag
+from app.services.http_cache import seconds_until_next_step
+from app.config import MATCH_LIST_MAX_AGE_SECONDS
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.session import get_session
+from app.services.auth import create_user
+import pytest
+
+client = TestClient(app)
+
+fake_engine = create_engine(
+    "sqlite:///:memory:", connect_args={"check_same_thread": False}
+)
+
+Base.metadata.create_all(bind=fake_engine)
+
+MARS_EPHEMERIS = {
+    "object_name": "Mars",
+    "object_id": "499",
+    "date": "2025-Dec-29 15:54",
+    "azimuth_deg": 239.356858,
+    "altitude_deg": -5.935073,
+    "apparent_magnitude": 1.075,
+    "surface_brightness": 3.757,
+    "illumination_percent": 99.97094,
+    "angular_diameter_arcsec": 3.882006,
+    "sun_distance_au": 1.431151111878,
+    "earth_distance_au": 2.41248972367116,
+    "solar_elong_deg": 1.9588,
+    "constellation": "Sgr",
+}
+
+MARS_MATCHES = [
+    {
+        "object_name": "Mars Barycenter",
+        "object_id": "4",
+        "designation": None,
+        "aliases": None,
+    },
+    {"object_name": "Mars", "object_id": "499", "designation": None, "aliases": None},
+]
+
+
+@pytest.fixture
+def override_get_session(db_session):
+    def override_dependency():
+        return db_session
+
+    app.dependency_overrides[get_session] = override_dependency
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db_session():
+    connection = fake_engine.connect()
+    transaction = connection.begin()
+    SessionLocal = sessionmaker(bind=connection)
+    session = SessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    transaction.close()
+
+
+@pytest.fixture
+def auth_header(db_session, override_get_session):
+    create_user("httpcache", "fortest", db_session)
+    response = client.post(
+        "/auth/login", data={"username": "httpcache", "password": "fortest"}
+    )
+    token = response.json()["access_token"]
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def fake_upstream(monkeypatch):
+    payload = {"data": MARS_EPHEMERIS}
+
+    def fake_get_coords(location: str, elevation: float | None = None):
+        return "21.6,55,0.3"
+
+    def fake_parse_horizons_ephemeris(raw_data: dict):
+        return payload["data"]
+
+    monkeypatch.setattr("app.api.horizons.get_coords", fake_get_coords)
+    monkeypatch.setattr("app.api.horizons.get_cached_ephemeris", lambda *args: None)
+    monkeypatch.setattr("app.api.horizons.search_object", lambda *args, **kw: {})
+    monkeypatch.setattr(
+        "app.api.horizons.parse_horizons_ephemeris", fake_parse_horizons_ephemeris
+    )
+
+    return payload
+
+
+def search(auth_header: dict, **headers) -> object:
+    return client.get(
+        "/horizons/search",
+        params={"query": "mars", "location": "muscat"},
+        headers={**auth_header, **headers},
+    )
+
+
+def test_etag_is_stable_for_equal_payloads():
+    reordered = dict(reversed(list(MARS_EPHEMERIS.items())))
+
+    assert payload_etag(MARS_EPHEMERIS) == payload_etag(reordered)
+    assert payload_etag(MARS_EPHEMERIS) != payload_etag(
+        {**MARS_EPHEMERIS, "date": "2025-Dec-29 15:55"}
+    )
+    assert payload_etag(MARS_EPHEMERIS).startswith('"')
+
+
+def test_if_none_match_accepts_lists_weak_tags_and_wildcard():
+    etag = payload_etag(MARS_EPHEMERIS)
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_max_age_runs_to_the_next_minute_boundary():
+    assert (
+        seconds_until_next_step(datetime(2025, 12, 29, 15, 54, 0, tzinfo=timezone.utc))
+        == 60
+    )
+    assert (
+        seconds_until_next_step(datetime(2025, 12, 29, 15, 54, 45, tzinfo=timezone.utc))
+        == 15
+    )
+    assert (
+        seconds_until_next_step(
+            datetime(2025, 12, 29, 15, 54, 59, 900000, tzinfo=timezone.utc)
+        )
+        == 1
+    )
+
+
+def test_single_ephemeris_is_revalidated_with_304(auth_header, fake_upstream):
+    response = search(auth_header)
+
+    assert response.status_code == 200
+    etag = response.headers["ETag"]
+    max_age = int(response.headers["Cache-Control"].removeprefix("private, max-age="))
+    assert 1 <= max_age <= 60
+
+    response = search(auth_header, **{"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    fake_upstream["data"] = {**MARS_EPHEMERIS, "date": "2025-Dec-29 15:55"}
+    response = search(auth_header, **{"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.json()["date"] == "2025-Dec-29 15:55"
+
+
+def test_multi_match_results_are_cached_long(auth_header, fake_upstream):
+    fake_upstream["data"] = MARS_MATCHES
+
+    response = search(auth_header)
+
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == (
+        f"private, max-age={MATCH_LIST_MAX_AGE_SECONDS}"
+    )
+
+    response = search(auth_header, **{"If-None-Match": response.headers["ETag"]})
+
+    assert response.status_code == 304
@@ -0,0 +1,279 @@
+from app.main import app
+from app.services import kepler
+from app.services.kepler import approximate_ephemeris, compute_ephemerides
+from app.services.kepler import get_elements, julian_date, standish_elements
+from app.services import horizons
+from app.services.horizons import parse_horizons_elements, search_elements
+from app.services.cache import elements_cache
+from app.exceptions import ObjectNotFoundError, UpstreamServiceError
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.session import get_session
+from app.services.auth import create_user
+import httpx
+import pytest
+
+client = TestClient(app)
+
+fake_engine = create_engine(
+    "sqlite:///:memory:", connect_args={"check_same_thread": False}
+)
+
+Base.metadata.create_all(bind=fake_engine)
+
+RECORDED_TIME = datetime(2025, 12, 24, 13, 35, tzinfo=timezone.utc)
+RECORDED_SITE = "55,21.5,0.3"
+RECORDED_MARS = {
+    "azimuth_deg": 241.884725,
+    "altitude_deg": 4.515307,
+    "sun_distance_au": 1.436626158701,
+    "earth_distance_au": 2.41599313076047,
+    "solar_elong_deg": 4.1043,
+    "illumination_percent": 99.94014,
+}
+ANGLE_TOLERANCE_DEG = 0.05
+DISTANCE_TOLERANCE_AU = 0.001
+
+MARS_ELEMENTS_RESULT = """
+Target body name: Mars (499)                      {source: mar099}
+Center body name: Sun (10)                        {source: DE441}
+*******************************************************************************
+$$SOE
+2461033.500000000 = A.D. 2025-Dec-24 00:00:00.0000 TDB
+ EC= 9.341457593620807E-02 QR= 1.381377813295143E+00 IN= 1.847579060385079E+00
+ OM= 4.948353389999165E+01 W = 2.866882860003541E+02 Tp=  2461045.834768929984
+ N = 5.240329277204655E-01 MA= 3.115611827252913E+02 TA= 3.012349656693282E+02
+ A = 1.523715138154552E+00 AD= 1.666052463013961E+00 PR= 6.869777426287553E+02
+$$EOE
+"""
+
+MARS_TWO_RECORD_RESULT = MARS_ELEMENTS_RESULT.replace(
+    "$$EOE",
+    """2461034.500000000 = A.D. 2025-Dec-25 00:00:00.0000 TDB
+ EC= 9.341515086592093E-02 QR= 1.381376936806283E+00 IN= 1.847578905012538E+00
+ OM= 4.948349612339421E+01 W = 2.866885174367112E+02 Tp=  2461045.834995237365
+ N = 5.240328939221009E-01 MA= 3.120852040987711E+02 TA= 3.018093627440553E+02
+ A = 1.523715203665787E+00 AD= 1.666053470525291E+00 PR= 6.869777869400426E+02
+$$EOE""",
+)
+
+
+@pytest.fixture
+def override_get_session(db_session):
+    def override_dependency():
+        return db_session
+
+    app.dependency_overrides[get_session] = override_dependency
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db_session():
+    connection = fake_engine.connect()
+    transaction = connection.begin()
+    SessionLocal = sessionmaker(bind=connection)
+    session = SessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    transaction.close()
+
+
+@pytest.fixture
+def auth_header(db_session, override_get_session):
+    create_user("kepler", "fortest", db_session)
+    response = client.post(
+        "/auth/login", data={"username": "kepler", "password": "fortest"}
+    )
+    token = response.json()["access_token"]
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def empty_elements_cache():
+    elements_cache.clear()
+    yield
+    elements_cache.clear()
+
+
+@pytest.fixture
+def upstream_down(monkeypatch, empty_elements_cache):
+    def fake_search_elements(object_name, center, epoch):
+        raise httpx.ConnectError("Horizons unreachable")
+
+    monkeypatch.setattr(kepler, "search_elements", fake_search_elements)
+
+
+@pytest.fixture
+def mock_get_coords(monkeypatch):
+    def fake_get_coords(location: str, elevation: float | None = None):
+        return RECORDED_SITE
+
+    monkeypatch.setattr("app.api.horizons.get_coords", fake_get_coords)
+
+
+def assert_matches_recorded_mars(ephemeris: dict):
+    for field in ("azimuth_deg", "altitude_deg", "solar_elong_deg"):
+        assert ephemeris[field] == pytest.approx(
+            RECORDED_MARS[field], abs=ANGLE_TOLERANCE_DEG
+        )
+
+    for field in ("sun_distance_au", "earth_distance_au"):
+        assert ephemeris[field] == pytest.approx(
+            RECORDED_MARS[field], abs=DISTANCE_TOLERANCE_AU
+        )
+
+    assert ephemeris["illumination_percent"] == pytest.approx(
+        RECORDED_MARS["illumination_percent"], abs=0.01
+    )
+
+
+def test_approximate_elements_match_recorded_horizons_ephemeris(upstream_down):
+    ephemeris = approximate_ephemeris("mars", RECORDED_SITE, when=RECORDED_TIME)
+
+    assert ephemeris["object_name"] == "Mars"
+    assert ephemeris["object_id"] == "499"
+    assert ephemeris["date"] == "2025-Dec-24 13:35"
+    assert_matches_recorded_mars(ephemeris)
+
+
+def test_elements_parser_reads_osculating_elements():
+    elements = parse_horizons_elements({"result": MARS_ELEMENTS_RESULT})
+
+    assert elements["object_name"] == "Mars"
+    assert elements["object_id"] == "499"
+    assert elements["epoch_jd"] == 2461033.5
+    assert elements["e"] == pytest.approx(0.09341457593620807)
+    assert elements["peri"] == pytest.approx(286.6882860003541)
+    assert elements["mean_anomaly"] == pytest.approx(311.5611827252913)
+    assert elements["a"] == pytest.approx(1.523715138154552)
+
+
+def test_elements_parser_keeps_first_record_elements():
+    elements = parse_horizons_elements({"result": MARS_TWO_RECORD_RESULT})
+
+    assert elements["epoch_jd"] == 2461033.5
+    assert elements["mean_anomaly"] == pytest.approx(311.5611827252913)
+    assert elements["e"] == pytest.approx(0.09341457593620807)
+
+
+def test_elements_request_asks_for_a_single_epoch(monkeypatch):
+    requests = []
+    monkeypatch.setattr(horizons, "_request_horizons", requests.append)
+
+    search_elements("499", "500@10", RECORDED_TIME)
+
+    assert requests[0]["START_TIME"] == "'2025-Dec-24 13:35'"
+    assert requests[0]["STOP_TIME"] == "'2025-Dec-24 13:36'"
+
+
+def test_elements_parser_rejects_unknown_object():
+    with pytest.raises(ObjectNotFoundError):
+        parse_horizons_elements({"result": "No matches found."})
+
+
+def test_horizons_elements_are_cached(monkeypatch, empty_elements_cache):
+    calls = []
+
+    def fake_search_elements(object_name, center, epoch):
+        calls.append((object_name, center))
+        return {"result": MARS_ELEMENTS_RESULT}
+
+    monkeypatch.setattr(kepler, "search_elements", fake_search_elements)
+
+    first = get_elements("mars", RECORDED_TIME)
+    second = get_elements("499", RECORDED_TIME)
+
+    assert calls == [("499", "500@10")]
+    assert first == second
+    assert first["center"] == "sun"
+
+    earth = standish_elements("399", float(julian_date([RECORDED_TIME])[0]))
+    ephemerides = compute_ephemerides([first], earth, [RECORDED_TIME], RECORDED_SITE)
+    assert_matches_recorded_mars(
+        {field: float(values[0, 0]) for field, values in ephemerides.items()}
+    )
+
+
+def test_offline_elements_do_not_call_upstream(monkeypatch, empty_elements_cache):
+    def fake_search_elements(object_name, center, epoch):
+        raise AssertionError("upstream should not be called")
+
+    monkeypatch.setattr(kepler, "search_elements", fake_search_elements)
+
+    elements = get_elements("jupiter", RECORDED_TIME, offline=True)
+    assert elements["object_id"] == "599"
+
+    with pytest.raises(UpstreamServiceError):
+        get_elements("ceres", RECORDED_TIME, offline=True)
+
+
+def test_ephemerides_are_vectorized_over_bodies_and_times():
+    jd = float(julian_date([RECORDED_TIME])[0])
+    bodies = [standish_elements(body, jd) for body in ("199", "499", "599")]
+    earth = standish_elements("399", jd)
+    times = [RECORDED_TIME + timedelta(minutes=10 * step) for step in range(6)]
+
+    ephemerides = compute_ephemerides(bodies, earth, times, RECORDED_SITE)
+
+    for values in ephemerides.values():
+        assert values.shape == (3, 6)
+
+    single = compute_ephemerides([bodies[1]], earth, [times[3]], RECORDED_SITE)
+    for field, values in ephemerides.items():
+        assert values[1, 3] == pytest.approx(single[field][0, 0])
+
+
+def test_search_with_approximate_flag_skips_upstream_ephemeris(
+    auth_header, mock_get_coords, upstream_down, monkeypatch
+):
+    def fake_search_object(object_name, coords):
+        raise AssertionError("upstream ephemeris should not be requested")
+
+    monkeypatch.setattr("app.api.horizons.search_object", fake_search_object)
+
+    response = client.get(
+        "/horizons/search",
+        params={"query": "mars", "location": "muscat", "approximate": True},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Ephemeris-Source"] == "approximate"
+    data = response.json()
+    assert data["object_id"] == "499"
+    assert 1.38 < data["sun_distance_au"] < 1.67
+    assert data["constellation"] is None
+
+
+def test_search_falls_back_to_approximate_when_upstream_is_down(
+    auth_header, mock_get_coords, upstream_down, monkeypatch
+):
+    def fake_search_object(object_name, coords):
+        raise httpx.ConnectError("Horizons unreachable")
+
+    monkeypatch.setattr("app.api.horizons.search_object", fake_search_object)
+
+    response = client.get(
+        "/horizons/search",
+        params={"query": "saturn", "location": "muscat"},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 200
+    assert response.headers["X-Ephemeris-Source"] == "approximate"
+    assert response.json()["object_name"] == "Saturn"
+
+    response = client.get(
+        "/horizons/search",
+        params={"query": "ceres", "location": "muscat"},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 503
+    assert response.json() == {"detail": "Upstream Horizons service error"}
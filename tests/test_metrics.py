@@ -0,0 +1,125 @@
+from app.main import app
+from app.services.metrics import Counter, Histogram, MetricsRegistry
+from app.services.metrics import parse_results, stage_duration
+from app.services.horizons import parse_horizons_ephemeris
+from app.exceptions import ObjectNotFoundError, UpstreamServiceError
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.session import get_session
+from app.services.auth import create_user
+import pytest
+
+client = TestClient(app)
+
+fake_engine = create_engine(
+    "sqlite:///:memory:", connect_args={"check_same_thread": False}
+)
+
+Base.metadata.create_all(bind=fake_engine)
+
+
+@pytest.fixture
+def override_get_session(db_session):
+    def override_dependency():
+        return db_session
+
+    app.dependency_overrides[get_session] = override_dependency
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db_session():
+    connection = fake_engine.connect()
+    transaction = connection.begin()
+    SessionLocal = sessionmaker(bind=connection)
+    session = SessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    transaction.close()
+
+
+@pytest.fixture
+def auth_header(db_session, override_get_session):
+    create_user("metered", "fortest", db_session)
+    response = client.post(
+        "/auth/login", data={"username": "metered", "password": "fortest"}
+    )
+    token = response.json()["access_token"]
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("demo_total", "Demo counter.", ("status",)))
+    histogram = registry.register(
+        Histogram("demo_seconds", "Demo histogram.", ("stage",), buckets=(0.1, 1))
+    )
+
+    counter.inc(status=200)
+    counter.inc(status=200)
+    histogram.observe(0.05, stage="parse")
+    histogram.observe(0.5, stage="parse")
+
+    assert registry.render().splitlines() == [
+        "# HELP demo_total Demo counter.",
+        "# TYPE demo_total counter",
+        'demo_total{status="200"} 2.0',
+        "# HELP demo_seconds Demo histogram.",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{stage="parse",le="0.1"} 1',
+        'demo_seconds_bucket{stage="parse",le="1.0"} 2',
+        'demo_seconds_bucket{stage="parse",le="+Inf"} 2',
+        'demo_seconds_sum{stage="parse"} 0.55',
+        'demo_seconds_count{stage="parse"} 2',
+    ]
+
+
+def test_parser_counts_branches():
+    not_found_before = parse_results.get(branch="not_found")
+    upstream_error_before = parse_results.get(branch="upstream_error")
+
+    with pytest.raises(ObjectNotFoundError):
+        parse_horizons_ephemeris({"result": "No matches found."})
+    with pytest.raises(UpstreamServiceError):
+        parse_horizons_ephemeris({"result": "garbage"})
+
+    assert parse_results.get(branch="not_found") == not_found_before + 1
+    assert parse_results.get(branch="upstream_error") == upstream_error_before + 1
+
+
+def test_metrics_endpoint_exposes_stage_timings(auth_header, monkeypatch):
+    def fake_get_coords(location: str, elevation: float | None = None):
+        return "21.6,55.0,0.3"
+
+    def fake_search_object(object_name: str | int, coords: str):
+        return {"result": ""}
+
+    def fake_parse_horizons_ephemeris(raw_data: dict):
+        return {"object_name": "Mars", "object_id": "499", "date": "2025-Dec-29"}
+
+    monkeypatch.setattr("app.api.horizons.get_coords", fake_get_coords)
+    monkeypatch.setattr("app.api.horizons.search_object", fake_search_object)
+    monkeypatch.setattr(
+        "app.api.horizons.parse_horizons_ephemeris", fake_parse_horizons_ephemeris
+    )
+
+    response = client.get(
+        "/horizons/search",
+        params={"query": "mars", "location": "prague"},
+        headers=auth_header,
+    )
+    assert response.status_code == 200
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert "# TYPE skyarchive_stage_duration_seconds histogram" in response.text
+    assert 'skyarchive_stage_duration_seconds_count{stage="auth_db"}' in response.text
+    assert 'skyarchive_stage_duration_seconds_count{stage="serialize"}' in response.text
+    assert ("serialize",) in stage_duration.values
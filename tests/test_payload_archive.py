@@ -0,0 +1,152 @@
+from app.services import horizons
+from app.services.payload_archive import PayloadArchive
+from app.services.horizons import search_object_range
+from app.replay import replay_archive
+from datetime import datetime, timezone
+import json
+import threading
+import pytest
+
+SERIES_RESULT = """
+Ephemeris / API_USER Wed Dec 24 13:35:12 2025 Pasadena, USA      / Horizons
+Target body name: Mars (499)   {source: mar097}
+ Date__(UT)__HR:MN  Azi____(a-app)___Elev  APmag   S-brt  Cnst
+$$SOE
+ 2025-Dec-24 13:35 *m  241.884725   4.515307  1.091   3.770  Sgr
+ 2025-Dec-24 13:36 *m  242.051190   4.352217  1.091   3.770  Sgr
+$$EOE
+"""
+START_TIME = datetime(2025, 12, 24, 13, 35, tzinfo=timezone.utc)
+STOP_TIME = datetime(2025, 12, 24, 13, 36, tzinfo=timezone.utc)
+
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, payload: dict):
+        self.payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.payload
+
+
+@pytest.fixture
+def archive(tmp_path):
+    return PayloadArchive(str(tmp_path / "raw.db"))
+
+
+def store_series(archive: PayloadArchive, payload: dict, site: str) -> str:
+    return archive.store(
+        payload,
+        kind="OBSERVER",
+        query="mars",
+        params={"COMMAND": "'mars'"},
+        object_id="499",
+        site=site,
+        start_time=START_TIME,
+        stop_time=STOP_TIME,
+    )
+
+
+def test_identical_payloads_are_stored_once_and_compressed(archive):
+    payload = {"signature": {"source": "NASA/JPL"}, "result": SERIES_RESULT * 20}
+
+    first = store_series(archive, payload, "14.4,50.1,0.3")
+    second = store_series(archive, dict(reversed(payload.items())), "-73.9,40.7,0.3")
+
+    assert first == second
+    assert archive.load(first) == payload
+    assert archive.load("missing") is None
+
+    stats = archive.stats()
+    assert stats["payloads"] == 1
+    assert stats["references"] == 2
+    assert stats["stored_bytes"] < stats["raw_bytes"] / 5
+
+
+def test_payloads_differing_only_in_retrieval_header_share_a_hash(archive):
+    refetched = SERIES_RESULT.replace("13:35:12", "13:41:57")
+    first = store_series(archive, {"result": SERIES_RESULT}, "14.4,50.1,0.3")
+    second = store_series(archive, {"result": refetched}, "14.4,50.1,0.3")
+    changed = store_series(
+        archive, {"result": SERIES_RESULT.replace("4.515307", "4.515308")}, "x"
+    )
+
+    assert first == second != changed
+    assert archive.load(first) == {"result": SERIES_RESULT}
+    assert archive.stats()["payloads"] == 2
+    assert archive.stats()["references"] == 3
+
+
+def test_index_finds_payloads_by_object_site_and_overlapping_span(archive):
+    store_series(archive, {"result": SERIES_RESULT}, "14.4,50.1,0.3")
+    store_series(archive, {"result": SERIES_RESULT + " "}, "-73.9,40.7,0.3")
+
+    assert len(archive.find(object_id="499")) == 2
+    assert [row["site"] for row in archive.find(site="14.4,50.1,0.3")] == [
+        "14.4,50.1,0.3"
+    ]
+    assert len(archive.find(start_time=datetime(2025, 12, 24, 13, 36))) == 2
+    assert archive.find(stop_time=datetime(2025, 12, 24, 13, 0)) == []
+    assert archive.find(object_id="599") == []
+
+
+def test_upstream_responses_are_archived_when_enabled(archive, monkeypatch):
+    payload = {"signature": {"source": "NASA/JPL"}, "result": SERIES_RESULT}
+
+    archiving = threading.Event()
+    store = archive.store
+
+    def slow_store(*args, **kwargs):
+        archiving.wait(5)
+        return store(*args, **kwargs)
+
+    monkeypatch.setattr(horizons, "RAW_ARCHIVE_ENABLED", True)
+    monkeypatch.setattr(horizons, "get_payload_archive", lambda: archive)
+    monkeypatch.setattr(archive, "store", slow_store)
+    monkeypatch.setattr(
+        horizons.httpx, "get", lambda url, params: FakeResponse(payload)
+    )
+
+    assert search_object_range("mars", "14.4,50.1,0.3", START_TIME, STOP_TIME) == (
+        payload
+    )
+    assert archive.find() == []
+
+    archiving.set()
+    horizons.archive_executor.submit(lambda: None).result()
+
+    [reference] = archive.find()
+    assert reference["kind"] == "OBSERVER"
+    assert reference["query"] == "mars"
+    assert reference["object_id"] == "499"
+    assert reference["site"] == "14.4,50.1,0.3"
+    assert reference["start_time"] == "2025-12-24T13:35:00"
+    assert reference["stop_time"] == "2025-12-24T13:36:00"
+    assert archive.load(reference["payload_hash"]) == payload
+
+
+def test_replay_reparses_archived_payloads_in_worker_processes(archive, tmp_path):
+    store_series(archive, {"result": SERIES_RESULT}, "14.4,50.1,0.3")
+    store_series(archive, {"result": "No matches found."}, "14.4,50.1,0.3")
+    output_path = tmp_path / "replayed.jsonl"
+
+    summary = replay_archive(
+        archive.path, workers=2, output_path=str(output_path), object_id="499"
+    )
+
+    assert summary["payloads"] == 2
+    assert summary["outcomes"] == {"ok": 1, "ObjectNotFoundError": 1}
+
+    [line] = output_path.read_text().splitlines()
+    replayed = json.loads(line)
+    assert [row["altitude_deg"] for row in replayed["result"]] == [
+        "4.515307",
+        "4.352217",
+    ]
+
+    summary = replay_archive(archive.path, parser_name="ephemeris", workers=1)
+    assert summary["outcomes"] == {"ok": 1, "ObjectNotFoundError": 1}
@@ -0,0 +1,146 @@
+from app.main import app
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.session import get_session
+from app.services.auth import create_user
+from app.services.profiling import is_valid_profile_token
+import pytest
+
+client = TestClient(app)
+
+fake_engine = create_engine(
+    "sqlite:///:memory:", connect_args={"check_same_thread": False}
+)
+
+Base.metadata.create_all(bind=fake_engine)
+
+PROFILE_TOKEN = "let-me-profile"
+
+
+@pytest.fixture
+def override_get_session(db_session):
+    def override_dependency():
+        return db_session
+
+    app.dependency_overrides[get_session] = override_dependency
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db_session():
+    connection = fake_engine.connect()
+    transaction = connection.begin()
+    SessionLocal = sessionmaker(bind=connection)
+    session = SessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    transaction.close()
+
+
+@pytest.fixture
+def auth_header(db_session, override_get_session):
+    create_user("profiler", "fortest", db_session)
+    response = client.post(
+        "/auth/login", data={"username": "profiler", "password": "fortest"}
+    )
+    token = response.json()["access_token"]
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def profiling_enabled(monkeypatch, tmp_path):
+    monkeypatch.setattr("app.services.profiling.PROFILE_TOKEN", PROFILE_TOKEN)
+    monkeypatch.setattr("app.services.profiling.PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr("app.services.profiling.PROFILE_MAX_FILES", 2)
+
+    def fake_get_coords(location: str, elevation: float | None = None):
+        return "21.6,55.0,0.3"
+
+    def fake_search_object(object_name: str | int, coords: str):
+        return {"result": ""}
+
+    def fake_parse_horizons_ephemeris(raw_data: dict):
+        return {"object_name": "Mars", "object_id": "499", "date": "2025-Dec-29"}
+
+    monkeypatch.setattr("app.api.horizons.get_coords", fake_get_coords)
+    monkeypatch.setattr("app.api.horizons.search_object", fake_search_object)
+    monkeypatch.setattr(
+        "app.api.horizons.parse_horizons_ephemeris", fake_parse_horizons_ephemeris
+    )
+
+    return tmp_path
+
+
+def _profiled_search(auth_header: dict, query: str):
+    return client.get(
+        "/horizons/search",
+        params={"query": query, "location": "prague"},
+        headers={**auth_header, "X-Profile-Token": PROFILE_TOKEN},
+    )
+
+
+def test_requests_are_not_profiled_by_default(auth_header, profiling_enabled):
+    response = client.get(
+        "/horizons/search",
+        params={"query": "mars", "location": "prague"},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert list(profiling_enabled.iterdir()) == []
+
+
+def test_profile_header_saves_profile_with_stage_timings(
+    auth_header, profiling_enabled
+):
+    response = _profiled_search(auth_header, "mars")
+
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    assert (profiling_enabled / f"{profile_id}.prof").exists()
+
+    response = client.get(
+        f"/admin/profiles/{profile_id}", headers={"X-Profile-Token": PROFILE_TOKEN}
+    )
+
+    assert response.status_code == 200
+    profile = response.json()
+    assert profile["params"] == {"query": "mars", "location": "prague"}
+    assert profile["reason"] == "header"
+    assert "serialize" in [timing["stage"] for timing in profile["stage_timings"]]
+    assert any("fetch_object" in row["function"] for row in profile["top_functions"])
+
+
+def test_profile_directory_is_a_bounded_ring(auth_header, profiling_enabled):
+    profile_ids = [
+        _profiled_search(auth_header, query).headers["X-Profile-Id"]
+        for query in ("mars", "venus", "jupiter")
+    ]
+
+    response = client.get("/admin/profiles", headers={"X-Profile-Token": PROFILE_TOKEN})
+
+    assert response.status_code == 200
+    assert [profile["profile_id"] for profile in response.json()] == [
+        profile_ids[2],
+        profile_ids[1],
+    ]
+    assert len(list(profiling_enabled.glob("*.prof"))) == 2
+
+
+def test_admin_profiles_require_token(profiling_enabled):
+    response = client.get("/admin/profiles", headers={"X-Profile-Token": "wrong"})
+
+    assert response.status_code == 403
+
+
+def test_profile_token_comparison(profiling_enabled):
+    assert is_valid_profile_token(PROFILE_TOKEN)
+    assert not is_valid_profile_token("let-me-profilE")
+    assert not is_valid_profile_token("žluťoučký")
+    assert not is_valid_profile_token(None)
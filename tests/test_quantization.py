@@ -0,0 +1,165 @@
+from app.main import app
+from app.services.quantization import (
+    SiteQuantizer,
+    geohash_encode,
+    geohash_decode,
+    record_site_cache_lookup,
+)
+from app.services.metrics import site_cache_lookups
+from app.services.cache import geocode_cache
+from app.services.horizons import get_coords
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.session import get_session
+from app.services.auth import create_user
+from types import SimpleNamespace
+import pytest
+
+client = TestClient(app)
+
+fake_engine = create_engine(
+    "sqlite:///:memory:", connect_args={"check_same_thread": False}
+)
+
+Base.metadata.create_all(bind=fake_engine)
+
+
+@pytest.fixture
+def override_get_session(db_session):
+    def override_dependency():
+        return db_session
+
+    app.dependency_overrides[get_session] = override_dependency
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db_session():
+    connection = fake_engine.connect()
+    transaction = connection.begin()
+    SessionLocal = sessionmaker(bind=connection)
+    session = SessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    transaction.close()
+
+
+@pytest.fixture
+def auth_header(db_session, override_get_session):
+    create_user("quantizer", "fortest", db_session)
+    response = client.post(
+        "/auth/login", data={"username": "quantizer", "password": "fortest"}
+    )
+    token = response.json()["access_token"]
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def fake_geolocator(monkeypatch):
+    geocode_cache.clear()
+    places = {
+        "old town square": SimpleNamespace(longitude=14.42125, latitude=50.08735),
+        "tyn church": SimpleNamespace(longitude=14.42280, latitude=50.08760),
+    }
+
+    def fake_geocode(city_name: str):
+        return places.get(city_name)
+
+    monkeypatch.setattr("app.services.horizons.geolocator.geocode", fake_geocode)
+    yield
+    geocode_cache.clear()
+
+
+def test_grid_quantization_snaps_to_arcminutes():
+    quantizer = SiteQuantizer("grid:1", elevation_band_km=0.1)
+
+    longitude, latitude, elevation = quantizer.quantize(14.42125, 50.08735, 0.234)
+
+    assert longitude == pytest.approx(14.416667)
+    assert latitude == pytest.approx(50.083333)
+    assert elevation == 0.2
+    assert abs(longitude - 14.42125) <= quantizer.half_cell_deg[1]
+    assert abs(latitude - 50.08735) <= quantizer.half_cell_deg[0]
+
+
+def test_geohash_round_trip_stays_inside_cell():
+    geohash = geohash_encode(50.08735, 14.42125, 7)
+    latitude, longitude = geohash_decode(geohash)
+    quantizer = SiteQuantizer("geohash:7")
+
+    assert geohash == "u2fkbnj"
+    assert abs(latitude - 50.08735) <= quantizer.half_cell_deg[0]
+    assert abs(longitude - 14.42125) <= quantizer.half_cell_deg[1]
+
+
+def test_error_bound_shrinks_with_precision():
+    bounds = [
+        SiteQuantizer(spec).error_bound_deg
+        for spec in ("grid:6", "grid:1", "geohash:6", "geohash:8", "none")
+    ]
+
+    assert bounds == sorted(bounds, reverse=True)
+    assert bounds[-1] == 0
+
+
+def test_invalid_quantization_spec_raises():
+    with pytest.raises(ValueError):
+        SiteQuantizer("hexagon:3")
+
+
+def test_nearby_places_share_quantized_coords(fake_geolocator, monkeypatch):
+    monkeypatch.setattr(
+        "app.services.horizons.site_quantizer", SiteQuantizer("grid:1", 0.1)
+    )
+
+    assert get_coords("old town square") == get_coords("tyn church", 0.31)
+    assert get_coords("old town square") == "14.416667,50.083333,0.3"
+
+
+def test_cache_stats_endpoint_reports_active_level(auth_header, monkeypatch):
+    site_cache_lookups.values.clear()
+
+    def fake_get_coords(location: str, elevation: float | None = None):
+        return "14.416667,50.083333,0.3"
+
+    def fake_search_object(object_name: str | int, coords: str):
+        return {"result": ""}
+
+    def fake_parse_horizons_ephemeris(raw_data: dict):
+        return []
+
+    monkeypatch.setattr("app.api.horizons.get_coords", fake_get_coords)
+    monkeypatch.setattr("app.api.horizons.search_object", fake_search_object)
+    monkeypatch.setattr(
+        "app.api.horizons.parse_horizons_ephemeris", fake_parse_horizons_ephemeris
+    )
+
+    client.get(
+        "/horizons/search",
+        params={"query": "mars", "location": "prague"},
+        headers=auth_header,
+    )
+    response = client.get("/horizons/cache-stats", headers=auth_header)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["active_level"] == "grid:1"
+    assert data["levels"][0]["caches"]["ephemeris"] == {
+        "hits": 0,
+        "misses": 1,
+        "hit_rate": 0.0,
+    }
+
+
+def test_site_cache_lookups_respect_metrics_switch(monkeypatch):
+    site_cache_lookups.values.clear()
+    monkeypatch.setattr("app.services.metrics.METRICS_ENABLED", False)
+
+    record_site_cache_lookup("ephemeris", hit=True)
+
+    assert site_cache_lookups.values == {}
@@ -0,0 +1,233 @@
+from app.main import app
+from app.services.cache import sky_summary_cache, ephemeris_cache
+from app.services.horizons import HORIZONS_TIME_FORMAT, ephemeris_cache_key
+from app.services.refresher import horizons_rate_limiter
+from app.services.sky import time_bucket
+from app.exceptions import ObjectNotFoundError
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.session import get_session
+from app.services.auth import create_user
+from datetime import datetime, timezone
+import pytest
+
+client = TestClient(app)
+
+fake_engine = create_engine(
+    "sqlite:///:memory:", connect_args={"check_same_thread": False}
+)
+
+Base.metadata.create_all(bind=fake_engine)
+
+FAKE_SKY = {
+    "199": ("Mercury", -12.0, -0.4),
+    "301": ("Moon", 25.0, -11.2),
+    "499": ("Mars", 4.5, 1.1),
+    "599": ("Jupiter", 48.0, -2.5),
+}
+
+
+@pytest.fixture
+def override_get_session(db_session):
+    def override_dependency():
+        return db_session
+
+    app.dependency_overrides[get_session] = override_dependency
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db_session():
+    connection = fake_engine.connect()
+    transaction = connection.begin()
+    SessionLocal = sessionmaker(bind=connection)
+    session = SessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    transaction.close()
+
+
+@pytest.fixture
+def auth_header(db_session, override_get_session):
+    create_user("skywatcher", "fortest", db_session)
+    response = client.post(
+        "/auth/login", data={"username": "skywatcher", "password": "fortest"}
+    )
+    token = response.json()["access_token"]
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def fake_sky(monkeypatch):
+    sky_summary_cache.clear()
+    calls = []
+
+    def fake_get_coords(location: str, elevation: float | None = None):
+        return "-157.858,21.3069,0.3"
+
+    def fake_search_object(object_name: str | int, coords: str):
+        calls.append((object_name, coords))
+        return {"result": object_name}
+
+    def fake_parse_horizons_ephemeris(raw_data: dict):
+        if raw_data["result"] not in FAKE_SKY:
+            raise ObjectNotFoundError
+
+        object_name, altitude, magnitude = FAKE_SKY[raw_data["result"]]
+        return {
+            "object_name": object_name,
+            "object_id": raw_data["result"],
+            "date": "2025-Dec-29 15:54",
+            "azimuth_deg": "120.0",
+            "altitude_deg": str(altitude),
+            "apparent_magnitude": str(magnitude),
+            "constellation": "Sgr",
+            "illumination_percent": "99.9",
+        }
+
+    monkeypatch.setattr("app.api.horizons.get_coords", fake_get_coords)
+    monkeypatch.setattr("app.services.sky.search_object", fake_search_object)
+    monkeypatch.setattr(
+        "app.services.sky.parse_horizons_ephemeris", fake_parse_horizons_ephemeris
+    )
+    monkeypatch.setattr(
+        "app.services.sky.SKY_SUMMARY_BODIES", ["199", "301", "499", "599", "999"]
+    )
+    monkeypatch.setattr(horizons_rate_limiter, "min_interval", 0)
+    ephemeris_cache.clear()
+
+    yield calls
+    sky_summary_cache.clear()
+    ephemeris_cache.clear()
+
+
+def test_time_bucket_ttl_runs_to_next_boundary():
+    now = datetime(2025, 12, 29, 15, 54, 30, tzinfo=timezone.utc)
+
+    bucket_start, ttl = time_bucket(now, 10)
+
+    assert bucket_start == datetime(2025, 12, 29, 15, 50, tzinfo=timezone.utc)
+    assert ttl == 330
+
+
+def test_time_bucket_counts_long_buckets_from_epoch():
+    now = datetime(2025, 12, 29, 15, 54, 30, tzinfo=timezone.utc)
+
+    bucket_start, ttl = time_bucket(now, 90)
+
+    assert bucket_start == datetime(2025, 12, 29, 15, 0, tzinfo=timezone.utc)
+    assert ttl == 36 * 60 - 30
+
+    bucket_start, ttl = time_bucket(now, 24 * 60)
+
+    assert bucket_start == datetime(2025, 12, 29, tzinfo=timezone.utc)
+    assert ttl == 8 * 3600 + 5 * 60 + 30
+
+
+def test_sky_summary_sorted_by_visibility(auth_header, fake_sky):
+    response = client.get(
+        "/horizons/sky", params={"location": "Honolulu"}, headers=auth_header
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [body["object_name"] for body in data["objects"]] == [
+        "Jupiter",
+        "Moon",
+        "Mars",
+        "Mercury",
+    ]
+    assert data["unavailable"] == ["999"]
+    assert data["site"] == "-157.9,21.3,0.3"
+    assert "illumination_percent" not in data["objects"][0]
+
+
+def test_sky_summary_is_cached_per_cell_and_bucket(auth_header, fake_sky):
+    for _ in range(3):
+        response = client.get(
+            "/horizons/sky", params={"location": "Honolulu"}, headers=auth_header
+        )
+        assert response.status_code == 200
+
+    assert len(fake_sky) == 5
+    assert {coords for _, coords in fake_sky} == {"-157.9,21.3,0.3"}
+
+
+def test_degraded_sky_summary_is_cached_briefly(auth_header, fake_sky, monkeypatch):
+    monkeypatch.setattr("app.services.sky.SKY_SUMMARY_DEGRADED_TTL_SECONDS", 0)
+
+    for _ in range(2):
+        response = client.get(
+            "/horizons/sky", params={"location": "Honolulu"}, headers=auth_header
+        )
+        assert response.status_code == 200
+        assert response.json()["unavailable"] == ["999"]
+
+    assert len(fake_sky) == 10
+
+    monkeypatch.setattr("app.services.sky.SKY_SUMMARY_BODIES", ["499", "599"])
+    for _ in range(2):
+        response = client.get(
+            "/horizons/sky", params={"location": "Honolulu"}, headers=auth_header
+        )
+        assert response.status_code == 200
+
+    assert len(fake_sky) == 12
+
+
+def test_failed_sky_summary_is_not_served_for_the_bucket(
+    auth_header, fake_sky, monkeypatch
+):
+    monkeypatch.setattr("app.services.sky.SKY_SUMMARY_DEGRADED_TTL_SECONDS", 0)
+    monkeypatch.setattr("app.services.sky.SKY_SUMMARY_BODIES", ["999"])
+
+    response = client.get(
+        "/horizons/sky", params={"location": "Honolulu"}, headers=auth_header
+    )
+    assert response.status_code == 503
+
+    monkeypatch.setitem(FAKE_SKY, "999", ("Saturn", 10.0, 0.6))
+
+    response = client.get(
+        "/horizons/sky", params={"location": "Honolulu"}, headers=auth_header
+    )
+    assert response.status_code == 200
+    assert [body["object_name"] for body in response.json()["objects"]] == ["Saturn"]
+
+
+def test_sky_summary_uses_prewarmed_rows_and_rate_limiter(
+    auth_header, fake_sky, monkeypatch
+):
+    acquired = []
+    monkeypatch.setattr(
+        horizons_rate_limiter, "acquire", lambda stop_event=None: acquired.append(1)
+    )
+
+    current_date = datetime.now(timezone.utc).strftime(HORIZONS_TIME_FORMAT)
+    ephemeris_cache.set(
+        ephemeris_cache_key("599", "-157.858,21.3069,0.3", current_date),
+        {
+            "object_name": "Jupiter",
+            "object_id": "599",
+            "date": current_date,
+            "azimuth_deg": "118.0",
+            "altitude_deg": "47.5",
+            "apparent_magnitude": "-2.5",
+            "constellation": "Gem",
+        },
+        60,
+    )
+
+    response = client.get(
+        "/horizons/sky", params={"location": "Honolulu"}, headers=auth_header
+    )
+
+    assert response.status_code == 200
+    assert response.json()["objects"][0]["constellation"] == "Gem"
+    assert sorted(body for body, _ in fake_sky) == ["199", "301", "499", "999"]
+    assert len(acquired) == 4
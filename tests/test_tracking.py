@@ -0,0 +1,235 @@
+from app.main import app
+from app.services import tracking
+from app.services.tracking import TrackingHub, track_window
+from app.services.cache import track_cache
+from app.services.metrics import track_feeds, track_subscribers
+from app.services.refresher import horizons_rate_limiter
+from app.services.horizons import HORIZONS_TIME_FORMAT
+from app.exceptions import ObjectNotFoundError
+from datetime import datetime, timedelta, timezone
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.session import get_session
+from app.services.auth import create_user
+import pytest
+
+client = TestClient(app)
+
+fake_engine = create_engine(
+    "sqlite:///:memory:", connect_args={"check_same_thread": False}
+)
+
+Base.metadata.create_all(bind=fake_engine)
+
+SITE = "14.416667,50.083333,0.3"
+PRESENCE_MARKERS = ["*m", "C", "Cm", "N", "Nm", "A", "Am", "", "m", "*r"]
+
+
+def fake_azimuth(row_time: datetime) -> float:
+    return (row_time.timestamp() / 60 * 0.5) % 360
+
+
+def fake_altitude(row_time: datetime) -> float:
+    return 30 + (row_time.timestamp() / 60 % 20)
+
+
+@pytest.fixture
+def override_get_session(db_session):
+    def override_dependency():
+        return db_session
+
+    app.dependency_overrides[get_session] = override_dependency
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db_session():
+    connection = fake_engine.connect()
+    transaction = connection.begin()
+    SessionLocal = sessionmaker(bind=connection)
+    session = SessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    transaction.close()
+
+
+@pytest.fixture
+def token(db_session, override_get_session):
+    create_user("tracking", "fortest", db_session)
+    response = client.post(
+        "/auth/login", data={"username": "tracking", "password": "fortest"}
+    )
+
+    return response.json()["access_token"]
+
+
+@pytest.fixture
+def fake_range(monkeypatch):
+    calls = []
+
+    def fake_search_object_range(object_name, coords, start_time, stop_time, step_size):
+        calls.append((object_name, coords, start_time, stop_time))
+        if object_name == "atlantis":
+            raise ObjectNotFoundError
+
+        if object_name == "garbled":
+            return {
+                "result": "Target body name: Garbled (0)  {source: none}\n"
+                " Date__(UT)__HR:MN  Azi____(a-app)___Elev\n"
+                "$$SOE\n 2025-Dec-24 13:35 *m  north  up\n$$EOE\n"
+            }
+
+        rows = []
+        row_time = start_time
+        while row_time <= stop_time:
+            marker = PRESENCE_MARKERS[len(rows) % len(PRESENCE_MARKERS)]
+            rows.append(
+                f" {row_time.strftime(HORIZONS_TIME_FORMAT)} {marker:<3} "
+                f"{fake_azimuth(row_time):.6f}  {fake_altitude(row_time):.6f}"
+            )
+            row_time += timedelta(minutes=1)
+
+        return {
+            "result": "Target body name: Mars (499)  {source: mar099}\n"
+            " Date__(UT)__HR:MN  Azi____(a-app)___Elev\n"
+            "$$SOE\n" + "\n".join(rows) + "\n$$EOE\n"
+        }
+
+    monkeypatch.setattr(tracking, "search_object_range", fake_search_object_range)
+    monkeypatch.setattr(horizons_rate_limiter, "min_interval", 0)
+    monkeypatch.setattr("app.api.horizons.get_coords", lambda *args: SITE)
+    track_cache.clear()
+    yield calls
+    track_cache.clear()
+
+
+def test_track_window_is_aligned_to_refresh_period():
+    start, stop = track_window(datetime(2025, 12, 29, 15, 54, 30, tzinfo=timezone.utc))
+
+    assert start == datetime(2025, 12, 29, 15, 50, tzinfo=timezone.utc)
+    assert stop == datetime(2025, 12, 29, 16, 0, tzinfo=timezone.utc)
+
+
+def test_subscribers_to_same_object_and_cell_share_one_fetch(fake_range):
+    hub = TrackingHub()
+
+    feeds = [hub.subscribe("Mars", SITE) for _ in range(100)]
+    feeds.append(hub.subscribe(" mars ", "14.42,50.08,0.3"))
+
+    assert len(fake_range) == 1
+    assert all(feed is feeds[0] for feed in feeds)
+    assert track_feeds.get() == 1
+    assert track_subscribers.get() == 101
+
+    hub.subscribe("mars", "-73.98,40.75,0.3")
+    assert len(fake_range) == 2
+    assert track_feeds.get() == 2
+
+    for feed in feeds:
+        hub.unsubscribe(feed)
+
+    assert feeds[0].key not in hub.feeds
+    assert len(hub.feeds) == 1
+    assert track_subscribers.get() == 1
+
+
+def test_positions_are_interpolated_between_samples(fake_range):
+    hub = TrackingHub()
+    feed = hub.subscribe("mars", SITE)
+    sample_time = datetime.now(timezone.utc).replace(second=0, microsecond=0)
+
+    position = feed.position(sample_time + timedelta(seconds=15))
+
+    expected = fake_azimuth(sample_time) + 0.125
+    assert position["object_id"] == "499"
+    assert position["azimuth_deg"] == pytest.approx(expected % 360)
+    assert position["altitude_deg"] == pytest.approx(fake_altitude(sample_time) + 0.25)
+    assert feed.position(sample_time + timedelta(hours=1)) is None
+
+
+def test_azimuth_interpolation_wraps_through_north(fake_range):
+    hub = TrackingHub()
+    feed = hub.subscribe("mars", SITE)
+    start = feed.track["times"][0]
+    feed.track["azimuth"][:2] = [359.0, 361.0]
+
+    position = feed.position(datetime.fromtimestamp(start + 45, tz=timezone.utc))
+
+    assert position["azimuth_deg"] == pytest.approx(0.5)
+
+
+def test_feeds_refresh_once_per_window(fake_range):
+    hub = TrackingHub()
+    hub.subscribe("mars", SITE)
+    _, next_window = track_window(datetime.now(timezone.utc))
+
+    assert hub.refresh_feeds(datetime.now(timezone.utc)) == 0
+    assert hub.refresh_feeds(next_window + timedelta(seconds=1)) == 1
+    assert hub.refresh_feeds(next_window + timedelta(seconds=2)) == 0
+    assert len(fake_range) == 2
+    assert fake_range[1][2] == next_window
+
+
+def test_failed_subscribe_releases_feed(fake_range):
+    hub = TrackingHub()
+
+    with pytest.raises(ObjectNotFoundError):
+        hub.subscribe("atlantis", SITE)
+
+    assert hub.feeds == {}
+
+
+def test_track_websocket_streams_positions(token, fake_range):
+    url = f"/horizons/track?query=mars&location=prague&interval=0.2&token={token}"
+
+    with client.websocket_connect(url) as websocket:
+        first = websocket.receive_json()
+        second = websocket.receive_json()
+
+    assert first["object_name"] == "Mars"
+    assert 0 <= first["azimuth_deg"] < 360
+    assert second["time"] > first["time"]
+    assert len(fake_range) == 1
+    assert tracking.tracking_hub.feeds == {}
+
+
+def test_track_websocket_requires_valid_token(fake_range):
+    url = "/horizons/track?query=mars&location=prague&token=thisisnotatoken"
+
+    with client.websocket_connect(url) as websocket:
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            websocket.receive_json()
+
+    assert disconnect.value.code == 1008
+    assert disconnect.value.reason == "Could not validate credentials"
+    assert fake_range == []
+
+
+def test_track_websocket_reports_unknown_object(token, fake_range):
+    headers = {"Authorization": f"Bearer {token}"}
+    url = "/horizons/track?query=atlantis&location=prague"
+
+    with client.websocket_connect(url, headers=headers) as websocket:
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            websocket.receive_json()
+
+    assert disconnect.value.code == 1008
+    assert disconnect.value.reason == "Object not found"
+
+
+def test_track_websocket_reports_unparseable_response(token, fake_range):
+    headers = {"Authorization": f"Bearer {token}"}
+    url = "/horizons/track?query=garbled&location=prague"
+
+    with client.websocket_connect(url, headers=headers) as websocket:
+        with pytest.raises(WebSocketDisconnect) as disconnect:
+            websocket.receive_json()
+
+    assert disconnect.value.code == 1011
+    assert disconnect.value.reason == "Unexpected Horizons response"
+    assert tracking.tracking_hub.feeds == {}
@@ -0,0 +1,217 @@
+from app.main import app
+from app.services.visibility import compute_visibility
+from app.services.cache import visibility_cache
+from app.services.horizons import HORIZONS_TIME_FORMAT, parse_horizons_ephemeris_series
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.session import get_session
+from app.services.auth import create_user
+from datetime import datetime, timedelta, timezone
+import math
+import pytest
+
+client = TestClient(app)
+
+fake_engine = create_engine(
+    "sqlite:///:memory:", connect_args={"check_same_thread": False}
+)
+
+Base.metadata.create_all(bind=fake_engine)
+
+DAY_SECONDS = 86400
+START = datetime(2025, 12, 24, 12, 0, tzinfo=timezone.utc)
+PRESENCE_MARKERS = ["*m", "C", "Cm", "N", "Nm", "A", "Am", "", "m", "*r", "Ams", "* t"]
+
+TWILIGHT_RESULT = """
+Target body name: Jupiter (599)                   {source: jup365}
+ Date__(UT)__HR:MN     Azi____(a-app)___Elev    APmag   S-brt  Cnst
+$$SOE
+ 2025-Dec-24 15:50 *m   241.884725   4.515307  -2.678  5.348  Gem
+ 2025-Dec-24 16:00 C    242.051190   3.352217  -2.678  5.348  Gem
+ 2025-Dec-24 16:10 Nm   243.100000   2.100000  -2.678  5.348  Gem
+ 2025-Dec-24 16:20 A    244.200000   0.900000  -2.678  5.348  Gem
+ 2025-Dec-24 16:30  m   245.300000  -0.300000  -2.678  5.348  Gem
+ 2025-Dec-24 16:40      246.400000  -1.500000  -2.678  5.348  Gem
+ 2025-Dec-24 16:50 A s  247.500000  -2.700000  -2.678  5.348  Gem
+$$EOE
+"""
+
+
+def _altitude(seconds: float) -> float:
+    return 40 * math.sin(2 * math.pi * seconds / DAY_SECONDS) - 10
+
+
+def _fake_columns(step_minutes: int = 10) -> dict:
+    times = []
+    altitude = []
+    azimuth = []
+
+    for minute in range(0, 24 * 60 + 1, step_minutes):
+        seconds = minute * 60
+        times.append(START.timestamp() + seconds)
+        altitude.append(_altitude(seconds))
+        azimuth.append((90 + 360 * seconds / DAY_SECONDS) % 360)
+
+    return {"times": times, "altitude": altitude, "azimuth": azimuth}
+
+
+def _seconds_between(first: datetime, second: datetime) -> float:
+    return abs((first - second).total_seconds())
+
+
+@pytest.fixture
+def override_get_session(db_session):
+    def override_dependency():
+        return db_session
+
+    app.dependency_overrides[get_session] = override_dependency
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db_session():
+    connection = fake_engine.connect()
+    transaction = connection.begin()
+    SessionLocal = sessionmaker(bind=connection)
+    session = SessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    transaction.close()
+
+
+@pytest.fixture
+def auth_header(db_session, override_get_session):
+    create_user("stargazer", "fortest", db_session)
+    response = client.post(
+        "/auth/login", data={"username": "stargazer", "password": "fortest"}
+    )
+    token = response.json()["access_token"]
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def empty_visibility_cache():
+    visibility_cache.clear()
+    yield
+    visibility_cache.clear()
+
+
+def test_compute_visibility_matches_analytic_crossings():
+    result = compute_visibility(_fake_columns(), min_altitude_deg=20.0)
+
+    rise_seconds = DAY_SECONDS * math.asin(10 / 40) / (2 * math.pi)
+    set_seconds = DAY_SECONDS / 2 - rise_seconds
+
+    assert (
+        _seconds_between(result["rise_time"], START + timedelta(seconds=rise_seconds))
+        < 60
+    )
+    assert (
+        _seconds_between(result["set_time"], START + timedelta(seconds=set_seconds))
+        < 60
+    )
+    assert _seconds_between(result["transit_time"], START + timedelta(hours=6)) < 60
+    assert result["transit_altitude_deg"] == pytest.approx(30, abs=0.05)
+    assert result["transit_azimuth_deg"] == pytest.approx(180, abs=0.5)
+
+    assert len(result["windows"]) == 1
+    window = result["windows"][0]
+    window_seconds = DAY_SECONDS * math.asin(30 / 40) / (2 * math.pi)
+    assert (
+        _seconds_between(window["start"], START + timedelta(seconds=window_seconds))
+        < 120
+    )
+    assert window["max_altitude_deg"] == pytest.approx(30, abs=0.1)
+
+
+def test_compute_visibility_never_above_threshold():
+    result = compute_visibility(_fake_columns(), min_altitude_deg=45.0)
+
+    assert result["windows"] == []
+    assert result["rise_time"] is not None
+
+
+def test_series_parser_drops_twilight_markers():
+    series = parse_horizons_ephemeris_series({"result": TWILIGHT_RESULT})
+
+    assert len(series) == 7
+    assert series.floats("azimuth_deg").tolist() == [
+        241.884725,
+        242.05119,
+        243.1,
+        244.2,
+        245.3,
+        246.4,
+        247.5,
+    ]
+    assert series.floats("altitude_deg").tolist() == [
+        4.515307,
+        3.352217,
+        2.1,
+        0.9,
+        -0.3,
+        -1.5,
+        -2.7,
+    ]
+    assert series.columns["constellation"] == ["Gem"] * 7
+
+
+def test_visibility_endpoint_fetches_once_per_cell(
+    auth_header, monkeypatch, empty_visibility_cache
+):
+    calls = []
+
+    def fake_get_coords(location: str, elevation: float | None = None):
+        return "14.4213,50.0874,0.3" if location == "prague" else "14.4391,50.0755,0.3"
+
+    def fake_search_object_range(
+        object_name, coords, start_time, stop_time, step_size="1m"
+    ):
+        calls.append((object_name, coords, step_size))
+        columns = _fake_columns()
+        rows = [
+            f"{datetime.fromtimestamp(t, timezone.utc).strftime(HORIZONS_TIME_FORMAT)}"
+            f" {PRESENCE_MARKERS[index % len(PRESENCE_MARKERS)]:<3}"
+            f"  {azimuth:.6f} {altitude:.6f}"
+            for index, (t, altitude, azimuth) in enumerate(
+                zip(columns["times"], columns["altitude"], columns["azimuth"])
+            )
+        ]
+
+        return {
+            "result": "Target body name: Jupiter (599)  {source: jup365}\n"
+            "Date__(UT)__HR:MN  Azi____(a-app)___Elev\n"
+            "$$SOE\n" + "\n".join(rows) + "\n$$EOE\n"
+        }
+
+    monkeypatch.setattr("app.api.horizons.get_coords", fake_get_coords)
+    monkeypatch.setattr(
+        "app.services.visibility.search_object_range", fake_search_object_range
+    )
+
+    for location in ("prague", "prague old town"):
+        response = client.get(
+            "/horizons/visibility",
+            params={
+                "query": "599",
+                "location": location,
+                "observing_date": "2025-12-24",
+                "min_altitude": 20,
+            },
+            headers=auth_header,
+        )
+
+        assert response.status_code == 200
+
+    assert calls == [("599", "14.4,50.1,0.3", "10m")]
+
+    data = response.json()
+    assert data["object_name"] == "Jupiter"
+    assert data["date"] == "2025-12-24"
+    assert len(data["windows"]) == 1
+    assert data["transit_altitude_deg"] == pytest.approx(30, abs=0.05)
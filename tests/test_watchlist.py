@@ -0,0 +1,247 @@
+from app.main import app
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.base import Base
+from app.db.session import get_session
+from app.services.auth import create_user
+from app.services.cache import ephemeris_cache, refresh_claims, object_aliases
+from app.services.cache import watched_objects, object_details
+from app.services.horizons import remember_object_alias, resolve_object_id
+from app.services.horizons import HORIZONS_TIME_FORMAT
+from app.services.refresher import refresh_watchlist, horizons_rate_limiter
+from app.services.refresher import refresh_site
+from datetime import datetime, timedelta, timezone
+import pytest
+
+client = TestClient(app)
+
+fake_engine = create_engine(
+    "sqlite:///:memory:", connect_args={"check_same_thread": False}
+)
+
+Base.metadata.create_all(bind=fake_engine)
+
+FAKE_COORDS = "14.42,50.08,0.3"
+BODY_NAMES = {"499": "Mars", "599": "Jupiter"}
+
+
+@pytest.fixture
+def override_get_session(db_session):
+    def override_dependency():
+        return db_session
+
+    app.dependency_overrides[get_session] = override_dependency
+    yield
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def db_session():
+    connection = fake_engine.connect()
+    transaction = connection.begin()
+    SessionLocal = sessionmaker(bind=connection)
+    session = SessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    transaction.close()
+
+
+@pytest.fixture
+def auth_header(db_session, override_get_session):
+    create_user("watcher", "fortest", db_session)
+    response = client.post(
+        "/auth/login", data={"username": "watcher", "password": "fortest"}
+    )
+    token = response.json()["access_token"]
+
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def empty_ephemeris_cache():
+    ephemeris_cache.clear()
+    refresh_claims.clear()
+    object_aliases.clear()
+    watched_objects.clear()
+    yield
+    ephemeris_cache.clear()
+    refresh_claims.clear()
+    object_aliases.clear()
+    watched_objects.clear()
+
+
+@pytest.fixture
+def fake_upstream(monkeypatch):
+    calls = []
+
+    def fake_get_coords(location: str, elevation: float | None = None):
+        return FAKE_COORDS
+
+    def fake_search_object_range(object_name, coords, start_time, stop_time):
+        calls.append((object_name, coords))
+        rows = []
+        current_time = start_time
+        while current_time <= stop_time:
+            rows.append(
+                f"{current_time.strftime(HORIZONS_TIME_FORMAT)} *m  241.88  4.51  1.09  Sgr"
+            )
+            current_time += timedelta(minutes=1)
+
+        return {
+            "result": f"Target body name: {BODY_NAMES[object_name]} ({object_name})"
+            "  {source: mar097}\n"
+            "Date__(UT)__HR:MN  Azi____(a-app)___Elev  APmag  Cnst\n"
+            "$$SOE\n" + "\n".join(rows) + "\n$$EOE\n"
+        }
+
+    monkeypatch.setattr("app.services.refresher.get_coords", fake_get_coords)
+    monkeypatch.setattr(
+        "app.services.refresher.search_object_range", fake_search_object_range
+    )
+    monkeypatch.setattr(horizons_rate_limiter, "min_interval", 0)
+
+    return calls
+
+
+def test_watchlist_add_list_and_delete(auth_header):
+    response = client.post(
+        "/watchlist",
+        json={"object_id": "499", "location": "Prague"},
+        headers=auth_header,
+    )
+    assert response.status_code == 201
+    item_id = response.json()["id"]
+
+    response = client.get("/watchlist", headers=auth_header)
+    assert response.status_code == 200
+    assert [item["object_id"] for item in response.json()] == ["499"]
+
+    response = client.delete(f"/watchlist/{item_id}", headers=auth_header)
+    assert response.status_code == 204
+
+    response = client.get("/watchlist", headers=auth_header)
+    assert response.json() == []
+
+
+def test_watchlist_duplicate_returns_409(auth_header):
+    payload = {"object_id": "499", "location": "Prague"}
+    client.post("/watchlist", json=payload, headers=auth_header)
+
+    response = client.post("/watchlist", json=payload, headers=auth_header)
+
+    assert response.status_code == 409
+    assert response.json() == {"detail": "Object already watched"}
+
+
+def test_watchlist_delete_missing_returns_404(auth_header):
+    response = client.delete("/watchlist/12345", headers=auth_header)
+
+    assert response.status_code == 404
+
+
+def test_refresh_groups_objects_by_site(
+    auth_header, db_session, fake_upstream, empty_ephemeris_cache
+):
+    for object_id in ("499", "599"):
+        client.post(
+            "/watchlist",
+            json={"object_id": object_id, "location": "Prague"},
+            headers=auth_header,
+        )
+
+    now = datetime(2025, 12, 24, 20, 0, 30, tzinfo=timezone.utc)
+    cached_rows = refresh_watchlist(db_session, now=now)
+
+    assert sorted(fake_upstream) == [("499", FAKE_COORDS), ("599", FAKE_COORDS)]
+    assert cached_rows > 0
+    assert len(ephemeris_cache) == cached_rows
+
+
+def test_interrupted_refresh_releases_its_claim(
+    fake_upstream, empty_ephemeris_cache, monkeypatch
+):
+    start_time = datetime(2025, 12, 24, 20, 0, tzinfo=timezone.utc)
+    stop_time = start_time + timedelta(minutes=30)
+
+    monkeypatch.setattr(horizons_rate_limiter, "acquire", lambda stop_event: False)
+    assert refresh_site("Prague", None, {"499"}, start_time, stop_time) == 0
+    assert len(refresh_claims) == 0
+
+    monkeypatch.setattr(horizons_rate_limiter, "acquire", lambda stop_event: True)
+    assert refresh_site("Prague", None, {"499"}, start_time, stop_time) == 31
+    assert fake_upstream == [("499", FAKE_COORDS)]
+
+
+def test_refresh_records_details_for_segment_store(
+    fake_upstream, empty_ephemeris_cache, monkeypatch
+):
+    start_time = datetime(2025, 12, 24, 20, 0, tzinfo=timezone.utc)
+    stop_time = start_time + timedelta(minutes=30)
+    object_details.clear()
+
+    refresh_site("Prague", None, {"499"}, start_time, stop_time)
+    assert object_details.get("499") is None
+
+    refresh_claims.clear()
+    monkeypatch.setattr("app.services.refresher.EPHEMERIS_STORE_ENABLED", True)
+    refresh_site("Prague", None, {"499"}, start_time, stop_time)
+
+    assert object_details.get("499") == {
+        "apparent_magnitude": "1.09",
+        "constellation": "Sgr",
+    }
+    object_details.clear()
+
+
+@pytest.mark.parametrize("query", ["499", "mars", " Mars "])
+def test_search_for_watched_object_is_served_from_cache(
+    query, auth_header, db_session, fake_upstream, empty_ephemeris_cache, monkeypatch
+):
+    client.post(
+        "/watchlist",
+        json={"object_id": "499", "location": "Prague"},
+        headers=auth_header,
+    )
+    refresh_watchlist(db_session)
+
+    def fake_get_coords(location: str, elevation: float | None = None):
+        return FAKE_COORDS
+
+    def failing_search_object(object_name, coords):
+        raise AssertionError("search_object should not be called")
+
+    monkeypatch.setattr("app.api.horizons.get_coords", fake_get_coords)
+    monkeypatch.setattr("app.api.horizons.search_object", failing_search_object)
+
+    response = client.get(
+        "/horizons/search",
+        params={"query": query, "location": "Prague"},
+        headers=auth_header,
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["object_name"] == "Mars"
+    assert data["azimuth_deg"] == 241.88
+    assert data["constellation"] == "Sgr"
+
+
+def test_aliases_are_only_recorded_for_watched_objects(
+    auth_header, db_session, fake_upstream, empty_ephemeris_cache
+):
+    remember_object_alias("jupiter", "599")
+    assert resolve_object_id("jupiter") == "jupiter"
+    assert len(object_aliases) == 0
+
+    client.post(
+        "/watchlist",
+        json={"object_id": "599", "location": "Prague"},
+        headers=auth_header,
+    )
+    refresh_watchlist(db_session)
+
+    remember_object_alias("Jove", "599")
+    assert resolve_object_id(" jove ") == "599"
+    assert resolve_object_id("jupiter") == "599"